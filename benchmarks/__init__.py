@@ -0,0 +1,5 @@
+"""Offline performance benchmarks for the transcription pipeline.
+
+Run ``python -m benchmarks.run`` to write a JSON report and
+``python -m benchmarks.compare old.json new.json`` to diff two reports.
+"""
@@ -0,0 +1,92 @@
+"""Compare two benchmark reports and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+
+Exits with status 1 if any metric got worse by more than the threshold.
+"""
+import sys
+import json
+import argparse
+from typing import Dict, List, Any, Optional, Tuple
+
+# Only the robust statistics are compared; means and maxima are too noisy
+TIME_SUFFIXES = ("p50_s", "load_s", "elapsed_s", "latency_p50_s")
+RATE_SUFFIXES = ("_per_s", "realtime_factor")
+SIZE_SUFFIXES = ("bytes", "peak_rss_mb")
+
+
+def flatten(report: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested dicts into dotted keys, keeping numeric leaves only."""
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def direction(key: str) -> Optional[int]:
+    """+1 if higher is better for a metric, -1 if lower is better, None if not compared."""
+    name = key.rsplit(".", 1)[-1]
+    if name.endswith(RATE_SUFFIXES):
+        return 1
+    if name.endswith(TIME_SUFFIXES) or name in SIZE_SUFFIXES:
+        return -1
+    return None
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any],
+            threshold: float = 0.1) -> List[Tuple[str, float, float, float, bool]]:
+    """Compare the metrics present in both reports.
+
+    Args:
+        baseline: Report from the reference commit
+        candidate: Report from the commit under test
+        threshold: Relative change beyond which a worse metric is a regression
+
+    Returns:
+        (key, baseline value, candidate value, relative change, regressed) per metric
+    """
+    old, new = flatten(baseline.get("stages", {})), flatten(candidate.get("stages", {}))
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        sign = direction(key)
+        if sign is None or old[key] == 0:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        rows.append((key, old[key], new[key], change, sign * change < -threshold))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change counted as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    for label, report in (("baseline", baseline), ("candidate", candidate)):
+        metadata = report.get("metadata", {})
+        print(f"{label}: {metadata.get('git_commit') or 'unknown commit'} "
+              f"({'quick' if metadata.get('quick') else 'full'} run)")
+
+    rows = compare(baseline, candidate, args.threshold)
+    regressions = [row for row in rows if row[4]]
+    for key, old, new, change, regressed in rows:
+        marker = "REGRESSION" if regressed else ""
+        print(f"{key:70} {old:12.4g} {new:12.4g} {change:+8.1%} {marker}")
+
+    print(f"{len(rows)} metrics compared, {len(regressions)} regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
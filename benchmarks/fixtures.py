@@ -0,0 +1,197 @@
+import re
+import time
+import wave
+import shutil
+import threading
+import urllib.request
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+from services.audio_processing import SAMPLE_RATE
+
+# Words cycled through synthetic transcripts
+VOCABULARY = ("the quick brown fox jumps over a lazy dog while we talk about "
+              "speech models and timestamps. then another sentence starts here!").split()
+
+
+def speech_like_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """Generate audio with speech-like bursts separated by pauses.
+
+    Bursts are amplitude-modulated harmonics, so energy-based silence
+    detection and chunk splitting see a realistic structure.
+    """
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = int(rng.uniform(0.5, 2.0) * SAMPLE_RATE)
+    while position < len(audio):
+        length = int(rng.uniform(1.0, 6.0) * SAMPLE_RATE)
+        t = np.arange(min(length, len(audio) - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250)
+        burst = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+        audio[position:position + len(t)] = 0.2 * burst * envelope
+        position += length + int(rng.uniform(0.3, 2.5) * SAMPLE_RATE)
+    audio += 0.001 * rng.standard_normal(len(audio)).astype(np.float32)
+    return audio
+
+
+def write_wav(path: Path, audio: np.ndarray):
+    """Write float32 samples as a 16 kHz mono 16-bit WAV file."""
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+
+
+def synthetic_transcript(seconds: float, words_per_second: float = 2.5) -> Dict[str, Any]:
+    """Build a transcript in the transcribe_audio format covering ``seconds`` of audio."""
+    word_count = int(seconds * words_per_second)
+    spacing = 1.0 / words_per_second
+    segments: List[Dict[str, Any]] = []
+    words: List[Dict[str, Any]] = []
+    for i in range(word_count):
+        start = i * spacing
+        words.append({"word": " " + VOCABULARY[i % len(VOCABULARY)], "start": start,
+                      "end": start + spacing * 0.8, "probability": 0.9})
+        if len(words) == 12 or i == word_count - 1:
+            segments.append({"id": len(segments), "start": words[0]["start"], "end": words[-1]["end"],
+                             "text": "".join(word["word"] for word in words).strip(), "words": words})
+            words = []
+    return {
+        "success": True,
+        "text": " ".join(segment["text"] for segment in segments),
+        "language": "en",
+        "segments": segments,
+        "duration": segments[-1]["end"] if segments else 0.0,
+        "processing_time": 0.0,
+        "model_used": "synthetic",
+        "device": "cpu",
+    }
+
+
+class FixtureServer:
+    """Serves generated WAV "videos" over HTTP on localhost.
+
+    Stands in for YouTube's media servers, so ffmpeg's streaming path and
+    downloads go through a real socket without leaving the machine.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.videos: Dict[str, float] = {}
+        handler = partial(_QuietHandler, directory=str(self.directory))
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        LocalYoutubeDL.server = self
+        return self
+
+    def __exit__(self, *exc_info):
+        LocalYoutubeDL.server = None
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def add_video(self, video_id: str, seconds: float, seed: int = 0) -> Path:
+        """Generate a fixture video's audio and make it downloadable."""
+        path = self.directory / f"{video_id}.wav"
+        if not path.exists():
+            write_wav(path, speech_like_audio(seconds, seed))
+        self.videos[video_id] = seconds
+        return path
+
+    def info(self, video_id: str) -> Dict[str, Any]:
+        """Info dict shaped like yt-dlp's for a single-format video."""
+        if video_id not in self.videos:
+            raise ValueError(f"Unknown fixture video: {video_id}")
+        host, port = self.httpd.server_address[:2]
+        return {
+            "id": video_id,
+            "title": f"Fixture {video_id}",
+            "uploader": "benchmarks",
+            "duration": self.videos[video_id],
+            "ext": "wav",
+            "format_id": "fixture",
+            "acodec": "pcm_s16le",
+            "protocol": "http",
+            "url": f"http://{host}:{port}/{video_id}.wav",
+            "http_headers": {"User-Agent": "benchmarks"},
+        }
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler without per-request logging."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that resolves and downloads fixture videos.
+
+    Implements the subset of the YoutubeDL API used by YouTubeAudioService.
+    """
+
+    server: Optional[FixtureServer] = None
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self.params = dict(params or {})
+        self._hooks = []
+
+    def __enter__(self) -> "LocalYoutubeDL":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_progress_hook(self, hook):
+        self._hooks.append(hook)
+
+    def extract_info(self, url: str, download: bool = True) -> Dict[str, Any]:
+        match = re.search(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]+)", url)
+        if not match:
+            raise ValueError(f"Not a fixture video URL: {url}")
+        return self.process_ie_result(self.server.info(match.group(1)), download=download)
+
+    def process_ie_result(self, info: Dict[str, Any], download: bool = True) -> Dict[str, Any]:
+        if not download:
+            return info
+
+        home = Path(self.params.get("paths", {}).get("home", "."))
+        path = home / f"{info['id']}.{info['ext']}"
+        with urllib.request.urlopen(info["url"]) as response, open(path, "wb") as out:
+            total = int(response.headers.get("Content-Length", 0))
+            shutil.copyfileobj(response, out)
+        for hook in self._hooks:
+            hook({"status": "finished", "downloaded_bytes": total, "total_bytes": total})
+
+        return dict(info, requested_downloads=[{"filepath": str(path)}])
+
+    def close(self):
+        pass
+
+
+class SimulatedWhisper:
+    """Inference stand-in used when Whisper or its weights aren't available.
+
+    Sleeps for a fixed fraction of the audio length, so pipeline overhead
+    and concurrency behaviour can be measured without a model.
+    """
+
+    def __init__(self, real_time_factor: float = 0.05):
+        self.real_time_factor = real_time_factor
+
+    def transcribe_audio(self, audio, model_name: str = "base", language: Optional[str] = None,
+                         on_segments=None, **kwargs) -> Dict[str, Any]:
+        seconds = len(audio) / SAMPLE_RATE
+        time.sleep(seconds * self.real_time_factor)
+        transcript = synthetic_transcript(seconds)
+        if on_segments is not None:
+            on_segments(transcript["segments"], seconds)
+        return transcript
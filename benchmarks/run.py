@@ -0,0 +1,369 @@
+"""Offline benchmark suite.
+
+Measures per-stage latency (download, decode, inference, segmentation,
+serialization), pipeline throughput under concurrency, peak RSS, model
+load time per model size and create_segments scaling with transcript
+length. Nothing touches the internet: audio fixtures are generated and
+served from localhost, and yt-dlp is replaced by LocalYoutubeDL.
+
+Stages whose requirements are missing (ffmpeg, Whisper or cached model
+weights) are reported as skipped with a reason, so reports stay
+comparable between machines.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Any, Callable, Optional
+from unittest import mock
+import numpy as np
+
+import services.youtube_audio
+from services import wire_format
+from services.audio_processing import SAMPLE_RATE, decode_audio, stream_decode
+from services.job_manager import JobManager
+from services.segmentation import STRATEGIES, segment_transcript
+from services.transcript_cache import TranscriptCache
+from services.whisper_service import WhisperTranscriptionService
+from services.youtube_audio import YouTubeAudioService
+from benchmarks.fixtures import FixtureServer, LocalYoutubeDL, SimulatedWhisper, synthetic_transcript
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+# Transcript lengths for the create_segments scaling curve, in seconds
+SCALING_SECONDS = (600, 3600, 3 * 3600, 10 * 3600)
+QUICK_SCALING_SECONDS = (600, 3600)
+
+
+def timed(func: Callable[[], Any], runs: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """Time repeated calls of ``func``.
+
+    Returns:
+        Dict with mean_s, min_s, p50_s, max_s and runs
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "mean_s": statistics.fmean(samples),
+        "min_s": min(samples),
+        "p50_s": statistics.median(samples),
+        "max_s": max(samples),
+        "runs": runs,
+    }
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of this process's resident memory in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def skipped(reason: str) -> Dict[str, Any]:
+    return {"skipped": reason}
+
+
+def cached_whisper_models(model_names: List[str]) -> List[str]:
+    """Model names whose official checkpoint is already downloaded."""
+    try:
+        import whisper
+    except ImportError:
+        return []
+    root = Path(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))) / "whisper"
+    return [name for name in model_names
+            if name in whisper._MODELS and (root / os.path.basename(whisper._MODELS[name])).exists()]
+
+
+class BenchmarkRunner:
+    """Runs each benchmark stage and collects results into one report."""
+
+    def __init__(self, work_dir: Path, quick: bool = False, models: Optional[List[str]] = None,
+                 concurrency: Optional[List[int]] = None, audio_seconds: float = 60.0):
+        """Initialize the runner.
+
+        Args:
+            work_dir: Scratch directory for fixtures and caches
+            quick: Fewer runs and shorter inputs, for smoke testing
+            models: Whisper model sizes for load time and inference
+            concurrency: Worker counts for the throughput stage
+            audio_seconds: Length of the fixture video
+        """
+        self.work_dir = Path(work_dir)
+        self.quick = quick
+        self.runs = 2 if quick else 5
+        self.models = models or ["tiny", "base", "small"]
+        self.concurrency = concurrency or [1, 2, 4]
+        self.audio_seconds = 15.0 if quick else audio_seconds
+        self.has_ffmpeg = shutil.which("ffmpeg") is not None
+        self.results: Dict[str, Any] = {}
+
+    def run(self, stages: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run the given stages (all by default) and return the report."""
+        stages = stages or list(STAGES)
+        with FixtureServer(self.work_dir / "fixtures") as server, \
+                mock.patch.object(services.youtube_audio, "yt_dlp", SimpleNamespace(YoutubeDL=LocalYoutubeDL)):
+            self.server = server
+            server.add_video("fixture0001", self.audio_seconds)
+            for stage in stages:
+                logger.info(f"Running {stage} benchmark")
+                start = time.perf_counter()
+                try:
+                    result = getattr(self, f"bench_{stage}")()
+                except Exception as e:
+                    logger.error(f"{stage} benchmark failed: {e}")
+                    result = {"error": str(e)}
+                result["wall_s"] = time.perf_counter() - start
+                result["peak_rss_mb"] = peak_rss_mb()
+                self.results[stage] = result
+
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "metadata": collect_metadata(self.quick, self.audio_seconds),
+            "stages": self.results,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def _youtube_service(self, name: str) -> YouTubeAudioService:
+        """A YouTubeAudioService with its own empty cache directory."""
+        temp_dir = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=self.work_dir))
+        return YouTubeAudioService(temp_dir=str(temp_dir))
+
+    def bench_download(self) -> Dict[str, Any]:
+        url = "https://www.youtube.com/watch?v=fixture0001"
+
+        def cold():
+            service = self._youtube_service("download")
+            result = service.download_audio(url)
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+            return service
+
+        service = cold()
+        size = service.download_audio(url)["file_size"]
+        return {
+            "cold": timed(cold, self.runs),
+            "cache_hit": timed(lambda: service.download_audio(url), self.runs),
+            "bytes": size,
+        }
+
+    def bench_decode(self) -> Dict[str, Any]:
+        if not self.has_ffmpeg:
+            return skipped("ffmpeg not found")
+        path = str(self.server.directory / "fixture0001.wav")
+        url = self.server.info("fixture0001")["url"]
+        file_stats = timed(lambda: decode_audio(path), self.runs)
+        stream_stats = timed(lambda: stream_decode(url, expected_seconds=self.audio_seconds), self.runs)
+        return {
+            "file": file_stats,
+            "stream": stream_stats,
+            "audio_seconds": self.audio_seconds,
+            "realtime_factor": self.audio_seconds / file_stats["p50_s"],
+        }
+
+    def bench_model_load(self) -> Dict[str, Any]:
+        available = cached_whisper_models(self.models)
+        if not available:
+            return skipped("whisper or cached model weights not available")
+        results = {}
+        for name in available:
+            # A fresh service per model, so every load is cold from the disk cache
+            service = WhisperTranscriptionService()
+            start = time.perf_counter()
+            loaded = service.load_model(name)
+            results[name] = {"load_s": time.perf_counter() - start, "success": loaded["success"],
+                             "device": service.device, "peak_rss_mb": peak_rss_mb()}
+            service.shutdown()
+        return {"models": results, "missing": sorted(set(self.models) - set(available))}
+
+    def bench_inference(self) -> Dict[str, Any]:
+        available = cached_whisper_models(self.models)
+        if not available:
+            return skipped("whisper or cached model weights not available")
+        audio = self._fixture_audio()
+        service = WhisperTranscriptionService()
+        results = {}
+        for name in available:
+            service.load_model(name)
+            stats = timed(lambda: service.transcribe_audio(audio, name, language="en"),
+                          runs=1 if self.quick else 3)
+            stats["realtime_factor"] = self.audio_seconds / stats["p50_s"]
+            results[name] = stats
+        service.shutdown()
+        return {"models": results, "audio_seconds": self.audio_seconds}
+
+    def bench_segmentation(self) -> Dict[str, Any]:
+        transcript = synthetic_transcript(600 if self.quick else 3600)
+        strategies = {
+            strategy: timed(lambda strategy=strategy: segment_transcript(
+                transcript, "https://www.youtube.com/watch?v=fixture0001", strategy=strategy), self.runs)
+            for strategy in STRATEGIES
+        }
+
+        service = WhisperTranscriptionService()
+        scaling = {}
+        for seconds in (QUICK_SCALING_SECONDS if self.quick else SCALING_SECONDS):
+            long_transcript = synthetic_transcript(seconds)
+            stats = timed(lambda: service.create_segments(long_transcript), self.runs)
+            stats["words"] = sum(len(segment["words"]) for segment in long_transcript["segments"])
+            scaling[str(seconds)] = stats
+        service.shutdown()
+        return {"transcript_seconds": transcript["duration"], "strategies": strategies,
+                "create_segments_scaling": scaling}
+
+    def bench_serialization(self) -> Dict[str, Any]:
+        transcript = synthetic_transcript(600 if self.quick else 3600)
+        result = {
+            "success": True,
+            "video_id": "fixture0001",
+            "transcript": transcript,
+            "segments": segment_transcript(transcript, "https://www.youtube.com/watch?v=fixture0001"),
+        }
+        formats = {"json": lambda: json.dumps(result).encode("utf-8")}
+        formats["columnar_gzip"] = lambda: wire_format.encode(wire_format.compact_result(result),
+                                                              wire_format.COLUMNAR_JSON_TYPE)[0]
+        if wire_format.msgpack is not None:
+            formats["msgpack"] = lambda: wire_format.encode(wire_format.compact_result(result),
+                                                            wire_format.MSGPACK_TYPES[0])[0]
+
+        report = {}
+        for name, encode in formats.items():
+            stats = timed(encode, self.runs)
+            stats["bytes"] = len(encode())
+            report[name] = stats
+        if wire_format.msgpack is None:
+            report["msgpack"] = skipped("msgpack not installed")
+        return report
+
+    def bench_throughput(self) -> Dict[str, Any]:
+        """Jobs per second through the JobManager pipeline at several worker counts.
+
+        Inference is simulated unless a cached model is available. Streaming
+        mode needs ffmpeg; without it the download + decode path is used
+        with the decode stage served from the fixture's PCM.
+        """
+        models = cached_whisper_models(self.models[:1])
+        whisper = WhisperTranscriptionService() if models else SimulatedWhisper()
+        model = models[0] if models else "tiny"
+        jobs = 4 if self.quick else 12
+        seconds = min(self.audio_seconds, 10.0)
+        for i in range(jobs):
+            self.server.add_video(f"thruput{i:04d}", seconds, seed=i)
+
+        report = {"inference": "whisper" if models else "simulated", "jobs": jobs,
+                  "audio_seconds_per_job": seconds, "workers": {}}
+        for workers in self.concurrency:
+            youtube = self._youtube_service(f"throughput{workers}")
+            if not self.has_ffmpeg:
+                # Let the decode stage read WAV fixtures without ffmpeg
+                youtube.decode_audio = lambda path, video_id=None: _read_wav(path)
+            cache = TranscriptCache(str(self.work_dir / f"transcripts-{workers}.db"))
+            manager = JobManager(youtube, whisper, download_workers=workers, decode_workers=workers,
+                                 transcription_workers=workers, transcript_cache=cache,
+                                 stream_audio=self.has_ffmpeg)
+            start = time.perf_counter()
+            submitted = [manager.submit(f"https://www.youtube.com/watch?v=thruput{i:04d}", model)
+                         for i in range(jobs)]
+            latencies = []
+            for job in submitted:
+                job.future.result(timeout=600)
+                latencies.append(job.finished_at - job.created_at)
+            elapsed = time.perf_counter() - start
+            manager.shutdown()
+            failed = [job.error for job in submitted if job.error]
+            report["workers"][str(workers)] = {
+                "elapsed_s": elapsed,
+                "jobs_per_s": jobs / elapsed,
+                "audio_seconds_per_s": jobs * seconds / elapsed,
+                "latency_p50_s": statistics.median(latencies),
+                "latency_max_s": max(latencies),
+                "failed": len(failed),
+            }
+        return report
+
+    def _fixture_audio(self) -> np.ndarray:
+        path = self.server.directory / "fixture0001.wav"
+        return decode_audio(str(path)) if self.has_ffmpeg else _read_wav(str(path))
+
+
+def _read_wav(path: str) -> np.ndarray:
+    """Read a 16-bit mono fixture WAV without ffmpeg."""
+    import wave
+    with wave.open(path, "rb") as source:
+        frames = source.readframes(source.getnframes())
+    return np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+
+
+STAGES = ("download", "decode", "model_load", "inference", "segmentation", "serialization", "throughput")
+
+
+def collect_metadata(quick: bool, audio_seconds: float) -> Dict[str, Any]:
+    """Describe the commit and machine a report was produced on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "ffmpeg": shutil.which("ffmpeg") is not None,
+        "quick": quick,
+        "audio_seconds": audio_seconds,
+        "sample_rate": SAMPLE_RATE,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--output", "-o", default="benchmarks/results/latest.json",
+                        help="Where to write the JSON report")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="Stages to run (default: all)")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"],
+                        help="Whisper model sizes for model load and inference")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4],
+                        help="Worker counts for the throughput stage")
+    parser.add_argument("--audio-seconds", type=float, default=60.0, help="Length of the fixture video")
+    parser.add_argument("--quick", action="store_true", help="Fewer runs and shorter inputs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    # The services log every download and job; keep the report output readable
+    logging.getLogger("services").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="yt-bench-") as work_dir:
+        runner = BenchmarkRunner(Path(work_dir), quick=args.quick, models=args.models,
+                                 concurrency=args.concurrency, audio_seconds=args.audio_seconds)
+        report = runner.run(args.stages)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.info(f"Wrote benchmark report to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
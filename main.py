@@ -1,23 +1,39 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import json
 import logging
+import os
 import time
+import tempfile
 from contextlib import asynccontextmanager
-import uvicorn
+from typing import Optional
 from services.youtube_audio import YouTubeAudioService
-from services.whisper_service import WhisperTranscriptionService
+from services.whisper_service import WhisperTranscriptionService, load_shared_models
+from services.job_manager import JobManager
+from services.job_store import JobStore
+from services.transcript_cache import TranscriptCache
+from services.segmentation import segment_transcript
+from services import wire_format, metrics
 from models.youtube import (
     YouTubeURLRequest, 
     AudioDownloadResponse, 
     VideoInfoResponse,
     TranscriptionRequest,
     TranscriptionResponse,
+    BatchTranscriptionRequest,
     WhisperModelsResponse,
     VideoInfoRequest,
     AudioDownloadRequest,
     ModelsResponse,
-    HealthResponse
+    HealthResponse,
+    ReadinessResponse,
+    JobResponse,
+    JobStatusResponse,
+    SegmentationOptions,
+    SegmentsResponse
 )
 
 # Configure logging
@@ -27,19 +43,98 @@ logger = logging.getLogger(__name__)
 # Global services
 youtube_service = None
 whisper_service = None
+job_manager = None
+transcript_cache = None
+
+# Per-process warmup progress reported by /api/ready
+readiness = {"status": "warming", "models": {}, "warmup_time": None, "error": None}
+
+def preload_model_names() -> list:
+    """Models named in WHISPER_PRELOAD_MODELS."""
+    return [name.strip() for name in os.getenv("WHISPER_PRELOAD_MODELS", "").split(",") if name.strip()]
+
+# Converted, memory-mapped checkpoints; used only when WHISPER_WEIGHT_STORE names a directory
+WEIGHT_STORE_DIR = os.getenv("WHISPER_WEIGHT_STORE") or None
+
+# With several API workers, gunicorn imports this module once with --preload
+# and then forks. Loading weights here lets every worker share one copy.
+if int(os.getenv("API_WORKERS", "1")) > 1:
+    load_shared_models(preload_model_names(), weight_store_dir=WEIGHT_STORE_DIR)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup"""
-    global youtube_service, whisper_service
+    global youtube_service, whisper_service, job_manager, transcript_cache
     
     logger.info("Initializing services...")
-    youtube_service = YouTubeAudioService()
-    whisper_service = WhisperTranscriptionService()
+    youtube_service = YouTubeAudioService(
+        cache_max_mb=float(os.getenv("AUDIO_CACHE_MAX_MB", "4096")),
+        cache_max_age=float(os.getenv("AUDIO_CACHE_MAX_AGE", str(3 * 24 * 3600))),
+        ydl_pool_size=int(os.getenv("YTDLP_POOL_SIZE", "4")),
+        info_cache_ttl=float(os.getenv("VIDEO_INFO_TTL", "300")),
+    )
+    whisper_service = WhisperTranscriptionService(
+        memory_budget_mb=int(os.getenv("WHISPER_MEMORY_BUDGET_MB", "4096")),
+        parallel_workers=int(os.getenv("WHISPER_PARALLEL_WORKERS", "0")),
+        long_audio_threshold=float(os.getenv("LONG_AUDIO_THRESHOLD", "600")),
+        batch_size=int(os.getenv("WHISPER_BATCH_SIZE", "1")),
+        batch_wait=float(os.getenv("WHISPER_BATCH_WAIT_MS", "50")) / 1000,
+        weight_store_dir=WEIGHT_STORE_DIR,
+        vad=os.getenv("WHISPER_VAD", "0") == "1"
+    )
+    
+    state_dir = os.path.join(tempfile.gettempdir(), "youtube_transcripts")
+    transcript_cache = TranscriptCache(
+        os.getenv("TRANSCRIPT_CACHE_PATH", os.path.join(state_dir, "transcripts.db")),
+        ttl=float(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600))),
+        max_size_mb=float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "1024")),
+    )
+    job_manager = JobManager(
+        youtube_service,
+        whisper_service,
+        download_workers=int(os.getenv("DOWNLOAD_WORKERS", "2")),
+        decode_workers=int(os.getenv("DECODE_WORKERS", "1")),
+        transcription_workers=int(os.getenv("TRANSCRIPTION_WORKERS", "1")),
+        decode_queue_size=int(os.getenv("DECODE_QUEUE_SIZE", "4")),
+        transcription_queue_size=int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "2")),
+        transcript_cache=transcript_cache,
+        # Shared so any API worker can answer for jobs running in another
+        job_store=JobStore(os.getenv("JOB_STORE_PATH", os.path.join(state_dir, "jobs.db"))),
+        stream_audio=os.getenv("AUDIO_STREAM", "0") == "1",
+    )
+    
+    # Warm up in the background: the server answers /api/health right away
+    # while /api/ready reports 503 until the models are usable
+    warmup_task = asyncio.create_task(warm_up(preload_model_names()))
     
     yield
     
     logger.info("Shutting down services...")
+    warmup_task.cancel()
+    job_manager.shutdown()
+    whisper_service.shutdown()
+    youtube_service.close()
+
+async def warm_up(model_names: list):
+    """Preload models and run a synthetic transcription before reporting ready."""
+    start_time = time.time()
+    try:
+        if model_names:
+            logger.info(f"Warming up Whisper models: {model_names}")
+        synthetic = os.getenv("WHISPER_WARMUP", "1") != "0"
+        models = await run_in_threadpool(whisper_service.warmup, model_names, synthetic)
+        
+        failed = [name for name, result in models.items() if not result["success"]]
+        readiness.update(
+            status="failed" if failed else "ready",
+            models=models,
+            warmup_time=time.time() - start_time,
+            error=f"Warmup failed for: {', '.join(failed)}" if failed else None,
+        )
+    except Exception as e:
+        logger.error(f"Warmup failed: {e}")
+        readiness.update(status="failed", error=str(e), warmup_time=time.time() - start_time)
+    logger.info(f"Warmup finished with status {readiness['status']}")
 
 # Create FastAPI app with a subpath for API
 app = FastAPI(
@@ -61,6 +156,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def segmentation_options(request: TranscriptionRequest) -> dict:
+    """Segmentation settings for a job; empty means fixed 8-second windows."""
+    return request.segmentation.model_dump() if request.segmentation else {}
+
+async def compact_response(payload: dict, media_type: str) -> Response:
+    """Encode a payload in a compact wire format off the event loop."""
+    try:
+        body, headers = await run_in_threadpool(wire_format.encode, payload, media_type)
+    except RuntimeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    return Response(content=body, media_type=media_type, headers=headers)
+
 @app.get("/")
 async def redirect_to_docs():
     """Redirect root to API docs for convenience"""
@@ -73,40 +180,50 @@ async def root():
 
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
-    try:
-        # Quick test of services
-        models = whisper_service.get_available_models()
-        return HealthResponse(
-            status="healthy",
-            message="All services operational",
-            timestamp=time.time(),
-            services={
-                "youtube_downloader": "operational",
-                "whisper_transcriber": "operational",
-                "available_models": len(models)
-            }
-        )
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return HealthResponse(
-            status="unhealthy",
-            message=f"Service error: {str(e)}",
-            timestamp=time.time(),
-            services={}
-        )
+    """Liveness probe: the process is up and serving requests.
+    
+    Use /api/ready to decide whether to route transcription traffic here.
+    """
+    return HealthResponse(
+        status="healthy",
+        message="Service is running",
+        timestamp=time.time(),
+        services={"job_queue": job_manager.get_stats() if job_manager else None}
+    )
+
+@app.get("/api/ready", response_model=ReadinessResponse,
+         responses={503: {"model": ReadinessResponse, "description": "Still warming up or warmup failed"}})
+async def readiness_check():
+    """Readiness probe: 200 once warmup has loaded and exercised every preloaded model, 503 before"""
+    response = ReadinessResponse(ready=readiness["status"] == "ready", **readiness)
+    if not response.ready:
+        return JSONResponse(status_code=503, content=response.model_dump())
+    return response
+
+@app.get("/api/metrics")
+async def prometheus_metrics():
+    """Per-stage timings, cache hit ratios, in-flight jobs and resident models in Prometheus text format.
+    
+    Metrics are per API worker process.
+    """
+    if job_manager is not None:
+        for stage, depth in job_manager.get_stats()["queues"].items():
+            metrics.QUEUE_DEPTH.set(depth, stage=stage)
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/api/models", response_model=ModelsResponse)
 async def get_models():
-    """Get available Whisper models and current default"""
+    """Get available Whisper models, the resident model pool and its hit/miss counts"""
     try:
-        models = whisper_service.get_available_models()
-        current_model = whisper_service.current_model
+        # Both resolve the device and probe torch, which imports it on first use
+        models = await run_in_threadpool(whisper_service.get_available_models)
+        pool = await run_in_threadpool(whisper_service.get_pool_stats)
         
         return ModelsResponse(
             success=True,
-            models=models,
-            current_model=current_model,
+            models=models["models"],
+            current_model=models["current_model"],
+            pool=pool,
             message="Models retrieved successfully"
         )
     except Exception as e:
@@ -119,7 +236,7 @@ async def get_video_info(request: VideoInfoRequest):
     try:
         logger.info(f"Getting video info for: {request.url}")
         
-        video_info = youtube_service.get_video_info(request.url)
+        video_info = await run_in_threadpool(youtube_service.get_video_info, request.url)
         
         return VideoInfoResponse(
             success=True,
@@ -136,79 +253,241 @@ async def download_audio(request: AudioDownloadRequest):
     try:
         logger.info(f"Downloading audio for: {request.url}")
         
-        audio_file = youtube_service.download_audio(request.url)
+        download = await run_in_threadpool(youtube_service.download_audio, request.url)
+        if not download["success"]:
+            raise HTTPException(status_code=500, detail=download["error"])
         
         return AudioDownloadResponse(
             success=True,
-            audio_file=audio_file,
+            audio_file=download["audio_file_path"],
             message="Audio downloaded successfully"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading audio: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to download audio: {str(e)}")
 
 @app.post("/api/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(request: TranscriptionRequest):
-    """Main endpoint: Download YouTube audio and transcribe it"""
-    start_time = time.time()
+async def transcribe_audio(request: TranscriptionRequest, accept: Optional[str] = Header(None)):
+    """Main endpoint: Download YouTube audio and transcribe it
     
+    Send `Accept: application/msgpack` or
+    `Accept: application/vnd.transcript.columnar+json` (gzip'd) to get
+    segments and words as columns instead of a JSON object per word.
+    """
     try:
         logger.info(f"Starting transcription for: {request.url}")
         
-        # Step 1: Download audio
-        logger.info("Downloading audio...")
-        audio_file = youtube_service.download_audio(request.url)
-        
-        # Step 2: Transcribe
-        logger.info(f"Transcribing with model: {request.model}")
-        transcript = whisper_service.transcribe_audio(audio_file, request.model)
+        # Submitting may read the transcript cache and build segments, and
+        # the pipeline runs on the job workers; neither blocks the event loop
+        job = await run_in_threadpool(job_manager.submit, request.url, request.model, request.language,
+                                      segmentation=segmentation_options(request),
+                                      start=request.start, end=request.end)
+        result = await asyncio.wrap_future(job.future)
         
-        # Step 3: Create segments
-        logger.info("Creating segments...")
-        segments = []
-        segment_duration = 8.0  # 8 seconds per segment
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=f"Transcription failed: {result['error']}")
         
-        for i, segment in enumerate(transcript["segments"]):
-            # Calculate which 8-second segment this belongs to
-            segment_start = segment["start"]
-            segment_index = int(segment_start // segment_duration)
-            segment_timestamp = segment_index * segment_duration
-            
-            # Create YouTube link with timestamp
-            base_url = request.url.split('&')[0]  # Remove any existing parameters
-            youtube_link = f"{base_url}&t={int(segment_timestamp)}s"
-            
-            segments.append({
-                "id": segment_index,
-                "start_time": segment_timestamp,
-                "end_time": min(segment_timestamp + segment_duration, transcript.get("duration", segment_timestamp + segment_duration)),
-                "text": segment["text"].strip(),
-                "youtube_link": youtube_link
-            })
+        logger.info(f"Transcription completed in {result['processing_time']:.2f} seconds")
         
-        # Clean up audio file
-        youtube_service.cleanup_audio_file(audio_file)
-        
-        processing_time = time.time() - start_time
-        logger.info(f"Transcription completed in {processing_time:.2f} seconds")
+        media_type = wire_format.negotiate(accept)
+        if media_type:
+            return await compact_response(wire_format.compact_result(result), media_type)
         
         return TranscriptionResponse(
             success=True,
-            transcript=transcript,
-            segments=segments,
-            processing_time=processing_time,
-            message="Transcription completed successfully"
+            transcript=result["transcript"],
+            segments=result["segments"],
+            processing_time=result["processing_time"],
+            cached=result["cached"],
+            transcript_id=result["transcript_id"],
+            message=result["message"]
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
+@app.post("/api/transcribe/stream")
+async def transcribe_audio_stream(request: TranscriptionRequest):
+    """Streaming variant of /api/transcribe using newline-delimited JSON.
+    
+    Emits `status` events as the job moves through the pipeline, a `segment`
+    event for every Whisper segment and a `bucket` event for every segment of
+    the requested segmentation (with its youtube_link) as soon as later audio
+    can no longer change it; the buckets add up to the result's segments.
+    Ends with a `done` event carrying the full result, or an `error` event.
+    """
+    try:
+        logger.info(f"Starting streaming transcription for: {request.url}")
+        job = await run_in_threadpool(job_manager.submit, request.url, request.model, request.language,
+                                      stream=True, segmentation=segmentation_options(request),
+                                      start=request.start, end=request.end)
+    except Exception as e:
+        logger.error(f"Streaming transcription failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    
+    async def event_lines():
+        async for event in job.aiter_events():
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(
+        event_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Job-ID": job.job_id}
+    )
+
+@app.post("/api/batch")
+async def transcribe_batch(request: BatchTranscriptionRequest):
+    """Transcribe a list of videos and/or a whole playlist or channel, streaming NDJSON.
+    
+    Emits a `batch` event with the expanded list of URLs, then an `item`
+    event per video as soon as it finishes (in completion order, with its
+    `index` in the list and the same `result` as /api/jobs), and finally a
+    `done` event with success and failure counts. At most `concurrency`
+    videos of a batch are in the pipeline at once, capped by BATCH_CONCURRENCY.
+    """
+    urls = list(request.urls)
+    playlist = None
+    if request.playlist:
+        playlist = await run_in_threadpool(youtube_service.expand_playlist, request.playlist, request.max_items)
+        if not playlist["success"]:
+            raise HTTPException(status_code=400, detail=playlist["error"])
+        urls.extend(entry["url"] for entry in playlist["entries"])
+    
+    if not urls:
+        raise HTTPException(status_code=400, detail="No videos to transcribe")
+    limit = max(1, int(os.getenv("BATCH_CONCURRENCY", "4")))
+    concurrency = min(request.concurrency or limit, limit)
+    logger.info(f"Starting batch transcription of {len(urls)} videos")
+    
+    async def event_lines():
+        start_time = time.time()
+        succeeded = 0
+        yield json.dumps({"type": "batch", "total": len(urls), "urls": urls,
+                          "playlist": {"id": playlist["playlist_id"], "title": playlist["title"]}
+                          if playlist else None}) + "\n"
+        
+        async for index, job in job_manager.run_batch(
+            urls, request.model, request.language, segmentation=segmentation_options(request),
+            concurrency=concurrency,
+        ):
+            result = job.future.result()
+            succeeded += result["success"]
+            # Results carry whole transcripts; encode them off the event loop
+            yield await run_in_threadpool(json.dumps, {"type": "item", "index": index, "url": job.url,
+                                                       "job_id": job.job_id, "success": result["success"],
+                                                       "result": result}) + "\n"
+        
+        yield json.dumps({"type": "done", "total": len(urls), "succeeded": succeeded,
+                          "failed": len(urls) - succeeded, "processing_time": time.time() - start_time}) + "\n"
+    
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: TranscriptionRequest):
+    """Queue a transcription job and return its ID immediately"""
+    try:
+        job = await run_in_threadpool(job_manager.submit, request.url, request.model, request.language,
+                                      segmentation=segmentation_options(request),
+                                      start=request.start, end=request.end)
+        return JobResponse(
+            success=True,
+            job_id=job.job_id,
+            status=job.status,
+            message="Job queued successfully"
+        )
+    except Exception as e:
+        logger.error(f"Error creating job: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create job: {str(e)}")
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, accept: Optional[str] = Header(None)):
+    """Get the status, progress and result of a transcription job
+    
+    Supports the same compact formats as /api/transcribe via `Accept`.
+    """
+    state = await run_in_threadpool(job_manager.get_job_state, job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    media_type = wire_format.negotiate(accept)
+    if media_type:
+        payload = {"success": True, **state}
+        payload["result"] = wire_format.compact_result(state["result"]) if state["result"] else None
+        return await compact_response(payload, media_type)
+    
+    return JobStatusResponse(success=True, **state)
+
+@app.post("/api/transcripts/{transcript_id}/segments", response_model=SegmentsResponse)
+async def resegment_transcript(transcript_id: str, options: SegmentationOptions):
+    """Re-segment a cached transcript without downloading or transcribing again.
+    
+    `transcript_id` is returned by /api/transcribe and in job results.
+    """
+    cached = await run_in_threadpool(transcript_cache.get, transcript_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Transcript not found or expired: {transcript_id}")
+    
+    video_id = cached.get("video_id")
+    url = f"https://www.youtube.com/watch?v={video_id}" if video_id else None
+    segments = await run_in_threadpool(segment_transcript, cached["transcript"], url, **options.model_dump())
+    
+    return SegmentsResponse(
+        success=True,
+        transcript_id=transcript_id,
+        strategy=options.strategy,
+        segments=segments,
+        message=f"Created {len(segments)} segments"
+    )
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """Get transcript and audio cache sizes and hit/miss counts"""
+    try:
+        transcripts = await run_in_threadpool(transcript_cache.get_stats)
+        audio = await run_in_threadpool(youtube_service.audio_cache.get_stats)
+        return {"success": True, "transcripts": transcripts, "audio": audio}
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get cache stats: {str(e)}")
+
+@app.delete("/api/cache/transcripts")
+async def invalidate_all_transcripts():
+    """Remove every cached transcript"""
+    try:
+        removed = await run_in_threadpool(transcript_cache.invalidate)
+        return {
+            "success": True,
+            "removed": removed,
+            "message": f"Removed {removed} cached transcripts"
+        }
+    except Exception as e:
+        logger.error(f"Error invalidating transcripts: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to invalidate transcripts: {str(e)}")
+
+@app.delete("/api/cache/transcripts/{video_id}")
+async def invalidate_video_transcripts(video_id: str):
+    """Remove cached transcripts for one video, across all models and languages"""
+    try:
+        removed = await run_in_threadpool(transcript_cache.invalidate, video_id)
+        return {
+            "success": True,
+            "removed": removed,
+            "message": f"Removed {removed} cached transcripts for {video_id}"
+        }
+    except Exception as e:
+        logger.error(f"Error invalidating transcripts: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to invalidate transcripts: {str(e)}")
+
 @app.delete("/cleanup")
 async def cleanup_files():
-    """Clean up all downloaded audio files."""
+    """Clean up all downloaded audio files, emptying the audio cache."""
     try:
-        files_cleaned = youtube_service.cleanup_all_files()
+        files_cleaned = await run_in_threadpool(youtube_service.cleanup_all_files)
         return {
             "success": True,
             "files_cleaned": files_cleaned,
@@ -219,4 +498,5 @@ async def cleanup_files():
         raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8555) 
\ No newline at end of file
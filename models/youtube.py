@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, HttpUrl, Field, validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 class VideoInfoRequest(BaseModel):
@@ -88,10 +88,36 @@ class TranscriptSegment(BaseModel):
     confidence: Optional[float] = None
     youtube_link: str  # YouTube URL with timestamp
 
+class SegmentationOptions(BaseModel):
+    """How a transcript is split into timestamped segments."""
+    strategy: Literal["fixed", "sentence", "max_chars", "silence_gap"] = "fixed"
+    segment_duration: float = Field(8.0, gt=0)  # fixed: window length in seconds
+    overlap: float = Field(0.0, ge=0)  # fixed: seconds shared with the previous window
+    max_chars: int = Field(200, gt=0)  # max_chars: character limit per segment
+    silence_gap: float = Field(1.0, gt=0)  # silence_gap: pause that starts a new segment
+    
+    @validator('overlap')
+    def validate_overlap(cls, v, values):
+        """Overlap must leave the windows moving forward."""
+        if 'segment_duration' in values and v >= values['segment_duration']:
+            raise ValueError('overlap must be shorter than segment_duration')
+        return v
+
 class TranscriptionRequest(BaseModel):
     """Request model for transcription operations."""
     url: str
     model: Optional[str] = "small"  # tiny, base, small, medium, large
+    language: Optional[str] = None  # e.g. 'en'; auto-detected when omitted
+    segmentation: Optional[SegmentationOptions] = None  # fixed 8-second windows when omitted
+    start: Optional[float] = Field(None, ge=0)  # seconds into the video; only this section is fetched
+    end: Optional[float] = Field(None, gt=0)  # seconds into the video; timestamps stay video-relative
+    
+    @validator('end')
+    def validate_range(cls, v, values):
+        """The section must not be empty."""
+        if v is not None and values.get('start') is not None and v <= values['start']:
+            raise ValueError('end must be after start')
+        return v
     
     @validator('url')
     def validate_youtube_url(cls, v):
@@ -113,15 +139,73 @@ class TranscriptionRequest(BaseModel):
             raise ValueError(f'model must be one of: {", ".join(valid_models)}')
         return v
 
+class BatchTranscriptionRequest(BaseModel):
+    """Request model for transcribing many videos at once."""
+    urls: List[str] = []
+    playlist: Optional[str] = None  # playlist ID, or a playlist or channel URL
+    max_items: Optional[int] = Field(None, gt=0)  # cap on videos taken from the playlist
+    concurrency: Optional[int] = Field(None, ge=1)  # videos in the pipeline at once; at most BATCH_CONCURRENCY
+    model: Optional[str] = "small"
+    language: Optional[str] = None
+    segmentation: Optional[SegmentationOptions] = None
+    
+    @validator('playlist', always=True)
+    def validate_sources(cls, v, values):
+        """At least one URL or a playlist is required."""
+        if not v and not values.get('urls'):
+            raise ValueError('urls or playlist is required')
+        return v
+    
+    @validator('model')
+    def validate_whisper_model(cls, v):
+        """Validate Whisper model selection."""
+        valid_models = ['tiny', 'base', 'small', 'medium', 'large']
+        if v not in valid_models:
+            raise ValueError(f'model must be one of: {", ".join(valid_models)}')
+        return v
+
 class TranscriptionResponse(BaseModel):
     """Response model for transcription operations."""
     success: bool
     transcript: Optional[Dict[str, Any]] = None
     segments: Optional[List[Dict[str, Any]]] = None
     processing_time: Optional[float] = None
+    cached: Optional[bool] = None  # served from the transcript cache
+    transcript_id: Optional[str] = None  # pass to /api/transcripts/{id}/segments
+    message: Optional[str] = None
+    error: Optional[str] = None
+
+class SegmentsResponse(BaseModel):
+    """Response model for re-segmenting a cached transcript."""
+    success: bool
+    transcript_id: str
+    strategy: str
+    segments: Optional[List[Dict[str, Any]]] = None
     message: Optional[str] = None
     error: Optional[str] = None
 
+class JobResponse(BaseModel):
+    """Response model for job submission."""
+    success: bool
+    job_id: Optional[str] = None
+    status: Optional[str] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    """Response model for job status polling."""
+    success: bool
+    job_id: str
+    url: Optional[str] = None
+    model: Optional[str] = None
+    status: str  # queued, downloading, transcribing, completed, failed
+    progress: float = 0.0  # 0.0 - 1.0
+    created_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
 class WhisperModel(BaseModel):
     """Model for Whisper model information."""
     name: str
@@ -130,6 +214,7 @@ class WhisperModel(BaseModel):
     memory_required: str  # e.g., "~1 GB", "~2 GB"
     relative_speed: float  # relative to base model
     available: bool
+    loaded: Optional[bool] = None  # resident in the model pool
     multilingual: bool
 
 class WhisperModelsResponse(BaseModel):
@@ -145,6 +230,7 @@ class ModelsResponse(BaseModel):
     success: bool
     models: Optional[List[WhisperModel]] = None
     current_model: Optional[str] = None
+    pool: Optional[Dict[str, Any]] = None  # resident models, memory use, hit/miss counts
     message: Optional[str] = None
     error: Optional[str] = None
 
@@ -153,4 +239,12 @@ class HealthResponse(BaseModel):
     status: str
     message: Optional[str] = None
     timestamp: Optional[float] = None
-    services: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+    services: Optional[Dict[str, Any]] = None
+
+class ReadinessResponse(BaseModel):
+    """Response model for the readiness probe."""
+    ready: bool
+    status: str  # warming, ready, failed
+    models: Optional[Dict[str, Any]] = None  # per-model load_time and warmup_time
+    warmup_time: Optional[float] = None
+    error: Optional[str] = None
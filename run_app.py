@@ -12,9 +12,10 @@ import signal
 import os
 from pathlib import Path
 import asyncio
-from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
-import uvicorn
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
 import httpx
 
 # Global process list to track subprocesses
@@ -35,14 +36,27 @@ def signal_handler(sig, frame):
 
 def run_fastapi():
     """Run the FastAPI server on port 8555."""
-    print("🚀 Starting FastAPI server on http://0.0.0.0:8555")
-    try:
-        process = subprocess.Popen([
+    workers = int(os.getenv("API_WORKERS", "1"))
+    print(f"🚀 Starting FastAPI server on http://0.0.0.0:8555 with {workers} worker(s)")
+    if workers > 1:
+        # --preload imports main.py once before forking, so models listed in
+        # WHISPER_PRELOAD_MODELS are loaded once and shared copy-on-write
+        command = [
+            sys.executable, "-m", "gunicorn", "main:app",
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--workers", str(workers),
+            "--bind", "0.0.0.0:8555",
+            "--preload",
+        ]
+    else:
+        command = [
             sys.executable, "-m", "uvicorn", "main:app",
             "--host", "0.0.0.0",
             "--port", "8555",
             "--workers", "1"
-        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        ]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
         
         processes.append(process)
         
@@ -80,57 +94,151 @@ def run_streamlit():
     except Exception as e:
         print(f"❌ Streamlit server error: {e}")
 
+API_UPSTREAM = "http://localhost:8555"
+STREAMLIT_UPSTREAM = "http://localhost:8502"
+STREAMLIT_WS_UPSTREAM = "ws://localhost:8502"
+
+# Headers that describe a single connection and must not be forwarded (RFC 7230 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+}
+
+# Shared upstream client, created once at startup so connections are kept alive
+http_client: httpx.AsyncClient = None
+
+@asynccontextmanager
+async def proxy_lifespan(app: FastAPI):
+    """Open the pooled upstream client for the lifetime of the proxy."""
+    global http_client
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        # No read timeout: transcriptions and NDJSON streams can run for minutes
+        timeout=httpx.Timeout(connect=10.0, read=None, write=None, pool=10.0),
+        follow_redirects=False,
+    )
+    yield
+    await http_client.aclose()
+
 # Create reverse proxy app
-proxy_app = FastAPI(title="YouTube Transcription Proxy")
+proxy_app = FastAPI(title="YouTube Transcription Proxy", lifespan=proxy_lifespan)
+
+def filter_headers(headers, drop=()) -> list:
+    """Remove hop-by-hop headers, including any the Connection header names."""
+    items = list(headers.items())
+    connection_tokens = {
+        token.strip().lower()
+        for name, value in items if name.lower() == "connection"
+        for token in value.split(",")
+    }
+    excluded = HOP_BY_HOP_HEADERS | connection_tokens | set(drop)
+    return [(name, value) for name, value in items if name.lower() not in excluded]
+
+async def forward(request: Request, upstream_url: str) -> Response:
+    """Stream a request to an upstream server and its response back, chunk by chunk.
+    
+    Bodies are never buffered: the request body is streamed from the client
+    and the raw (still encoded) response body is relayed as it arrives. A
+    Server-Timing header reports time spent in the proxy and waiting upstream.
+    """
+    started = time.perf_counter()
+    
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    upstream_request = http_client.build_request(
+        method=request.method,
+        url=upstream_url,
+        headers=filter_headers(request.headers, drop=("host",)),
+        params=request.query_params,
+        content=request.stream() if has_body else None,
+    )
+    
+    sent = time.perf_counter()
+    try:
+        upstream = await http_client.send(upstream_request, stream=True)
+    except httpx.RequestError as e:
+        return JSONResponse(status_code=502, content={"detail": f"Upstream unavailable: {e}"})
+    received = time.perf_counter()
+    
+    headers = filter_headers(upstream.headers)
+    proxy_ms = (sent - started + time.perf_counter() - received) * 1000
+    headers.append(("server-timing", f"proxy;dur={proxy_ms:.2f}, upstream;dur={(received - sent) * 1000:.2f}"))
+    
+    response = StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        background=BackgroundTask(upstream.aclose),
+    )
+    # Replace Starlette's defaults with the upstream headers as-is
+    response.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    return response
 
-@proxy_app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+PROXY_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]
+
+@proxy_app.api_route("/api/{path:path}", methods=PROXY_METHODS)
 async def proxy_api(request: Request, path: str):
     """Proxy API requests to FastAPI server."""
-    url = f"http://localhost:8555/api/{path}"
-    
-    async with httpx.AsyncClient() as client:
-        # Forward the request
-        response = await client.request(
-            method=request.method,
-            url=url,
-            headers=dict(request.headers),
-            content=await request.body(),
-            params=request.query_params
-        )
-        
-        # Return the response
-        return StreamingResponse(
-            iter([response.content]),
-            status_code=response.status_code,
-            headers=dict(response.headers),
-            media_type=response.headers.get("content-type")
+    return await forward(request, f"{API_UPSTREAM}/api/{path}")
+
+@proxy_app.websocket("/_stcore/stream")
+async def proxy_streamlit_websocket(websocket: WebSocket):
+    """Relay Streamlit's WebSocket in both directions."""
+    # Imported on the first connection so it isn't loaded before the servers start
+    from websockets.asyncio.client import connect as ws_connect
+    
+    # Handshake headers Streamlit checks (session cookie, Origin, subprotocols)
+    # are passed on so the upstream sees what a direct connection would send
+    headers = [(name, value) for name, value in websocket.headers.items() if name.lower() == "cookie"]
+    try:
+        upstream = await ws_connect(
+            f"{STREAMLIT_WS_UPSTREAM}/_stcore/stream",
+            origin=websocket.headers.get("origin"),
+            subprotocols=websocket.scope.get("subprotocols") or None,
+            additional_headers=headers,
+            max_size=None,
         )
+    except Exception as e:
+        print(f"❌ Streamlit WebSocket unavailable: {e}")
+        await websocket.close(code=1011)
+        return
+    
+    await websocket.accept(subprotocol=upstream.subprotocol)
+    
+    async def client_to_upstream():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            await upstream.send(message["bytes"] if message.get("bytes") is not None else message["text"])
+    
+    async def upstream_to_client():
+        async for message in upstream:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+    
+    tasks = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+    try:
+        # Either side closing ends the relay
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await upstream.close()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # already closed by the client
 
-@proxy_app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+@proxy_app.api_route("/{path:path}", methods=PROXY_METHODS)
 async def proxy_streamlit(request: Request, path: str = ""):
     """Proxy all other requests to Streamlit server."""
-    url = f"http://localhost:8502/{path}"
-    
-    async with httpx.AsyncClient() as client:
-        # Forward the request
-        response = await client.request(
-            method=request.method,
-            url=url,
-            headers=dict(request.headers),
-            content=await request.body(),
-            params=request.query_params
-        )
-        
-        # Return the response
-        return StreamingResponse(
-            iter([response.content]),
-            status_code=response.status_code,
-            headers=dict(response.headers),
-            media_type=response.headers.get("content-type")
-        )
+    return await forward(request, f"{STREAMLIT_UPSTREAM}/{path}")
 
 def run_proxy():
     """Run the reverse proxy server on port 8501."""
+    import uvicorn
+    
     print("🔄 Starting reverse proxy on http://0.0.0.0:8501")
     uvicorn.run(proxy_app, host="0.0.0.0", port=8501, log_level="info")
 
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "audio_index.db"
+
+
+class AudioCache:
+    """On-disk cache of downloaded audio indexed by video ID.
+
+    Each entry holds the compressed file from yt-dlp and, once decoded, a
+    16 kHz mono PCM copy stored as int16 ``.npy`` next to it, so switching
+    models or languages for a video needs neither network I/O nor ffmpeg.
+    Audio decoded while streaming is stored as PCM only, with no compressed
+    file. Entries unused for longer than ``max_age`` are dropped, and the least
+    recently used ones are evicted once the cache exceeds ``max_size_mb``.
+    Entries used within ``min_retention`` seconds are never evicted, so a
+    file is not removed while a job that just fetched it is still decoding.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 4096,
+                 max_age: float = 3 * 24 * 3600, min_retention: float = 600):
+        """Initialize the audio cache.
+
+        Args:
+            cache_dir: Directory holding the audio files and index
+            max_size_mb: Total size of audio and PCM files before LRU eviction
+            max_age: Seconds since last use after which an entry is dropped
+            min_retention: Seconds after last use during which an entry is kept
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / INDEX_FILENAME
+        self.max_size_mb = max_size_mb
+        self.max_age = max_age
+        self.min_retention = min_retention
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audio (
+                    video_id TEXT PRIMARY KEY,
+                    audio_path TEXT NOT NULL,
+                    pcm_path TEXT,
+                    size_bytes INTEGER NOT NULL,
+                    video_info TEXT,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audio_access ON audio (last_access)")
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached download.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Dict with audio_path, pcm_path and video_info, or None on a miss;
+            audio_path is None for audio that was decoded while streaming
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT audio_path, pcm_path, video_info FROM audio WHERE video_id = ?",
+                (video_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            audio_path, pcm_path, video_info = row
+            # Streamed entries have PCM but no compressed file
+            if not os.path.exists(audio_path or pcm_path or ""):
+                # File was removed behind our back; forget the entry
+                conn.execute("DELETE FROM audio WHERE video_id = ?", (video_id,))
+                return None
+
+            conn.execute("UPDATE audio SET last_access = ? WHERE video_id = ?", (time.time(), video_id))
+
+        return {
+            "audio_path": audio_path or None,
+            "pcm_path": pcm_path if pcm_path and os.path.exists(pcm_path) else None,
+            "video_info": json.loads(video_info) if video_info else None,
+        }
+
+    def put(self, video_id: str, audio_path: str, video_info: Optional[Dict[str, Any]] = None):
+        """Register a downloaded audio file.
+
+        Args:
+            video_id: YouTube video ID
+            audio_path: Path of the downloaded file inside the cache directory
+            video_info: Metadata to return alongside future hits
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO audio VALUES (?, ?, NULL, ?, ?, ?, ?)",
+                (video_id, audio_path, os.path.getsize(audio_path),
+                 json.dumps(video_info) if video_info else None, now, now)
+            )
+        self._evict()
+
+    def load_pcm(self, video_id: str, start_sample: int = 0,
+                 end_sample: Optional[int] = None) -> Optional[np.ndarray]:
+        """Load pre-decoded PCM for a video, or a slice of it.
+
+        Args:
+            video_id: YouTube video ID
+            start_sample: First sample to return
+            end_sample: One past the last sample, or None for the end
+
+        Returns:
+            float32 samples in [-1.0, 1.0], or None if not decoded yet
+        """
+        entry = self.get(video_id)
+        if entry is None or entry["pcm_path"] is None:
+            return None
+
+        # Only the requested slice is read from the mapped file
+        pcm = np.load(entry["pcm_path"], mmap_mode="r")[start_sample:end_sample]
+        return pcm.astype(np.float32) / 32768.0
+
+    def store_pcm(self, video_id: str, audio: np.ndarray):
+        """Store decoded PCM for a cached video as int16.
+
+        Args:
+            video_id: YouTube video ID already present in the cache
+            audio: float32 samples in [-1.0, 1.0]
+        """
+        pcm_path = self._write_pcm(video_id, audio)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE audio SET pcm_path = ?, size_bytes = size_bytes + ? WHERE video_id = ?",
+                (str(pcm_path), pcm_path.stat().st_size, video_id)
+            )
+        self._evict()
+
+    def put_pcm(self, video_id: str, audio: np.ndarray, video_info: Optional[Dict[str, Any]] = None):
+        """Register audio that was decoded straight from the network.
+
+        The entry holds only the int16 PCM; there is no compressed file.
+
+        Args:
+            video_id: YouTube video ID
+            audio: float32 samples in [-1.0, 1.0]
+            video_info: Metadata to return alongside future hits
+        """
+        pcm_path = self._write_pcm(video_id, audio)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO audio VALUES (?, '', ?, ?, ?, ?, ?)",
+                (video_id, str(pcm_path), pcm_path.stat().st_size,
+                 json.dumps(video_info) if video_info else None, now, now)
+            )
+        self._evict()
+
+    def remove(self, video_id: str) -> bool:
+        """Delete a cached video's files and index entry."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT audio_path, pcm_path FROM audio WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM audio WHERE video_id = ?", (video_id,))
+
+        self._unlink(row)
+        return True
+
+    def clear(self) -> int:
+        """Delete every cached file and index entry.
+
+        Returns:
+            Number of files removed
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT audio_path, pcm_path FROM audio").fetchall()
+            conn.execute("DELETE FROM audio")
+
+        return sum(self._unlink(row) for row in rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get entry count and total size."""
+        with self._connect() as conn:
+            entries, decoded, size_bytes = conn.execute(
+                "SELECT COUNT(*), COUNT(pcm_path), COALESCE(SUM(size_bytes), 0) FROM audio"
+            ).fetchone()
+
+        return {
+            "entries": entries,
+            "decoded": decoded,
+            "size_mb": round(size_bytes / 1024 ** 2, 2),
+            "max_size_mb": self.max_size_mb,
+            "max_age": self.max_age,
+        }
+
+    def _evict(self):
+        """Drop stale entries, then least recently used ones over budget."""
+        now = time.time()
+        budget_bytes = self.max_size_mb * 1024 ** 2
+        doomed: List[tuple] = []
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT video_id, audio_path, pcm_path, size_bytes, last_access FROM audio ORDER BY last_access"
+            ).fetchall()
+            total = sum(row[3] for row in rows)
+
+            for video_id, audio_path, pcm_path, size_bytes, last_access in rows:
+                if now - last_access < self.min_retention:
+                    break
+                if total <= budget_bytes and now - last_access <= self.max_age:
+                    break
+                conn.execute("DELETE FROM audio WHERE video_id = ?", (video_id,))
+                doomed.append((audio_path, pcm_path))
+                total -= size_bytes
+
+        for row in doomed:
+            self._unlink(row)
+        if doomed:
+            logger.info(f"Evicted {len(doomed)} videos from the audio cache")
+
+    def _write_pcm(self, video_id: str, audio: np.ndarray) -> Path:
+        """Atomically write samples as an int16 .npy file, returning its path."""
+        pcm_path = self.cache_dir / f"{video_id}.pcm.npy"
+        tmp_path = self.cache_dir / f".{video_id}.pcm.{os.getpid()}.npy"
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        np.save(tmp_path, pcm)
+        os.replace(tmp_path, pcm_path)
+        return pcm_path
+
+    @staticmethod
+    def _unlink(row: tuple) -> int:
+        """Remove an entry's files, returning how many were deleted."""
+        removed = 0
+        for path in row:
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove cached file {path}: {e}")
+        return removed
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
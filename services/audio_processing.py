@@ -0,0 +1,150 @@
+import subprocess
+import tempfile
+import logging
+from typing import Dict, List, Callable, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper models expect 16 kHz mono audio
+SAMPLE_RATE = 16000
+# Samples converted per read from ffmpeg's output (~4 s of audio)
+READ_BLOCK_SAMPLES = 1 << 16
+# Initial buffer when the duration isn't known; it doubles as needed
+UNKNOWN_LENGTH_SECONDS = 60
+
+
+def decode_audio(file_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode an audio file to mono float32 PCM with ffmpeg.
+
+    Args:
+        file_path: Path to any audio/video file ffmpeg can read
+        sample_rate: Target sample rate in Hz
+
+    Returns:
+        1-D float32 array with samples in [-1.0, 1.0]
+    """
+    return stream_decode(file_path, sample_rate=sample_rate)
+
+
+def stream_decode(source: str, sample_rate: int = SAMPLE_RATE, expected_seconds: Optional[float] = None,
+                  headers: Optional[Dict[str, str]] = None,
+                  progress_callback: Optional[Callable[[float], None]] = None,
+                  start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+    """Decode a file or URL to mono float32 PCM, reading ffmpeg's output incrementally.
+
+    Samples are converted block by block into a single float32 buffer sized
+    from the expected duration, so the raw int16 stream is never held in
+    memory as a whole. ffmpeg fetches URLs itself; nothing is written to disk.
+
+    Args:
+        source: File path or http(s) URL ffmpeg can read
+        sample_rate: Target sample rate in Hz
+        expected_seconds: Approximate duration used to size the buffer; it
+            grows if the audio turns out longer
+        headers: HTTP headers sent with a URL source, e.g. yt-dlp's http_headers
+        progress_callback: Optional callable receiving progress (0.0-1.0);
+            only called when expected_seconds is known
+        start: Seconds into the source to start at; ffmpeg seeks, so for
+            URLs only the needed byte ranges are fetched
+        end: Seconds into the source to stop at
+
+    Returns:
+        1-D float32 array with samples in [-1.0, 1.0]
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0"]
+    if source.startswith(("http://", "https://")):
+        cmd += ["-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5"]
+        if headers:
+            cmd += ["-headers", "".join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    if start:
+        cmd += ["-ss", str(start)]
+    if end is not None:
+        cmd += ["-t", str(end - (start or 0.0))]
+    cmd += [
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-",
+    ]
+
+    expected = int(expected_seconds * sample_rate) if expected_seconds else 0
+    audio = np.empty(expected + sample_rate if expected else UNKNOWN_LENGTH_SECONDS * sample_rate, np.float32)
+    block = np.empty(READ_BLOCK_SAMPLES, np.int16)
+    block_bytes = memoryview(block).cast("B")
+    filled = 0
+    carry = 0  # a read can end halfway through a sample
+
+    # stderr goes to a file so a chatty ffmpeg can't fill the pipe and stall
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                count = process.stdout.readinto(block_bytes[carry:])
+                if not count:
+                    break
+                available = carry + count
+                samples = available // 2
+
+                if filled + samples > len(audio):
+                    grown = np.empty(max(2 * len(audio), filled + samples), np.float32)
+                    grown[:filled] = audio[:filled]
+                    audio = grown
+                np.multiply(block[:samples], 1 / 32768.0, out=audio[filled:filled + samples])
+                filled += samples
+
+                carry = available % 2
+                if carry:
+                    block_bytes[0] = block_bytes[available - 1]
+                if progress_callback and expected:
+                    progress_callback(min(filled / expected, 1.0))
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"Failed to decode audio: {stderr.read().decode(errors='ignore')}")
+
+    if filled < len(audio) * 3 // 4:
+        # Don't keep a mostly empty buffer alive behind the view
+        return audio[:filled].copy()
+    return audio[:filled]
+
+
+def find_split_points(audio: np.ndarray, chunk_seconds: float = 30.0, search_seconds: float = 5.0,
+                      sample_rate: int = SAMPLE_RATE, frame_seconds: float = 0.02) -> List[int]:
+    """Choose chunk boundaries at the quietest moment before each chunk limit.
+
+    Splitting in silence rather than at fixed offsets avoids cutting words
+    in half when audio is transcribed chunk by chunk.
+
+    Args:
+        audio: 1-D float32 samples
+        chunk_seconds: Maximum chunk length
+        search_seconds: How far back from each limit to look for silence
+        sample_rate: Sample rate of ``audio``
+        frame_seconds: Energy frame length
+
+    Returns:
+        Sample offsets starting at 0 and ending at len(audio)
+    """
+    chunk = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = max(int(frame_seconds * sample_rate), 1)
+
+    points = [0]
+    position = 0
+    while len(audio) - position > chunk:
+        window_end = position + chunk
+        window_start = max(window_end - search, position + frame)
+        frames = (window_end - window_start) // frame
+
+        # Mean energy per frame, vectorized over the whole search window
+        window = audio[window_start:window_start + frames * frame].reshape(frames, frame)
+        energy = np.square(window).mean(axis=1)
+
+        position = window_start + int(np.argmin(energy)) * frame + frame // 2
+        points.append(position)
+
+    points.append(len(audio))
+    return points
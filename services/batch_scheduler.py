@@ -0,0 +1,167 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Tuple, Hashable
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """Groups 30-second audio windows from concurrent jobs into batched decodes.
+
+    Windows are grouped by model and language. A group is decoded as soon as
+    it holds ``max_batch_size`` windows, or once its oldest window has waited
+    ``max_wait`` seconds, so a lone request is delayed by at most that long.
+    Each caller gets a Future that resolves to its own window's result.
+
+    Within a group, batches are filled round-robin across owners (one per
+    transcription), so a short job's windows don't queue behind every
+    window of a long job submitted earlier.
+    """
+
+    def __init__(self, whisper_service, max_batch_size: int = 8, max_wait: float = 0.05):
+        """Initialize the scheduler and start its worker thread.
+
+        Args:
+            whisper_service: Service exposing decode_batch(model_name, windows, language)
+            max_batch_size: Most windows decoded in one pass
+            max_wait: Seconds a window may wait for others to join its batch
+        """
+        self.whisper_service = whisper_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = {"batches": 0, "windows": 0}
+
+        # (model, language) -> [(queued_at, owner, window, future), ...] in arrival order
+        self._pending: "OrderedDict[Tuple[str, Optional[str]], List[tuple]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, model_name: str, window: np.ndarray, language: Optional[str] = None,
+               owner: Hashable = None) -> Future:
+        """Queue one window of at most 30 seconds for decoding.
+
+        Args:
+            model_name: Whisper model to use
+            window: 16 kHz mono float32 samples
+            language: Language code, or None to detect per window
+            owner: Identifies the transcription the window belongs to; batches
+                take windows from different owners in turn
+
+        Returns:
+            Future resolving to a dict with text, language and segments
+            (timestamps relative to the window start)
+        """
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("Batch scheduler is shut down")
+            self._pending.setdefault((model_name, language), []).append((time.monotonic(), owner, window, future))
+            self._cond.notify()
+        return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch counts and the average batch size."""
+        with self._cond:
+            stats = dict(self.stats)
+            stats["pending"] = sum(len(items) for items in self._pending.values())
+        stats["avg_batch_size"] = round(stats["windows"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def shutdown(self):
+        """Stop the worker thread, failing any windows still queued."""
+        with self._cond:
+            self._running = False
+            pending = [item for items in self._pending.values() for item in items]
+            self._pending.clear()
+            self._cond.notify_all()
+
+        for _, _, _, future in pending:
+            future.set_exception(RuntimeError("Batch scheduler is shut down"))
+        self._thread.join(timeout=5)
+
+    def _next_batch(self) -> Optional[Tuple[Tuple[str, Optional[str]], List[tuple]]]:
+        """Wait until a group is full or its oldest window is due, then take it."""
+        with self._cond:
+            while self._running:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                ready = None
+                earliest = None
+                for key, items in self._pending.items():
+                    due = items[0][0] + self.max_wait
+                    if len(items) >= self.max_batch_size or due <= now:
+                        ready = key
+                        break
+                    earliest = due if earliest is None else min(earliest, due)
+
+                if ready is None:
+                    self._cond.wait(timeout=earliest - now)
+                    continue
+
+                batch, rest = self._take_round_robin(self._pending[ready])
+                if rest:
+                    self._pending[ready] = rest
+                else:
+                    del self._pending[ready]
+                return ready, batch
+        return None
+
+    def _take_round_robin(self, items: List[tuple]) -> Tuple[List[tuple], List[tuple]]:
+        """Split off a batch taking each owner's oldest remaining window in turn.
+
+        Owners are visited in order of their oldest window; the remaining
+        items keep their arrival order.
+        """
+        by_owner: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+        for position, item in enumerate(items):
+            by_owner.setdefault(item[1], []).append(position)
+
+        taken: List[int] = []
+        queues = [iter(positions) for positions in by_owner.values()]
+        while queues and len(taken) < self.max_batch_size:
+            for positions in list(queues):
+                position = next(positions, None)
+                if position is None:
+                    queues.remove(positions)
+                    continue
+                taken.append(position)
+                if len(taken) == self.max_batch_size:
+                    break
+
+        chosen = set(taken)
+        return [items[position] for position in taken], [item for position, item in enumerate(items)
+                                                         if position not in chosen]
+
+    def _run(self):
+        """Decode batches until shut down."""
+        while True:
+            next_batch = self._next_batch()
+            if next_batch is None:
+                return
+
+            (model_name, language), batch = next_batch
+            futures = [future for _, _, _, future in batch]
+            try:
+                results = self.whisper_service.decode_batch(model_name, [window for _, _, window, _ in batch], language)
+            except Exception as e:
+                logger.error(f"Batched decode of {len(batch)} windows failed: {str(e)}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            with self._cond:
+                self.stats["batches"] += 1
+                self.stats["windows"] += len(batch)
+            logger.debug(f"Decoded batch of {len(batch)} windows with model {model_name}")
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
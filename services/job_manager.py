@@ -0,0 +1,732 @@
+import time
+import uuid
+import asyncio
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Callable, Iterator, AsyncIterator, Tuple
+
+from services.audio_processing import SAMPLE_RATE
+from services.segmentation import segment_transcript
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_DOWNLOADING = "downloading"
+JOB_DECODING = "decoding"
+JOB_TRANSCRIBING = "transcribing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED)
+
+# Seconds between keep-alive events on an idle event stream
+HEARTBEAT_INTERVAL = 15.0
+# Minimum seconds between progress-only writes to the shared job store
+PROGRESS_PERSIST_INTERVAL = 1.0
+
+
+class Job:
+    """A single transcription job tracked by the JobManager."""
+
+    def __init__(self, url: str, model: str, language: Optional[str] = None, stream: bool = False,
+                 segmentation: Optional[Dict[str, Any]] = None, start: Optional[float] = None,
+                 end: Optional[float] = None):
+        self.job_id = uuid.uuid4().hex
+        self.url = url
+        self.model = model
+        self.language = language
+        # Section of the video to transcribe, in seconds; None means its start/end
+        self.start = start
+        self.end = end
+        # Keyword arguments for segment_transcript; not part of the cache key
+        self.segmentation = segmentation or {}
+        self.video_id: Optional[str] = None
+        self.cache_key: Optional[str] = None
+        # Identifies identical work: video, model and transcription options
+        self.flight_key: Optional[str] = None
+        # Identical jobs submitted while this one runs; they get its result
+        self.followers: List["Job"] = []
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # When the job was last put on a stage queue, for queue wait metrics
+        self.enqueued_at = self.created_at
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.future: Future = Future()
+        # Incremental events for streaming clients; None for polled jobs
+        self.events: Optional[queue.Queue] = queue.Queue() if stream else None
+        # Set while an async consumer is attached; events go to it instead
+        self._event_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._events_lock = threading.Lock()
+        # Live segmentation preview; set once Whisper streams segments
+        self.bucketer: Optional[StreamingBucketer] = None
+        # (segments, decoded_until) published so far, replayed to streaming
+        # followers that attach late; both guarded by _stream_lock
+        self.streamed: List[Tuple[List[Dict[str, Any]], float]] = []
+        self.stream_followers: List["Job"] = []
+        self._stream_lock = threading.Lock()
+        self.persisted_at = 0.0
+
+    def emit(self, event_type: str, **data):
+        """Publish an event to the streaming client, if any."""
+        if self.events is None:
+            return
+        event = {"type": event_type, **data}
+        with self._events_lock:
+            if self._event_sink is None:
+                self.events.put(event)
+                return
+            try:
+                self._event_sink(event)
+            except RuntimeError:
+                # The consumer's event loop has closed
+                self._event_sink = None
+
+    def iter_events(self, heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[Dict[str, Any]]:
+        """Yield streamed events until the job finishes.
+
+        A heartbeat event is produced whenever nothing happened for
+        ``heartbeat`` seconds, so idle connections are not dropped.
+        """
+        while True:
+            try:
+                event = self.events.get(timeout=heartbeat)
+            except queue.Empty:
+                yield {"type": "heartbeat", "status": self.status, "progress": round(self.progress, 3)}
+                continue
+            yield event
+            if event["type"] in ("done", "error"):
+                return
+
+    async def aiter_events(self, heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of iter_events for use on an event loop.
+
+        Pipeline threads hand events to the loop with call_soon_threadsafe,
+        so waiting for the next event doesn't hold a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        with self._events_lock:
+            # Events emitted before the consumer attached come first
+            while True:
+                try:
+                    events.put_nowait(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            self._event_sink = lambda event: loop.call_soon_threadsafe(events.put_nowait, event)
+
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield {"type": "heartbeat", "status": self.status, "progress": round(self.progress, 3)}
+                    continue
+                yield event
+                if event["type"] in ("done", "error"):
+                    return
+        finally:
+            with self._events_lock:
+                self._event_sink = None
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """Serialize the job state for API responses."""
+        data = {
+            "job_id": self.job_id,
+            "url": self.url,
+            "model": self.model,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+def shift_segments(segments: List[Dict[str, Any]], offset: float) -> List[Dict[str, Any]]:
+    """Copy segments in the transcribe_audio format with every timestamp moved by an offset."""
+    return [
+        dict(segment, start=segment["start"] + offset, end=segment["end"] + offset,
+             words=[dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                    for word in segment.get("words", [])])
+        for segment in segments
+    ]
+
+
+class StreamingBucketer:
+    """Previews the final segmentation while a transcript is still streaming.
+
+    The segments received so far go through segment_transcript with the
+    job's own options, and a group is released once more audio can no
+    longer change it: a fixed window when decoding and speech have both
+    moved past its end, any other group once a later group has started.
+    The rest comes from the final result, so the released groups always
+    add up to its segments.
+    """
+
+    def __init__(self, url: str, segmentation: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self.segmentation = segmentation or {}
+        self.released = 0
+        self._segments: List[Dict[str, Any]] = []
+
+    def add(self, segments: List[Dict[str, Any]], decoded_until: float) -> List[Dict[str, Any]]:
+        """Add newly decoded segments and return the groups that are now final."""
+        self._segments.extend(segments)
+        if not segments:
+            return []
+
+        groups = segment_transcript({"segments": self._segments}, self.url, **self.segmentation)
+        if self.segmentation.get("strategy", "fixed") == "fixed":
+            # Windows are clipped to the last word, so one still open could grow
+            settled_until = min(decoded_until, max(segment["end"] for segment in self._segments))
+            window = self.segmentation.get("segment_duration", 8.0)
+            final = sum(1 for group in groups if group["start_time"] + window <= settled_until)
+        else:
+            final = len(groups) - 1
+        return self._release(groups[:final])
+
+    def finish(self, final_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Release the final result's segments that were not previewed yet."""
+        return self._release(final_segments)
+
+    def _release(self, groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        released = groups[self.released:]
+        self.released = max(self.released, len(groups))
+        return released
+
+
+class JobManager:
+    """Runs transcription jobs through a staged pipeline outside the event loop.
+
+    Each job flows through three stages, each with its own worker threads:
+
+        download -> decode (ffmpeg, 16 kHz mono) -> transcribe (Whisper)
+
+    The queues between stages are bounded, so while one video is being
+    transcribed the next ones are already downloading and decoding, but
+    downloads stall once too many files are waiting on disk or too much
+    decoded audio is waiting in memory.
+
+    With ``stream_audio`` on, the download stage decodes as it fetches
+    (ffmpeg reads the media URL directly) and hands samples straight to
+    the transcription stage, skipping the decode stage and the disk.
+    """
+
+    def __init__(self, youtube_service, whisper_service,
+                 download_workers: int = 2, decode_workers: int = 1,
+                 transcription_workers: int = 1, decode_queue_size: int = 4,
+                 transcription_queue_size: int = 2, job_ttl: float = 3600.0,
+                 transcript_cache=None, job_store=None, stream_audio: bool = False):
+        """Initialize the job manager and start the stage workers.
+
+        Args:
+            youtube_service: YouTubeAudioService instance
+            whisper_service: WhisperTranscriptionService instance
+            download_workers: Number of concurrent audio downloads
+            decode_workers: Number of concurrent ffmpeg decodes
+            transcription_workers: Number of concurrent Whisper transcriptions
+            decode_queue_size: Max downloaded files waiting to be decoded
+            transcription_queue_size: Max decoded clips waiting for Whisper
+            job_ttl: Seconds to keep finished jobs available for polling
+            transcript_cache: Optional TranscriptCache consulted before downloading
+            job_store: Optional JobStore that makes jobs visible to other worker processes
+            stream_audio: Decode audio while downloading instead of writing the
+                compressed file to disk first
+        """
+        self.youtube_service = youtube_service
+        self.whisper_service = whisper_service
+        self.download_workers = download_workers
+        self.decode_workers = decode_workers
+        self.transcription_workers = transcription_workers
+        self.job_ttl = job_ttl
+        self.transcript_cache = transcript_cache
+        self.job_store = job_store
+        self.stream_audio = stream_audio
+        if job_store is not None:
+            job_store.fail_orphans()
+
+        self._jobs: Dict[str, Job] = {}
+        # Running job per flight key, which identical submissions attach to
+        self._inflight: Dict[str, Job] = {}
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        # Intake is unbounded so submission never blocks the event loop;
+        # the inter-stage queues provide backpressure.
+        self._download_queue: queue.Queue = queue.Queue()
+        self._decode_queue: queue.Queue = queue.Queue(maxsize=decode_queue_size)
+        self._transcription_queue: queue.Queue = queue.Queue(maxsize=transcription_queue_size)
+
+        self._threads: List[threading.Thread] = []
+        self._start_stage("download", download_workers, self._download_queue, self._run_download)
+        self._start_stage("decode", decode_workers, self._decode_queue, self._run_decode)
+        self._start_stage("transcription", transcription_workers, self._transcription_queue,
+                          self._run_transcription)
+
+        logger.info(f"Job pipeline started with {download_workers} download, {decode_workers} decode "
+                    f"and {transcription_workers} transcription workers")
+
+    def submit(self, url: str, model: str = "small", language: Optional[str] = None,
+               stream: bool = False, segmentation: Optional[Dict[str, Any]] = None,
+               start: Optional[float] = None, end: Optional[float] = None) -> Job:
+        """Queue a new transcription job and return immediately.
+        
+        Jobs whose transcript is already cached complete before this returns.
+        A job identical to one already running (same video, model and
+        language) doesn't run itself; it follows that job and completes
+        with its transcript, segmented with its own options. A streaming
+        follower gets the segments decoded so far, then live ones.
+
+        Args:
+            url: YouTube URL
+            model: Whisper model name
+            language: Optional language code
+            stream: Publish segments on job.events as they are decoded
+            segmentation: Options for segment_transcript, e.g. {"strategy": "sentence"}
+            start: Seconds into the video to start transcribing at
+            end: Seconds into the video to stop at; timestamps in the result
+                are always relative to the full video
+
+        Returns:
+            The queued Job
+        """
+        self._prune_finished()
+
+        job = Job(url, model, language, stream=stream, segmentation=segmentation, start=start, end=end)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        try:
+            self._start(job)
+        except Exception as e:
+            # A registered job must finish, or it would stay queued and block its flight key
+            logger.error(f"Job {job.job_id} could not be queued: {e}")
+            with self._lock:
+                leader = self._inflight.get(job.flight_key)
+                if leader is not None and job in leader.followers:
+                    leader.followers.remove(job)
+            self._fail(job, f"Failed to queue job: {str(e)}")
+        return job
+
+    def _start(self, job: Job):
+        """Serve a registered job from the cache, attach it to an identical one, or queue it."""
+        self._persist(job)
+
+        validation = self.youtube_service.validate_youtube_url(job.url)
+        if not validation["valid"]:
+            self._fail(job, validation["error"])
+            return
+        job.video_id = validation["video_id"]
+        section = {"start": job.start, "end": job.end} if job.start is not None or job.end is not None else None
+        job.flight_key = f"{job.video_id}:{job.model}:{job.language or 'auto'}:{job.start}:{job.end}"
+
+        if self.transcript_cache is not None:
+            job.cache_key = self.transcript_cache.make_key(job.video_id, job.model, job.language, section)
+            cached = self.transcript_cache.get(job.cache_key)
+            metrics.record_cache("transcript", cached is not None)
+            if cached is not None:
+                logger.info(f"Job {job.job_id} served from transcript cache")
+                self._complete(job, cached["transcript"], cached.get("video_info"), cached=True)
+                return
+
+        with self._lock:
+            leader = self._inflight.get(job.flight_key)
+            if leader is not None:
+                leader.followers.append(job)
+                self.coalesced += 1
+                # Under the lock the leader can't land yet, so this status
+                # can't overwrite the follower's completion
+                job.progress, job.started_at, job.status = leader.progress, leader.started_at, leader.status
+                job.emit("status", status=job.status, progress=round(job.progress, 3))
+                self._persist(job)
+                if job.events is not None:
+                    # Catch up on the leader's segments, then receive new ones as they come
+                    with leader._stream_lock:
+                        for segments, decoded_until in leader.streamed:
+                            self._publish_segments(job, segments, decoded_until)
+                        leader.stream_followers.append(job)
+            else:
+                self._inflight[job.flight_key] = job
+                metrics.JOBS_IN_FLIGHT.set(len(self._inflight))
+        if leader is not None:
+            logger.info(f"Job {job.job_id} attached to in-flight job {leader.job_id}")
+            return
+
+        job.enqueued_at = time.time()
+        self._download_queue.put((job,))
+        logger.info(f"Queued job {job.job_id} for {job.url}")
+
+    async def run_batch(self, urls: List[str], model: str = "small", language: Optional[str] = None,
+                        segmentation: Optional[Dict[str, Any]] = None,
+                        concurrency: int = 4) -> AsyncIterator[Tuple[int, Job]]:
+        """Transcribe many videos, keeping a bounded number of them in the pipeline.
+
+        Jobs are submitted lazily: a new one starts whenever one finishes,
+        so a large batch neither floods the download queue ahead of other
+        clients nor holds more than ``concurrency`` results in progress.
+        Waiting happens on the event loop; only submission uses a thread.
+
+        Args:
+            urls: YouTube URLs, in order
+            model: Whisper model name
+            language: Optional language code
+            segmentation: Options for segment_transcript
+            concurrency: Jobs of this batch allowed to be unfinished at once
+
+        Yields:
+            (index into urls, finished Job) in completion order
+
+        Raises:
+            ValueError: If concurrency is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        pending = iter(enumerate(urls))
+        running: Dict[asyncio.Future, Tuple[int, Job]] = {}
+
+        async def start_next() -> bool:
+            for index, url in pending:
+                job = await asyncio.to_thread(self.submit, url, model, language, segmentation=segmentation)
+                running[asyncio.wrap_future(job.future)] = (index, job)
+                return True
+            return False
+
+        while len(running) < concurrency and await start_next():
+            pass
+
+        while running and not self._stopping.is_set():
+            done, _ = await asyncio.wait(running, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, job = running.pop(future)
+                await start_next()
+                yield index, job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Look up a job owned by this process by ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_job_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's state, including jobs running in other worker processes.
+
+        Returns:
+            Job.to_dict() output, or None if the job is unknown
+        """
+        job = self.get_job(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.job_store is not None:
+            return self.job_store.get(job_id)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker counts, queue depths and job counts by status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+
+        return {
+            "download_workers": self.download_workers,
+            "decode_workers": self.decode_workers,
+            "transcription_workers": self.transcription_workers,
+            "queues": {
+                "download": self._download_queue.qsize(),
+                "decode": self._decode_queue.qsize(),
+                "transcription": self._transcription_queue.qsize(),
+            },
+            "jobs": counts,
+            "in_flight": len(self._inflight),
+            "coalesced": self.coalesced,
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Stop the stage workers; queued jobs are abandoned."""
+        self._stopping.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _start_stage(self, name: str, workers: int, source: queue.Queue, handler: Callable):
+        """Start worker threads that feed items from a queue into a stage handler."""
+        for i in range(workers):
+            thread = threading.Thread(target=self._stage_loop, args=(name, source, handler),
+                                      name=f"{name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _stage_loop(self, name: str, source: queue.Queue, handler: Callable):
+        """Worker loop shared by all stages."""
+        while not self._stopping.is_set():
+            try:
+                item = source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            metrics.QUEUE_WAIT_SECONDS.observe(time.time() - item[0].enqueued_at, stage=name)
+            try:
+                handler(*item)
+            except Exception as e:
+                logger.error(f"Unhandled error in pipeline stage: {e}")
+
+    def _forward(self, target: queue.Queue, item: tuple) -> bool:
+        """Hand an item to the next stage, blocking while that stage is full."""
+        # Time blocked on a full queue counts as waiting for the next stage
+        item[0].enqueued_at = time.time()
+        while not self._stopping.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_download(self, job: Job):
+        """Download stage: fetch audio to disk, or decode it on the fly when streaming."""
+        job.started_at = time.time()
+        self._set_status(job, JOB_DOWNLOADING)
+
+        def on_progress(fraction: float):
+            job.progress = 0.25 * fraction
+            self._persist(job, progress_only=True)
+
+        try:
+            # Sections are always streamed: ffmpeg seeks and fetches only that part
+            if self.stream_audio or job.start is not None or job.end is not None:
+                self._run_stream(job)
+                return
+
+            download = self.youtube_service.download_audio(job.url, progress_callback=on_progress)
+            if not download["success"]:
+                self._fail(job, download["error"])
+                return
+
+            job.progress = 0.25
+            self._forward(self._decode_queue, (job, download))
+        except Exception as e:
+            logger.error(f"Job {job.job_id} download failed: {e}")
+            self._fail(job, f"Failed to download audio: {str(e)}")
+
+    def _run_stream(self, job: Job):
+        """Download stage in streaming mode: decode while fetching, then go straight to Whisper."""
+        def on_progress(fraction: float):
+            job.progress = 0.3 * fraction
+            self._persist(job, progress_only=True)
+
+        fetched = self.youtube_service.stream_audio(job.url, progress_callback=on_progress,
+                                                    start=job.start, end=job.end)
+        if not fetched["success"]:
+            self._fail(job, fetched["error"])
+            return
+
+        job.progress = 0.3
+        audio = fetched.pop("audio")
+        self._forward(self._transcription_queue, (job, fetched, audio))
+
+    def _run_decode(self, job: Job, download: Dict[str, Any]):
+        """Decode stage: convert the downloaded file to 16 kHz mono PCM."""
+        self._set_status(job, JOB_DECODING)
+
+        try:
+            audio = self.youtube_service.decode_audio(download["audio_file_path"], download.get("video_id"))
+            job.progress = 0.3
+            self._forward(self._transcription_queue, (job, download, audio))
+        except Exception as e:
+            logger.error(f"Job {job.job_id} decode failed: {e}")
+            self._fail(job, str(e))
+
+    def _run_transcription(self, job: Job, download: Dict[str, Any], audio):
+        """Transcription stage: run Whisper and build timestamped segments."""
+        self._set_status(job, JOB_TRANSCRIBING)
+        offset = download.get("offset") or 0.0
+        with job._stream_lock:
+            streaming = job.events is not None or bool(job.stream_followers)
+        on_segments = (self._make_segment_streamer(job, len(audio) / SAMPLE_RATE, offset)
+                       if streaming else None)
+
+        try:
+            transcript = self.whisper_service.transcribe_audio(audio, job.model, job.language,
+                                                               on_segments=on_segments)
+            if not transcript["success"]:
+                self._fail(job, transcript["error"])
+                return
+
+            if offset:
+                # Whisper saw only the requested section; put it back on the video's timeline
+                transcript["segments"] = shift_segments(transcript["segments"], offset)
+                transcript["duration"] = offset + len(audio) / SAMPLE_RATE
+
+            job.progress = 0.9
+            if self.transcript_cache is not None:
+                try:
+                    self.transcript_cache.put(job.cache_key, job.video_id, job.model, job.language, {
+                        "video_id": job.video_id,
+                        "transcript": transcript,
+                        "video_info": download.get("video_info"),
+                    })
+                except Exception as e:
+                    logger.warning(f"Could not cache transcript for job {job.job_id}: {e}")
+
+            self._complete(job, transcript, download.get("video_info"))
+        except Exception as e:
+            logger.error(f"Job {job.job_id} transcription failed: {e}")
+            self._fail(job, f"Transcription failed: {str(e)}")
+
+    def _set_status(self, job: Job, status: str):
+        """Move a job to a new stage and tell streaming clients."""
+        job.status = status
+        job.emit("status", status=status, progress=round(job.progress, 3))
+        self._persist(job)
+
+        with self._lock:
+            followers = list(job.followers)
+        for follower in followers:
+            follower.progress, follower.started_at = job.progress, job.started_at
+            self._set_status(follower, status)
+
+    def _persist(self, job: Job, progress_only: bool = False):
+        """Write a job's state to the shared store, throttling progress-only updates."""
+        if self.job_store is None:
+            return
+        now = time.time()
+        if progress_only and now - job.persisted_at < PROGRESS_PERSIST_INTERVAL:
+            return
+        job.persisted_at = now
+        try:
+            self.job_store.save(job.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not persist job {job.job_id}: {e}")
+
+    def _make_segment_streamer(self, job: Job, duration: float, offset: float = 0.0) -> Callable:
+        """Build the on_segments callback that publishes a streaming job's segments.
+
+        Segments go to the job itself and to every streaming follower attached to it.
+
+        Args:
+            job: Streaming job, or a job with streaming followers
+            duration: Seconds of audio being transcribed
+            offset: Seconds into the video where that audio starts
+        """
+        def on_segments(segments: List[Dict[str, Any]], decoded_until: float):
+            job.progress = 0.3 + 0.6 * min(decoded_until / duration, 1.0) if duration else 0.9
+            self._persist(job, progress_only=True)
+            if offset:
+                segments = shift_segments(segments, offset)
+                decoded_until += offset
+
+            with job._stream_lock:
+                job.streamed.append((segments, decoded_until))
+                if job.events is not None:
+                    self._publish_segments(job, segments, decoded_until)
+                for follower in list(job.stream_followers):
+                    follower.progress = job.progress
+                    # A follower's own segmentation options must not fail the leader
+                    try:
+                        self._publish_segments(follower, segments, decoded_until)
+                    except Exception as e:
+                        logger.warning(f"Stopped streaming to job {follower.job_id}: {e}")
+                        job.stream_followers.remove(follower)
+
+        return on_segments
+
+    @staticmethod
+    def _publish_segments(job: Job, segments: List[Dict[str, Any]], decoded_until: float):
+        """Emit decoded segments and the preview buckets they complete to a streaming job."""
+        if job.bucketer is None:
+            job.bucketer = StreamingBucketer(job.url, job.segmentation)
+        for segment in segments:
+            job.emit("segment", segment=segment)
+        for bucket in job.bucketer.add(segments, decoded_until):
+            job.emit("bucket", segment=bucket)
+
+    def _complete(self, job: Job, transcript: Dict[str, Any],
+                  video_info: Optional[Dict[str, Any]], cached: bool = False):
+        """Build the final result and mark a job as completed."""
+        job.result = {
+            "success": True,
+            "video_id": job.video_id,
+            "video_info": video_info,
+            "transcript_id": job.cache_key,
+            "transcript": transcript,
+            "segments": segment_transcript(transcript, job.url, **job.segmentation),
+            "cached": cached,
+            "processing_time": time.time() - job.created_at,
+            "message": "Transcription completed successfully"
+        }
+        if job.events is not None:
+            if job.bucketer is None:
+                # Cached transcripts are replayed to streaming clients in one go
+                job.bucketer = StreamingBucketer(job.url, job.segmentation)
+                for segment in transcript.get("segments", []):
+                    job.emit("segment", segment=segment)
+            for bucket in job.bucketer.finish(job.result["segments"]):
+                job.emit("bucket", segment=bucket)
+
+        job.progress = 1.0
+        job.status = JOB_COMPLETED
+        job.finished_at = time.time()
+        self._persist(job)
+        job.future.set_result(job.result)
+        job.emit("done", result=job.result)
+        logger.info(f"Job {job.job_id} completed in {job.result['processing_time']:.2f} seconds")
+
+        for follower in self._land(job):
+            # A follower's own segmentation options must not fail the leader or the other followers
+            try:
+                self._complete(follower, transcript, video_info, cached=cached)
+            except Exception as e:
+                logger.error(f"Job {follower.job_id} failed to build its result: {e}")
+                self._fail(follower, f"Failed to build result: {str(e)}")
+
+    def _fail(self, job: Job, error: str):
+        """Mark a job as failed and resolve its future."""
+        if job.future.done():
+            logger.warning(f"Job {job.job_id} already finished; ignoring failure: {error}")
+            return
+        job.status = JOB_FAILED
+        job.error = error
+        job.finished_at = time.time()
+        self._persist(job)
+        job.future.set_result({"success": False, "error": error})
+        job.emit("error", error=error)
+
+        for follower in self._land(job):
+            self._fail(follower, error)
+
+    def _land(self, job: Job) -> List[Job]:
+        """Retire a finished job's flight and return the jobs that followed it."""
+        with self._lock:
+            if self._inflight.get(job.flight_key) is job:
+                del self._inflight[job.flight_key]
+                metrics.JOBS_IN_FLIGHT.set(len(self._inflight))
+            followers, job.followers = job.followers, []
+        with job._stream_lock:
+            job.stream_followers = []
+        return followers
+
+    def _prune_finished(self):
+        """Drop finished jobs older than the retention window."""
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINISHED_STATES and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if self.job_store is not None:
+            try:
+                self.job_store.prune(cutoff)
+            except Exception as e:
+                logger.warning(f"Could not prune job store: {e}")
@@ -0,0 +1,139 @@
+import os
+import json
+import zlib
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+from services.job_manager import JOB_QUEUED, JOB_DOWNLOADING, JOB_DECODING, JOB_TRANSCRIBING, JOB_FAILED
+from services.word_table import pack_transcript, unpack_transcript
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED_STATES = (JOB_QUEUED, JOB_DOWNLOADING, JOB_DECODING, JOB_TRANSCRIBING)
+
+
+class JobStore:
+    """Job state shared between API worker processes, stored in SQLite.
+
+    Each worker runs its own pipeline, but a job submitted to one worker
+    may be polled through any other. Workers write job state here as jobs
+    move through the pipeline, and read it back for jobs they don't own.
+    """
+
+    def __init__(self, db_path: str):
+        """Initialize the job store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    error TEXT,
+                    result BLOB,
+                    worker_pid INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)")
+
+    def save(self, state: Dict[str, Any]):
+        """Insert or update a job.
+
+        Args:
+            state: Output of Job.to_dict(), including the result once finished
+        """
+        result = state.get("result")
+        if result and result.get("transcript"):
+            # Segments are stored as columns rather than a dict per word
+            result = dict(result, transcript=pack_transcript(result["transcript"]))
+        data = zlib.compress(json.dumps(result, separators=(",", ":")).encode("utf-8")) if result else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (state["job_id"], state["url"], state["model"], state["status"], state["progress"],
+                 state["created_at"], state["started_at"], state["finished_at"], state["error"],
+                 data, os.getpid())
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a job's state in the Job.to_dict() format, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id, url, model, status, progress, created_at, started_at, finished_at, "
+                "error, result FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        keys = ("job_id", "url", "model", "status", "progress", "created_at",
+                "started_at", "finished_at", "error")
+        state = dict(zip(keys, row[:-1]))
+        state["result"] = json.loads(zlib.decompress(row[-1])) if row[-1] else None
+        if state["result"] and state["result"].get("transcript"):
+            state["result"]["transcript"] = unpack_transcript(state["result"]["transcript"])
+        return state
+
+    def prune(self, finished_before: float) -> int:
+        """Delete jobs that finished before a timestamp."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,)).rowcount
+
+    def fail_orphans(self) -> int:
+        """Mark unfinished jobs whose worker process has exited as failed.
+
+        Returns:
+            Number of jobs marked as failed
+        """
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT job_id, worker_pid FROM jobs WHERE status IN ({placeholders})", UNFINISHED_STATES
+            ).fetchall()
+            orphans = [job_id for job_id, pid in rows if not self._process_alive(pid)]
+            for job_id in orphans:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                    (JOB_FAILED, "Worker process exited before the job finished", time.time(), job_id)
+                )
+
+        if orphans:
+            logger.warning(f"Marked {len(orphans)} jobs from exited workers as failed")
+        return len(orphans)
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        """Check whether a process with this PID exists."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,196 @@
+import bisect
+import threading
+from typing import Dict, List, Tuple, Sequence, Optional
+
+# Served by /api/metrics; the response adds the utf-8 charset
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Metric:
+    """Base for metrics rendered in the Prometheus text exposition format.
+
+    Values are kept per combination of label values. Metrics are
+    per process: with several API workers, each exposes its own.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """Initialize the metric and add it to the registry.
+
+        Args:
+            name: Metric name, e.g. "ytapi_decode_seconds"
+            documentation: HELP text
+            labels: Label names; every update must give a value for each
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, key)) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.label_names:
+            values = [((), 0.0)]
+        return [f"{self.name}{self._labels(key)} {_format(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, set to its current reading."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets, with their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        """Initialize the histogram.
+
+        Args:
+            buckets: Increasing upper bounds; +Inf is added automatically
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then the sum
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(series)) for key, series in self._values.items())
+        if not values and not self.label_names:
+            values = [((), [0] * (len(self.buckets) + 1) + [0.0])]
+
+        lines = []
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format(series[-1])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+REGISTRY: List[Metric] = []
+
+DOWNLOAD_BYTES_PER_SECOND = Histogram(
+    "ytapi_download_bytes_per_second", "Throughput of audio downloads that missed the cache",
+    buckets=(64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6),
+)
+STREAM_DECODE_PCM_BYTES_PER_SECOND = Histogram(
+    "ytapi_stream_decode_pcm_bytes_per_second",
+    "16 kHz int16 PCM produced per second while streaming audio that missed the cache",
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6),
+)
+DECODE_SECONDS = Histogram(
+    "ytapi_decode_seconds", "Time to decode audio to 16 kHz PCM; mode is file or stream",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300), labels=("mode",),
+)
+INFERENCE_REALTIME_FACTOR = Histogram(
+    "ytapi_inference_realtime_factor", "Seconds of audio transcribed per second of inference",
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128), labels=("model",),
+)
+MODEL_LOAD_SECONDS = Histogram(
+    "ytapi_model_load_seconds", "Time to load a Whisper model into the resident pool",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120), labels=("model",),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "ytapi_queue_wait_seconds", "Time a job waited for a pipeline stage worker",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900), labels=("stage",),
+)
+CACHE_REQUESTS = Counter(
+    "ytapi_cache_requests_total", "Cache lookups by cache (audio, pcm, transcript) and result (hit, miss)",
+    labels=("cache", "result"),
+)
+CACHE_HIT_RATIO = Gauge(
+    "ytapi_cache_hit_ratio", "Share of lookups served from each cache since startup", labels=("cache",),
+)
+JOBS_IN_FLIGHT = Gauge(
+    "ytapi_jobs_in_flight", "Distinct transcription jobs running; coalesced duplicates are not counted",
+)
+QUEUE_DEPTH = Gauge(
+    "ytapi_queue_depth", "Jobs waiting in front of each pipeline stage", labels=("stage",),
+)
+RESIDENT_MODELS = Gauge(
+    "ytapi_resident_models", "Whisper models held in the resident pool",
+)
+RESIDENT_MODEL_BYTES = Gauge(
+    "ytapi_resident_model_bytes", "Weight memory used by resident Whisper models",
+)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup and refresh that cache's hit ratio."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+    CACHE_HIT_RATIO.set(hits / (hits + CACHE_REQUESTS.get(cache=cache, result="miss")), cache=cache)
@@ -0,0 +1,181 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple, Iterator
+import numpy as np
+from services.audio_processing import SAMPLE_RATE, find_split_points
+
+logger = logging.getLogger(__name__)
+
+# Chunks never get shorter than this, so boundary effects stay rare
+MIN_CHUNK_SECONDS = 60.0
+# How far back from each chunk limit to search for silence
+SPLIT_SEARCH_SECONDS = 10.0
+# Audio used for language detection when no language is given
+DETECT_SECONDS = 30.0
+
+# Per-process state for pool workers
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """Load a private Whisper model in a pool worker process."""
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name, device="cpu")
+
+
+def _detect_language(audio: np.ndarray) -> str:
+    """Detect the spoken language of a clip in a pool worker."""
+    import whisper
+
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), _worker_model.dims.n_mels)
+    _, probs = _worker_model.detect_language(mel.to(_worker_model.device))
+    return max(probs, key=probs.get)
+
+
+def _transcribe_chunk(audio: np.ndarray, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Transcribe one chunk in a pool worker, returning only picklable essentials."""
+    result = _worker_model.transcribe(audio, **options)
+    return {
+        "text": result["text"],
+        "language": result["language"],
+        "segments": [
+            {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "words": [
+                    {"word": w["word"], "start": w["start"], "end": w["end"],
+                     "probability": w.get("probability", 0.0)}
+                    for w in segment.get("words", [])
+                ],
+            }
+            for segment in result["segments"]
+        ],
+    }
+
+
+class ParallelTranscriber:
+    """Transcribes long audio by fanning silence-split chunks out to worker processes.
+
+    Every worker process loads its own copy of the model, so a pool of N
+    workers needs N times the model's memory. Pools are kept per model and
+    reused between requests; only ``max_pools`` are kept alive at once. A
+    pool still running a request is never stopped: the limit is exceeded
+    until that request finishes, then the least recently used idle pool goes.
+    """
+
+    def __init__(self, workers: int, max_pools: int = 1):
+        """Initialize the parallel transcriber.
+
+        Args:
+            workers: Worker processes per model pool
+            max_pools: Model pools kept alive at the same time
+        """
+        self.workers = workers
+        self.max_pools = max_pools
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        # Per model, in LRU order: the executor and how many requests are using it
+        self._pools: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: np.ndarray, model_name: str,
+                   options: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[float, Dict[str, Any]]]]:
+        """Transcribe audio in parallel chunks.
+
+        Args:
+            audio: 16 kHz mono float32 samples
+            model_name: Whisper model to use
+            options: Options passed to model.transcribe for every chunk
+
+        Returns:
+            Tuple of (summary with text and language, list of
+            (offset_seconds, chunk_result) in timeline order)
+        """
+        with self._borrow_pool(model_name) as pool:
+            return self._transcribe_on(pool, audio, options)
+
+    def _transcribe_on(self, pool: ProcessPoolExecutor, audio: np.ndarray,
+                       options: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[float, Dict[str, Any]]]]:
+        """Split audio into chunks and transcribe them on a worker pool."""
+        duration = len(audio) / SAMPLE_RATE
+
+        # Aim for two chunks per worker so a slow chunk doesn't idle the rest
+        chunk_seconds = max(MIN_CHUNK_SECONDS, duration / (self.workers * 2))
+        boundaries = find_split_points(audio, chunk_seconds, SPLIT_SEARCH_SECONDS)
+
+        options = dict(options)
+        if not options.get("language"):
+            # Fix the language up front so every chunk agrees
+            detect_samples = int(DETECT_SECONDS * SAMPLE_RATE)
+            options["language"] = pool.submit(_detect_language, audio[:detect_samples]).result()
+
+        logger.info(f"Transcribing {duration:.0f}s in {len(boundaries) - 1} chunks "
+                    f"on {self.workers} workers")
+        start_time = time.time()
+
+        futures = [
+            (start / SAMPLE_RATE, pool.submit(_transcribe_chunk, audio[start:end], options))
+            for start, end in zip(boundaries[:-1], boundaries[1:])
+        ]
+        chunks = [(offset, future.result()) for offset, future in futures]
+
+        logger.info(f"Parallel transcription finished in {time.time() - start_time:.2f} seconds")
+        text = " ".join(chunk["text"].strip() for _, chunk in chunks if chunk["text"].strip())
+        return {"text": text, "language": options["language"]}, chunks
+
+    def shutdown(self):
+        """Stop all worker processes."""
+        with self._lock:
+            for pool in self._pools.values():
+                pool["executor"].shutdown(wait=False, cancel_futures=True)
+            self._pools.clear()
+
+    @contextmanager
+    def _borrow_pool(self, model_name: str) -> Iterator[ProcessPoolExecutor]:
+        """Use the worker pool for a model, starting one if needed.
+
+        While borrowed, the pool is not stopped to make room for others.
+        """
+        with self._lock:
+            pool = self._pools.get(model_name)
+            if pool is None:
+                # Spawn rather than fork: forking a process with torch's thread
+                # pools already running can deadlock
+                executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(model_name, self.threads_per_worker),
+                )
+                pool = self._pools[model_name] = {"executor": executor, "users": 0}
+                logger.info(f"Started {self.workers} transcription workers for model {model_name}")
+            self._pools.move_to_end(model_name)
+            pool["users"] += 1
+            self._stop_idle_pools()
+
+        try:
+            yield pool["executor"]
+        finally:
+            with self._lock:
+                pool["users"] -= 1
+                self._stop_idle_pools()
+
+    def _stop_idle_pools(self):
+        """Stop least recently used idle pools beyond max_pools. Must be called with the lock held."""
+        for name in list(self._pools):
+            if len(self._pools) <= self.max_pools:
+                break
+            if self._pools[name]["users"]:
+                continue
+            self._pools.pop(name)["executor"].shutdown(wait=False)
+            logger.info(f"Stopped transcription workers for model {name}")
@@ -0,0 +1,211 @@
+import bisect
+import itertools
+from typing import Dict, List, Any, Optional, Callable
+
+# Segmentation strategies selectable per request
+STRATEGIES = ("fixed", "sentence", "max_chars", "silence_gap")
+
+SENTENCE_ENDINGS = (".", "?", "!", "。", "？", "！")
+
+
+class WordIndex:
+    """Sorted word-time index over a transcript.
+
+    Words are flattened out of the Whisper segments once and kept as
+    parallel start/end arrays, so any time range can be found with two
+    binary searches. The index can be re-windowed at any size or overlap
+    without touching the model again.
+    """
+
+    def __init__(self, segments: List[Dict[str, Any]]):
+        """Build the index.
+
+        Args:
+            segments: Transcript segments with start, end, text and optional
+                word-level timestamps. A segment without words is indexed as
+                a single word spanning the whole segment.
+        """
+        words = []
+        for segment in segments:
+            if segment.get("words"):
+                words.extend(segment["words"])
+            elif segment.get("text", "").strip():
+                words.append({"word": " " + segment["text"].strip(),
+                              "start": segment["start"], "end": segment["end"]})
+
+        words.sort(key=lambda word: word["start"])
+        self.words = words
+        self.starts = [word["start"] for word in words]
+        self.ends = [word["end"] for word in words]
+        # Running maximum of end times: non-decreasing even when a word
+        # ends after the next one starts, so it can be bisected
+        self._max_ends = list(itertools.accumulate(self.ends, max))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def duration(self) -> float:
+        """End time of the last word."""
+        return self._max_ends[-1] if self.words else 0.0
+
+    def range(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Get the words overlapping [start, end).
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+
+        Returns:
+            Words in start-time order
+        """
+        lo = bisect.bisect_right(self._max_ends, start)
+        hi = bisect.bisect_left(self.starts, end)
+        return [self.words[i] for i in range(lo, hi) if self.ends[i] > start]
+
+    def windows(self, window_seconds: float, overlap: float = 0.0,
+                duration: Optional[float] = None, by_start: bool = False) -> List[Dict[str, Any]]:
+        """Group words into fixed windows.
+
+        Args:
+            window_seconds: Window length in seconds
+            overlap: Seconds each window shares with the previous one
+            duration: Timeline length; defaults to the last word's end
+            by_start: Place each word only in the windows containing its
+                start, instead of every window it overlaps
+
+        Returns:
+            Non-empty windows with segment_id (from 1), start_time,
+            end_time, text and words
+        """
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if not 0 <= overlap < window_seconds:
+            raise ValueError("overlap must be at least 0 and shorter than the window")
+
+        total = duration if duration is not None else self.duration
+        step = window_seconds - overlap
+        windows = []
+        window_index = 0
+        while window_index * step < total:
+            window_start = window_index * step
+            window_end = min(window_start + window_seconds, total)
+            window_index += 1
+
+            if by_start:
+                words = self.words[bisect.bisect_left(self.starts, window_start):
+                                   bisect.bisect_left(self.starts, window_end)]
+            else:
+                words = self.range(window_start, window_end)
+            text = "".join(word["word"] for word in words).strip()
+            if not text:
+                continue
+
+            windows.append({
+                "segment_id": len(windows) + 1,
+                "start_time": window_start,
+                "end_time": window_end,
+                "text": text,
+                "words": words,
+            })
+
+        return windows
+
+    def sentences(self) -> List[Dict[str, Any]]:
+        """Group words into sentences, breaking after terminal punctuation."""
+        return self._group(lambda word, _next: word["word"].strip().endswith(SENTENCE_ENDINGS))
+
+    def max_chars(self, max_chars: int) -> List[Dict[str, Any]]:
+        """Group words greedily into runs of at most ``max_chars`` characters.
+
+        A single word longer than the limit still forms its own group.
+        """
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+
+        length = 0
+
+        def should_break(word: Dict[str, Any], next_word: Dict[str, Any]) -> bool:
+            nonlocal length
+            length += len(word["word"])
+            if length + len(next_word["word"]) > max_chars:
+                length = 0
+                return True
+            return False
+
+        return self._group(should_break)
+
+    def silence_gaps(self, min_gap: float) -> List[Dict[str, Any]]:
+        """Group words into runs separated by pauses of at least ``min_gap`` seconds."""
+        return self._group(lambda word, next_word: next_word["start"] - word["end"] >= min_gap)
+
+    def _group(self, should_break: Callable[[Dict[str, Any], Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+        """Split the word sequence wherever should_break(word, next_word) is true."""
+        groups = []
+        first = 0
+        for i, word in enumerate(self.words):
+            is_last = i == len(self.words) - 1
+            if is_last or should_break(word, self.words[i + 1]):
+                words = self.words[first:i + 1]
+                first = i + 1
+                text = "".join(w["word"] for w in words).strip()
+                if text:
+                    groups.append({
+                        "segment_id": len(groups) + 1,
+                        "start_time": words[0]["start"],
+                        "end_time": max(w["end"] for w in words),
+                        "text": text,
+                        "words": words,
+                    })
+        return groups
+
+
+def timestamp_link(url: str, seconds: float) -> str:
+    """Build a YouTube link that starts playback at the given time."""
+    base_url = url.split('&')[0]  # Remove any existing parameters
+    separator = "&" if "?" in base_url else "?"
+    return f"{base_url}{separator}t={int(seconds)}s"
+
+
+def segment_transcript(transcript: Dict[str, Any], url: Optional[str] = None,
+                       strategy: str = "fixed", segment_duration: float = 8.0,
+                       overlap: float = 0.0, max_chars: int = 200,
+                       silence_gap: float = 1.0) -> List[Dict[str, Any]]:
+    """Split a transcript into API segments with YouTube timestamp links.
+
+    Args:
+        transcript: Result from WhisperTranscriptionService.transcribe_audio
+        url: YouTube URL used for the links; links are omitted if None
+        strategy: One of STRATEGIES
+        segment_duration: Window length for the fixed strategy
+        overlap: Window overlap for the fixed strategy
+        max_chars: Character limit for the max_chars strategy
+        silence_gap: Minimum pause that starts a new segment for silence_gap
+
+    Returns:
+        Segments with sequential id, start_time, end_time, text and youtube_link
+    """
+    index = WordIndex(transcript.get("segments", []))
+
+    if strategy == "fixed":
+        groups = index.windows(segment_duration, overlap, duration=transcript.get("duration") or None,
+                               by_start=True)
+    elif strategy == "sentence":
+        groups = index.sentences()
+    elif strategy == "max_chars":
+        groups = index.max_chars(max_chars)
+    elif strategy == "silence_gap":
+        groups = index.silence_gaps(silence_gap)
+    else:
+        raise ValueError(f"Unknown segmentation strategy: {strategy}. Available: {', '.join(STRATEGIES)}")
+
+    return [
+        {
+            "id": i,
+            "start_time": group["start_time"],
+            "end_time": group["end_time"],
+            "text": group["text"],
+            "youtube_link": timestamp_link(url, group["start_time"]) if url else None,
+        }
+        for i, group in enumerate(groups)
+    ]
@@ -0,0 +1,204 @@
+import json
+import zlib
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+from services.word_table import pack_transcript, unpack_transcript
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """Persistent transcript cache stored as compressed JSON in SQLite.
+
+    Entries are keyed on the video ID, Whisper model, language and a hash of
+    any other transcription options, so the same video is only transcribed
+    once per configuration. Entries expire after a TTL, and the least
+    recently used entries are evicted once the cache exceeds its size budget.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 7 * 24 * 3600, max_size_mb: float = 1024):
+        """Initialize the transcript cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl: Seconds an entry stays valid after it was written
+            max_size_mb: Total compressed size allowed before LRU eviction
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_size_mb = max_size_mb
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._stats_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    key TEXT PRIMARY KEY,
+                    video_id TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    language TEXT,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_video ON transcripts (video_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_access ON transcripts (last_access)")
+
+        logger.info(f"Transcript cache at {self.db_path} (ttl={ttl:.0f}s, max={max_size_mb} MB)")
+
+    @staticmethod
+    def make_key(video_id: str, model: str, language: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """Build the cache key for a transcription configuration.
+
+        Args:
+            video_id: YouTube video ID
+            model: Whisper model name
+            language: Language code, or None for auto-detect
+            options: Any other options that change the transcript
+
+        Returns:
+            Hex digest identifying the transcript
+        """
+        options_json = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+        raw = "\x1f".join([video_id, model, language or "", options_json])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Fetch a cached transcript.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            The cached payload, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM transcripts WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE transcripts SET last_access = ? WHERE key = ?", (now, key))
+
+        with self._stats_lock:
+            self.stats["hits" if row is not None else "misses"] += 1
+
+        if row is None:
+            return None
+        payload = json.loads(zlib.decompress(row[0]))
+        if payload.get("transcript"):
+            payload["transcript"] = unpack_transcript(payload["transcript"])
+        return payload
+
+    def put(self, key: str, video_id: str, model: str, language: Optional[str],
+            payload: Dict[str, Any]):
+        """Store a transcript and evict entries beyond the TTL or size budget.
+
+        Args:
+            key: Key from make_key
+            video_id: YouTube video ID, used for invalidation
+            model: Whisper model name
+            language: Language code, or None for auto-detect
+            payload: JSON-serializable transcript data
+        """
+        if payload.get("transcript"):
+            # Segments are stored as columns rather than a dict per word
+            payload = dict(payload, transcript=pack_transcript(payload["transcript"]))
+        data = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, video_id, model, language, now, now, len(data), data)
+            )
+        self._evict()
+
+    def invalidate(self, video_id: Optional[str] = None) -> int:
+        """Remove cached transcripts.
+
+        Args:
+            video_id: Only remove entries for this video; all entries if None
+
+        Returns:
+            Number of entries removed
+        """
+        with self._connect() as conn:
+            if video_id is None:
+                cursor = conn.execute("DELETE FROM transcripts")
+            else:
+                cursor = conn.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+            removed = cursor.rowcount
+
+        logger.info(f"Invalidated {removed} cached transcripts"
+                    + (f" for video {video_id}" if video_id else ""))
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get entry count, size and hit/miss counters."""
+        with self._connect() as conn:
+            entries, size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM transcripts"
+            ).fetchone()
+
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        return {
+            "entries": entries,
+            "size_mb": round(size_bytes / 1024 ** 2, 2),
+            "max_size_mb": self.max_size_mb,
+            "ttl": self.ttl,
+            **stats
+        }
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones over budget."""
+        budget_bytes = self.max_size_mb * 1024 ** 2
+        with self._connect() as conn:
+            expired = conn.execute(
+                "DELETE FROM transcripts WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM transcripts").fetchone()[0]
+            evicted = 0
+            if total > budget_bytes:
+                for key, size_bytes in conn.execute(
+                    "SELECT key, size_bytes FROM transcripts ORDER BY last_access"
+                ).fetchall():
+                    if total <= budget_bytes:
+                        break
+                    conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                    total -= size_bytes
+                    evicted += 1
+
+        if expired or evicted:
+            with self._stats_lock:
+                self.stats["evictions"] += expired + evicted
+            logger.info(f"Evicted {expired} expired and {evicted} least recently used transcripts")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction.
+
+        A connection per operation keeps the cache safe to share between
+        worker threads and processes.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
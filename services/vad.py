@@ -0,0 +1,152 @@
+import bisect
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from services.audio_processing import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Energy frame length
+FRAME_SECONDS = 0.03
+# Frames this far above the quietest 10% of frames count as speech...
+NOISE_MARGIN_DB = 12.0
+# ...provided they are also louder than this absolute level
+MIN_LEVEL_DBFS = -45.0
+# Frames louder than this always count, so audio without pauses isn't
+# mistaken for its own noise floor
+MAX_THRESHOLD_DBFS = -30.0
+# Pauses shorter than this stay inside a speech region
+MIN_SILENCE_SECONDS = 0.6
+# Bursts shorter than this (clicks, breaths) are dropped
+MIN_SPEECH_SECONDS = 0.25
+# Context kept on both sides of each region so word edges aren't clipped
+PAD_SECONDS = 0.2
+# Silence inserted between regions so Whisper hears a pause, not a splice
+JOIN_GAP_SECONDS = 0.3
+# Below this share of skippable audio the pre-pass isn't worth the splicing
+MIN_SKIP_RATIO = 0.1
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """Find regions likely to contain speech from per-frame energy.
+
+    The threshold adapts to the recording: frames must stand out from its
+    noise floor (the 10th percentile of frame energy) by NOISE_MARGIN_DB,
+    within fixed bounds. All steps are vectorized over frames.
+
+    Args:
+        audio: 1-D float32 samples
+        sample_rate: Sample rate of ``audio``
+
+    Returns:
+        Sorted, non-overlapping (start_sample, end_sample) pairs
+    """
+    frame = max(int(FRAME_SECONDS * sample_rate), 1)
+    frames = len(audio) // frame
+    if frames == 0:
+        return []
+
+    energy = np.square(audio[:frames * frame].reshape(frames, frame)).mean(axis=1)
+    level = 10 * np.log10(energy + 1e-10)
+    floor = float(np.percentile(level, 10))
+    threshold = min(max(floor + NOISE_MARGIN_DB, MIN_LEVEL_DBFS), MAX_THRESHOLD_DBFS)
+    voiced = np.concatenate(([0], (level > threshold).astype(np.int8), [0]))
+
+    # Rising and falling edges give each run's first and one-past-last frame
+    edges = np.diff(voiced)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    starts, ends = _merge_gaps(starts, ends, MIN_SILENCE_SECONDS / FRAME_SECONDS)
+    keep = (ends - starts) >= MIN_SPEECH_SECONDS / FRAME_SECONDS
+    starts, ends = starts[keep], ends[keep]
+
+    pad = int(PAD_SECONDS * sample_rate)
+    starts = np.maximum(starts * frame - pad, 0)
+    ends = np.minimum(ends * frame + pad, len(audio))
+    starts, ends = _merge_gaps(starts, ends, 0)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _merge_gaps(starts: np.ndarray, ends: np.ndarray, min_gap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Join consecutive regions separated by less than ``min_gap``."""
+    if len(starts) == 0:
+        return starts, ends
+    split = (starts[1:] - ends[:-1]) >= min_gap
+    return starts[np.concatenate(([True], split))], ends[np.concatenate((split, [True]))]
+
+
+class SpeechTimeline:
+    """Maps between the original audio and its speech regions spliced together.
+
+    Whisper transcribes the compact audio; timestamps in its output are
+    moved back onto the original timeline with ``to_original``.
+    """
+
+    def __init__(self, regions: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE):
+        """Initialize the timeline.
+
+        Args:
+            regions: Speech regions from detect_speech
+            sample_rate: Sample rate the regions are measured in
+        """
+        self.regions = regions
+        self.sample_rate = sample_rate
+        self.gap = int(JOIN_GAP_SECONDS * sample_rate)
+
+        # Where each region starts in the compact audio
+        self.compact_starts: List[int] = []
+        position = 0
+        for start, end in regions:
+            self.compact_starts.append(position)
+            position += end - start + self.gap
+        self.compact_length = max(position - self.gap, 0)
+
+    @classmethod
+    def build(cls, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional["SpeechTimeline"]:
+        """Detect speech and return a timeline, or None if skipping wouldn't help.
+
+        An empty timeline (no regions) means the audio has no speech at all.
+        """
+        regions = detect_speech(audio, sample_rate)
+        speech = sum(end - start for start, end in regions)
+        if len(audio) and speech > (1 - MIN_SKIP_RATIO) * len(audio):
+            return None
+        return cls(regions, sample_rate)
+
+    @property
+    def speech_seconds(self) -> float:
+        """Seconds of original audio kept."""
+        return sum(end - start for start, end in self.regions) / self.sample_rate
+
+    def compact(self, audio: np.ndarray) -> np.ndarray:
+        """Splice the speech regions of ``audio`` together, separated by short silences."""
+        out = np.zeros(self.compact_length, dtype=np.float32)
+        for (start, end), position in zip(self.regions, self.compact_starts):
+            out[position:position + end - start] = audio[start:end]
+        return out
+
+    def to_original(self, seconds: float) -> float:
+        """Map a time in the compact audio to the original audio.
+
+        Times inside an inserted gap map to the end of the preceding region.
+        """
+        if not self.regions:
+            return seconds
+        sample = seconds * self.sample_rate
+        index = max(bisect.bisect_right(self.compact_starts, sample) - 1, 0)
+        start, end = self.regions[index]
+        offset = min(max(sample - self.compact_starts[index], 0), end - start)
+        return (start + offset) / self.sample_rate
+
+    def remap_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Move segments and their words in the transcribe_audio format onto the original timeline."""
+        for segment in segments:
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"])
+            for word in segment.get("words", []):
+                word["start"] = self.to_original(word["start"])
+                word["end"] = self.to_original(word["end"])
+        return segments
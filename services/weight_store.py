@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import inspect
+import logging
+from pathlib import Path
+from typing import Dict, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def mmap_supported() -> bool:
+    """Whether torch can map checkpoints; mmap=True and assign=True arrived in torch 2.1."""
+    import torch
+    return "mmap" in inspect.signature(torch.load).parameters
+
+
+class WeightStore:
+    """Local store of Whisper checkpoints in a memory-mappable layout.
+
+    Official checkpoints are fp16 and must be deserialized and upcast on
+    every load. The store converts each model once to an fp32 state dict
+    saved with torch.save, then maps that file on load: the model is built
+    on the meta device and its parameters are pointed straight at the
+    mapped tensors. Loading becomes page faults on first use, and processes
+    loading the same model share its pages through the OS page cache.
+    Converted files are twice the size of the downloaded checkpoints.
+    """
+
+    def __init__(self, store_dir: str):
+        """Initialize the weight store.
+
+        Args:
+            store_dir: Directory for converted checkpoints
+        """
+        self.store_dir = Path(store_dir).expanduser()
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, model_name: str) -> Path:
+        """Location of a model's converted checkpoint."""
+        return self.store_dir / f"{model_name}.fp32.pt"
+
+    def load(self, model_name: str, device: str = "cpu") -> "whisper.model.Whisper":
+        """Load a model from the store, converting its checkpoint on first use.
+
+        Args:
+            model_name: Whisper model name
+            device: Device to move the model to; weights stay mapped on CPU
+
+        Returns:
+            Whisper model ready for inference
+        """
+        import torch
+        import whisper
+        from whisper.model import ModelDimensions, Whisper
+
+        if not mmap_supported():
+            logger.warning("torch < 2.1 cannot memory-map checkpoints; loading normally")
+            return whisper.load_model(model_name, device=device)
+
+        path = self.path_for(model_name)
+        if not path.exists():
+            self.convert(model_name)
+
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        dims = ModelDimensions(**checkpoint["dims"])
+
+        # Skip allocating and initializing weights that are replaced right away
+        with torch.device("meta"):
+            model = Whisper(dims)
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+
+        # Non-persistent buffers are not in the state dict, so rebuild them
+        mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1)
+        model.decoder.register_buffer("mask", mask, persistent=False)
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+
+        return model.to(device)
+
+    def convert(self, model_name: str) -> Path:
+        """Download a model if needed and write its fp32 state dict to the store.
+
+        Returns:
+            Path of the converted checkpoint
+        """
+        import torch
+        import whisper
+
+        path = self.path_for(model_name)
+        start_time = time.time()
+
+        download_root = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper")
+        checkpoint_file = whisper._download(whisper._MODELS[model_name], download_root, in_memory=False)
+        checkpoint = torch.load(checkpoint_file, map_location="cpu")
+
+        state = {
+            "dims": checkpoint["dims"],
+            "model_state_dict": {name: tensor.float().contiguous()
+                                 for name, tensor in checkpoint["model_state_dict"].items()},
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+
+        logger.info(f"Converted {model_name} to a mappable checkpoint in {time.time() - start_time:.2f} seconds "
+                    f"({path.stat().st_size / 1024 ** 2:.0f} MB)")
+        return path
+
+    def get_stats(self) -> Dict[str, Any]:
+        """List converted models and their sizes.
+
+        mmap_supported is None until torch has been imported by a model load,
+        so reporting stats never pays for that import.
+        """
+        return {
+            "store_dir": str(self.store_dir),
+            "mmap_supported": mmap_supported() if "torch" in sys.modules else None,
+            "models": {
+                path.name.split(".")[0]: round(path.stat().st_size / 1024 ** 2, 1)
+                for path in sorted(self.store_dir.glob("*.fp32.pt"))
+            },
+        }
@@ -1,21 +1,135 @@
 import os
+import gc
 import time
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 from pathlib import Path
-import whisper
-import torch
+import numpy as np
+from services.audio_processing import SAMPLE_RATE, decode_audio, find_split_points
+from services.parallel_transcription import ParallelTranscriber
+from services.batch_scheduler import BatchScheduler
+from services.segmentation import WordIndex
+from services.weight_store import WeightStore
+from services.vad import SpeechTimeline
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
+# Chunk length for incremental transcription; Whisper's own window is 30 s
+STREAM_CHUNK_SECONDS = 30.0
+# Trailing transcript text passed as the prompt for the next chunk
+PROMPT_CHARS = 200
+# Length of the synthetic clip transcribed during warmup
+WARMUP_SECONDS = 2.0
+# Seconds per timestamp token in Whisper's output
+TIME_PRECISION = 0.02
+# Windows judged silent by model.transcribe's rule are dropped from batches
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# torch and whisper take seconds to import, so they are imported inside the
+# functions that need them and the API starts without them. The first
+# transcription or warmup pays for the import instead.
+
+# Models loaded in the parent process before API workers are forked; each
+# worker uses them copy-on-write instead of loading a private copy
+_SHARED_MODELS: Dict[str, Dict[str, Any]] = {}
+
+
+def load_shared_models(model_names: List[str], weight_store_dir: Optional[str] = None):
+    """Load models into memory that forked worker processes will share.
+    
+    Call this in the parent before forking (gunicorn --preload). Pages of
+    the weights are only copied if a worker writes to them, which inference
+    never does, so N workers cost one copy of each model. CPU only: CUDA
+    cannot be used across fork.
+    
+    Args:
+        model_names: Models to load
+        weight_store_dir: Load through a WeightStore in this directory
+    """
+    import torch
+    import whisper
+    
+    if torch.cuda.is_available():
+        logger.warning("Shared model preloading is CPU only; each worker will load its own GPU copy")
+        return
+    
+    # A single thread keeps torch from starting its thread pool in the
+    # parent, which would leave forked children deadlocked
+    store = WeightStore(weight_store_dir) if weight_store_dir else None
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        for name in model_names:
+            if name in _SHARED_MODELS:
+                continue
+            start_time = time.time()
+            model = store.load(name) if store else whisper.load_model(name, device="cpu")
+            load_time = time.time() - start_time
+            metrics.MODEL_LOAD_SECONDS.observe(load_time, model=name)
+            _SHARED_MODELS[name] = {
+                "model": model,
+                "size_bytes": sum(t.numel() * t.element_size()
+                                  for t in itertools.chain(model.parameters(), model.buffers())),
+                "load_time": load_time,
+            }
+            logger.info(f"Loaded shared Whisper model {name} in {_SHARED_MODELS[name]['load_time']:.2f} seconds")
+    finally:
+        torch.set_num_threads(threads)
+    
+    # Move everything loaded so far out of the GC's reach; collections
+    # would otherwise touch every object and copy its page in each worker
+    gc.freeze()
+
+
 class WhisperTranscriptionService:
     """Service for audio transcription using OpenAI Whisper."""
     
-    def __init__(self):
-        """Initialize the Whisper transcription service."""
-        self.model = None
+    def __init__(self, memory_budget_mb: int = 4096, parallel_workers: int = 0,
+                 long_audio_threshold: float = 600.0, batch_size: int = 1,
+                 batch_wait: float = 0.05, weight_store_dir: Optional[str] = None,
+                 vad: bool = False):
+        """Initialize the Whisper transcription service.
+        
+        Args:
+            memory_budget_mb: Weight memory allowed for resident models; least
+                recently used models are evicted once the pool exceeds it
+            parallel_workers: Worker processes for long audio on CPU; each
+                holds its own model copy. 0 or 1 disables parallel mode.
+            long_audio_threshold: Seconds of audio above which parallel mode is used
+            batch_size: Most 30 s windows decoded together across concurrent
+                jobs. 1 disables batching.
+            batch_wait: Seconds a window waits for others to join its batch
+            weight_store_dir: Directory of memory-mapped checkpoints; models
+                load through whisper.load_model when None
+            vad: Transcribe only the speech regions found by an energy-based
+                pre-pass, skipping silence and quiet stretches
+        """
         self.current_model_name = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._device = None
+        self.memory_budget_mb = memory_budget_mb
+        self.weight_store = WeightStore(weight_store_dir) if weight_store_dir else None
+        self.vad = vad
+        
+        # Resident model pool in LRU order (least recently used first)
+        self._models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pool_lock = threading.Lock()
+        self.pool_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        
+        # Long-audio mode fans chunks out to worker processes (CPU only)
+        self.long_audio_threshold = long_audio_threshold
+        self._parallel = None
+        if parallel_workers > 1:
+            self._parallel = ParallelTranscriber(parallel_workers)
+        
+        # Windows from concurrent jobs are decoded together when batching is on
+        self._batcher = None
+        if batch_size > 1:
+            self._batcher = BatchScheduler(self, max_batch_size=batch_size, max_wait=batch_wait)
         
         # Model information
         self.model_info = {
@@ -56,7 +170,19 @@ class WhisperTranscriptionService:
             }
         }
         
-        logger.info(f"Whisper service initialized on device: {self.device}")
+        # One loader per model name so concurrent misses load it only once
+        self._load_locks = {name: threading.Lock() for name in self.model_info}
+        
+        logger.info("Whisper service initialized")
+    
+    @property
+    def device(self) -> str:
+        """Inference device, resolved on first use so torch is imported lazily."""
+        if self._device is None:
+            import torch
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info(f"Whisper service using device: {self._device}")
+        return self._device
     
     def get_available_models(self) -> Dict[str, Any]:
         """Get information about available Whisper models.
@@ -77,6 +203,7 @@ class WhisperTranscriptionService:
                     "memory_required": info["memory_required"],
                     "relative_speed": info["relative_speed"],
                     "available": available,
+                    "loaded": model_name in self._models,
                     "multilingual": info["multilingual"]
                 })
             except Exception as e:
@@ -99,7 +226,7 @@ class WhisperTranscriptionService:
         }
     
     def load_model(self, model_name: str = "base") -> Dict[str, Any]:
-        """Load a Whisper model.
+        """Load a Whisper model into the resident pool.
         
         Args:
             model_name: Name of the model to load (tiny, base, small, medium, large)
@@ -114,21 +241,12 @@ class WhisperTranscriptionService:
             }
         
         try:
-            logger.info(f"Loading Whisper model: {model_name}")
-            start_time = time.time()
-            
-            # Load the model (will download if not cached)
-            self.model = whisper.load_model(model_name, device=self.device)
-            self.current_model_name = model_name
-            
-            load_time = time.time() - start_time
-            logger.info(f"Model {model_name} loaded in {load_time:.2f} seconds")
-            
+            entry = self._acquire_model(model_name)
             return {
                 "success": True,
                 "model_name": model_name,
                 "device": self.device,
-                "load_time": load_time,
+                "load_time": entry["load_time"],
                 "model_info": self.model_info[model_name]
             }
             
@@ -139,29 +257,260 @@ class WhisperTranscriptionService:
                 "error": f"Failed to load model {model_name}: {str(e)}"
             }
     
-    def transcribe_audio(self, audio_file_path: str, model_name: str = "base", 
-                        language: Optional[str] = None) -> Dict[str, Any]:
-        """Transcribe audio file using Whisper.
+    def preload_models(self, model_names: List[str]) -> List[Dict[str, Any]]:
+        """Load several models into the pool ahead of time.
+        
+        Args:
+            model_names: Models to make resident, in order of priority
+            
+        Returns:
+            List of load results, one per model
+        """
+        return [self.load_model(name) for name in model_names]
+    
+    def warmup(self, model_names: List[str], synthetic: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Load models and run a short synthetic transcription through each.
+        
+        The synthetic pass initializes torch kernels and allocator pools so
+        the first real request doesn't pay for them.
+        
+        Args:
+            model_names: Models to warm up
+            synthetic: Also transcribe a short silent clip with each model
+            
+        Returns:
+            Dict mapping model name to success, load_time and warmup_time
+        """
+        results = {}
+        for name in model_names:
+            load = self.load_model(name)
+            if not load["success"]:
+                results[name] = {"success": False, "error": load["error"]}
+                continue
+            
+            results[name] = {"success": True, "load_time": load["load_time"], "warmup_time": None}
+            if synthetic:
+                start_time = time.time()
+                clip = np.zeros(int(WARMUP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+                transcript = self.transcribe_audio(clip, name, language="en", vad=False)
+                results[name]["warmup_time"] = time.time() - start_time
+                if not transcript["success"]:
+                    results[name].update(success=False, error=transcript["error"])
+            
+            logger.info(f"Warmed up model {name}: {results[name]}")
+        return results
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get resident pool contents and hit/miss counters.
+        
+        Returns:
+            Dict containing pool usage and resident models in LRU order
+        """
+        with self._pool_lock:
+            resident = [
+                {
+                    "name": name,
+                    "size_mb": round(entry["size_bytes"] / 1024 ** 2, 1),
+                    "load_time": entry["load_time"],
+                    "loaded_at": entry["loaded_at"],
+                    "last_used": entry["last_used"],
+                    "shared": entry["shared"],
+                }
+                for name, entry in self._models.items()
+            ]
+            used_bytes = sum(entry["size_bytes"] for entry in self._models.values())
+            stats = dict(self.pool_stats)
+        
+        return {
+            "memory_budget_mb": self.memory_budget_mb,
+            "memory_used_mb": round(used_bytes / 1024 ** 2, 1),
+            "resident_models": resident,
+            "batching": self._batcher.get_stats() if self._batcher is not None else None,
+            "weight_store": self.weight_store.get_stats() if self.weight_store is not None else None,
+            **stats
+        }
+    
+    def _touch_model(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Return a resident pool entry and mark it most recently used."""
+        with self._pool_lock:
+            entry = self._models.get(model_name)
+            if entry is not None:
+                self._models.move_to_end(model_name)
+                entry["last_used"] = time.time()
+                self.pool_stats["hits"] += 1
+                self.current_model_name = model_name
+            return entry
+    
+    def _acquire_model(self, model_name: str) -> Dict[str, Any]:
+        """Get a model's pool entry, loading it on a miss."""
+        entry = self._touch_model(model_name)
+        if entry is not None:
+            return entry
+        
+        # Load outside the pool lock so resident models stay usable meanwhile
+        with self._load_locks[model_name]:
+            entry = self._touch_model(model_name)
+            if entry is not None:
+                return entry
+            
+            import whisper
+            
+            shared = _SHARED_MODELS.get(model_name) if self.device == "cpu" else None
+            if shared is not None:
+                # Loaded before fork; adopt it without copying
+                model, size_bytes, load_time = shared["model"], shared["size_bytes"], shared["load_time"]
+                logger.info(f"Using shared Whisper model: {model_name}")
+            else:
+                logger.info(f"Loading Whisper model: {model_name}")
+                start_time = time.time()
+                
+                # Load the model (will download if not cached)
+                if self.weight_store is not None:
+                    model = self.weight_store.load(model_name, device=self.device)
+                else:
+                    model = whisper.load_model(model_name, device=self.device)
+                
+                load_time = time.time() - start_time
+                metrics.MODEL_LOAD_SECONDS.observe(load_time, model=model_name)
+                size_bytes = sum(t.numel() * t.element_size()
+                                 for t in itertools.chain(model.parameters(), model.buffers()))
+                logger.info(f"Model {model_name} loaded in {load_time:.2f} seconds "
+                            f"({size_bytes / 1024 ** 2:.0f} MB)")
+            
+            entry = {
+                "model": model,
+                # Shared models live as long as the parent; evicting frees nothing
+                "shared": shared is not None,
+                # Whisper installs per-call decoder hooks, so one inference per model at a time
+                "lock": threading.Lock(),
+                "size_bytes": size_bytes,
+                "load_time": load_time,
+                "loaded_at": time.time(),
+                "last_used": time.time(),
+            }
+            with self._pool_lock:
+                self.pool_stats["misses"] += 1
+                self._models[model_name] = entry
+                self.current_model_name = model_name
+                self._evict_over_budget(keep=model_name)
+                self._update_pool_gauges()
+            
+            return entry
+    
+    def _evict_over_budget(self, keep: str):
+        """Drop least recently used models until the pool fits the budget.
+        
+        Must be called with the pool lock held. The model named by ``keep``
+        is never evicted, even if it alone exceeds the budget. Models in the
+        middle of an inference are skipped too: their weights stay referenced
+        until it finishes, so evicting them would free nothing yet.
+        """
+        budget_bytes = self.memory_budget_mb * 1024 ** 2
+        used_bytes = sum(entry["size_bytes"] for entry in self._models.values())
+        
+        for name in list(self._models):
+            if used_bytes <= budget_bytes:
+                break
+            entry = self._models[name]
+            if name == keep or entry["shared"] or entry["lock"].locked():
+                continue
+            evicted = self._models.pop(name)
+            used_bytes -= evicted["size_bytes"]
+            self.pool_stats["evictions"] += 1
+            logger.info(f"Evicted Whisper model {name} from pool "
+                        f"({evicted['size_bytes'] / 1024 ** 2:.0f} MB)")
+        
+        if self.device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+    
+    def _update_pool_gauges(self):
+        """Publish the resident pool's size. Must be called with the pool lock held."""
+        metrics.RESIDENT_MODELS.set(len(self._models))
+        metrics.RESIDENT_MODEL_BYTES.set(sum(entry["size_bytes"] for entry in self._models.values()))
+    
+    def transcribe_audio(self, audio: Union[str, np.ndarray], model_name: str = "base", 
+                        language: Optional[str] = None,
+                        on_segments: Optional[Callable[[List[Dict[str, Any]], float], None]] = None,
+                        vad: Optional[bool] = None) -> Dict[str, Any]:
+        """Transcribe audio using Whisper.
         
         Args:
-            audio_file_path: Path to the audio file
+            audio: Path to the audio file, or decoded 16 kHz mono float32 samples
             model_name: Whisper model to use
             language: Optional language code (e.g., 'en', 'es', 'fr')
+            on_segments: Optional callback for incremental results. When given,
+                audio is transcribed in ~30 s chunks split at silence, and the
+                callback receives each chunk's segments and the number of
+                seconds decoded so far.
+            vad: Skip non-speech audio before inference; defaults to the
+                service setting. Timestamps always refer to the original audio.
             
         Returns:
             Dict containing transcription result with timestamps
         """
-        if not os.path.exists(audio_file_path):
+        if isinstance(audio, str) and not os.path.exists(audio):
             return {"success": False, "error": "Audio file not found"}
         
-        # Load model if not loaded or different model requested
-        if self.model is None or self.current_model_name != model_name:
-            load_result = self.load_model(model_name)
-            if not load_result["success"]:
-                return load_result
+        if model_name not in self.model_info:
+            return {
+                "success": False,
+                "error": f"Invalid model name. Available models: {list(self.model_info.keys())}"
+            }
+        
+        vad = self.vad if vad is None else vad
+        chunked = on_segments is not None or self._batcher is not None
+        if isinstance(audio, str) and (chunked or vad or self._parallel is not None):
+            # Chunked modes and the speech pre-pass work on decoded samples
+            try:
+                audio = decode_audio(audio)
+            except Exception as e:
+                logger.error(f"Error decoding audio: {str(e)}")
+                return {"success": False, "error": str(e)}
+        
+        # Length of the audio as given, before any silence is skipped
+        audio_seconds = len(audio) / SAMPLE_RATE if not isinstance(audio, str) else None
+        
+        timeline = SpeechTimeline.build(audio) if vad else None
+        if timeline is not None:
+            logger.info(f"Speech pre-pass kept {timeline.speech_seconds:.1f}s of "
+                        f"{len(audio) / SAMPLE_RATE:.1f}s in {len(timeline.regions)} regions")
+            if not timeline.regions:
+                return {
+                    "success": True,
+                    "text": "",
+                    "language": language,
+                    "segments": [],
+                    "duration": 0.0,
+                    "processing_time": 0.0,
+                    "model_used": model_name,
+                    "device": self.device
+                }
+            audio = timeline.compact(audio)
+            if on_segments is not None:
+                on_segments = self._remapping_callback(on_segments, timeline, audio_seconds)
+        
+        parallel = (not chunked and self._parallel is not None and self.device == "cpu"
+                    and len(audio) / SAMPLE_RATE >= self.long_audio_threshold)
+        
+        # Load model into the pool if it is not resident yet; parallel
+        # workers and the batch scheduler acquire it themselves
+        entry = None
+        if not parallel and self._batcher is None:
+            try:
+                entry = self._acquire_model(model_name)
+            except Exception as e:
+                logger.error(f"Error loading model {model_name}: {str(e)}")
+                return {
+                    "success": False,
+                    "error": f"Failed to load model {model_name}: {str(e)}"
+                }
         
         try:
-            logger.info(f"Transcribing audio: {audio_file_path}")
+            if isinstance(audio, str):
+                logger.info(f"Transcribing audio: {audio}")
+            else:
+                logger.info(f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s of decoded audio")
             start_time = time.time()
             
             # Transcribe with word-level timestamps
@@ -173,39 +522,35 @@ class WhisperTranscriptionService:
             if language:
                 options["language"] = language
             
-            result = self.model.transcribe(audio_file_path, **options)
+            if self._batcher is not None:
+                result = self._transcribe_batched(model_name, audio, language, on_segments)
+                segments = result["segments"]
+            elif on_segments is not None:
+                result = self._transcribe_chunked(entry, audio, options, on_segments)
+                segments = result["segments"]
+            elif parallel:
+                result, chunks = self._parallel.transcribe(audio, model_name, options)
+                segments = self._merge_chunks(chunks)
+            else:
+                with entry["lock"]:
+                    result = entry["model"].transcribe(audio, **options)
+                segments = self._format_segments(result["segments"])
+            
+            if timeline is not None and on_segments is None:
+                # Streamed chunks were remapped on their way to the callback
+                timeline.remap_segments(segments)
             
             processing_time = time.time() - start_time
             logger.info(f"Transcription completed in {processing_time:.2f} seconds")
-            
-            # Extract segments with word-level timestamps
-            segments = []
-            for segment in result["segments"]:
-                segment_data = {
-                    "id": segment["id"],
-                    "start": segment["start"],
-                    "end": segment["end"],
-                    "text": segment["text"].strip(),
-                    "words": []
-                }
-                
-                # Add word-level timestamps if available
-                if "words" in segment:
-                    for word in segment["words"]:
-                        segment_data["words"].append({
-                            "word": word["word"],
-                            "start": word["start"],
-                            "end": word["end"],
-                            "probability": word.get("probability", 0.0)
-                        })
-                
-                segments.append(segment_data)
+            if audio_seconds and processing_time > 0:
+                metrics.INFERENCE_REALTIME_FACTOR.observe(audio_seconds / processing_time, model=model_name)
             
             return {
                 "success": True,
                 "text": result["text"].strip(),
                 "language": result["language"],
                 "segments": segments,
+                "duration": segments[-1]["end"] if segments else 0.0,
                 "processing_time": processing_time,
                 "model_used": model_name,
                 "device": self.device
@@ -218,13 +563,252 @@ class WhisperTranscriptionService:
                 "error": f"Transcription failed: {str(e)}"
             }
     
+    @staticmethod
+    def _remapping_callback(on_segments: Callable[[List[Dict[str, Any]], float], None],
+                            timeline: SpeechTimeline,
+                            total_seconds: float) -> Callable[[List[Dict[str, Any]], float], None]:
+        """Wrap an on_segments callback so it sees original-audio timestamps.
+        
+        The last chunk reports ``total_seconds`` as decoded, since silence
+        after the last speech region maps to nowhere on the compact timeline.
+        """
+        compact_seconds = timeline.compact_length / timeline.sample_rate
+        def remapped(segments: List[Dict[str, Any]], decoded_until: float):
+            if decoded_until >= compact_seconds:
+                decoded_until = total_seconds
+            else:
+                decoded_until = timeline.to_original(decoded_until)
+            on_segments(timeline.remap_segments(segments), decoded_until)
+        return remapped
+    
+    def _transcribe_chunked(self, entry: Dict[str, Any], audio: np.ndarray, options: Dict[str, Any],
+                            on_segments: Callable[[List[Dict[str, Any]], float], None]) -> Dict[str, Any]:
+        """Transcribe audio chunk by chunk, reporting segments as each chunk finishes.
+        
+        The model lock is taken per chunk, so other jobs using the same model
+        can interleave with a long streaming transcription.
+        """
+        segments: List[Dict[str, Any]] = []
+        texts: List[str] = []
+        language = options.get("language")
+        
+        boundaries = find_split_points(audio, STREAM_CHUNK_SECONDS)
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            chunk_options = dict(options)
+            if language:
+                # Detect once, then keep every chunk in the same language
+                chunk_options["language"] = language
+            if texts:
+                chunk_options["initial_prompt"] = " ".join(texts)[-PROMPT_CHARS:]
+            
+            with entry["lock"]:
+                result = entry["model"].transcribe(audio[start:end], **chunk_options)
+            language = language or result["language"]
+            
+            chunk_segments = self._format_segments(result["segments"], start / SAMPLE_RATE, len(segments))
+            segments.extend(chunk_segments)
+            if result["text"].strip():
+                texts.append(result["text"].strip())
+            
+            on_segments(chunk_segments, end / SAMPLE_RATE)
+        
+        return {"text": " ".join(texts), "language": language, "segments": segments}
+    
+    def _transcribe_batched(self, model_name: str, audio: np.ndarray, language: Optional[str],
+                            on_segments: Optional[Callable[[List[Dict[str, Any]], float], None]]
+                            ) -> Dict[str, Any]:
+        """Transcribe audio as 30 s windows queued on the batch scheduler.
+        
+        All windows are submitted up front, so a single long job fills a batch
+        by itself. With several jobs queued, batches take windows from each
+        job in turn, so a short job isn't stuck behind a long one. Windows are
+        decoded independently, without the previous window's text as prompt.
+        """
+        boundaries = find_split_points(audio, STREAM_CHUNK_SECONDS)
+        windows = list(zip(boundaries[:-1], boundaries[1:]))
+        owner = object()
+        futures = [self._batcher.submit(model_name, audio[start:end], language, owner=owner)
+                   for start, end in windows]
+        
+        segments: List[Dict[str, Any]] = []
+        texts: List[str] = []
+        detected = language
+        for (start, end), future in zip(windows, futures):
+            result = future.result()
+            detected = detected or result["language"]
+            
+            chunk_segments = self._format_segments(result["segments"], start / SAMPLE_RATE, len(segments))
+            segments.extend(chunk_segments)
+            if result["text"]:
+                texts.append(result["text"])
+            
+            if on_segments is not None:
+                on_segments(chunk_segments, end / SAMPLE_RATE)
+        
+        return {"text": " ".join(texts), "language": detected, "segments": segments}
+    
+    def decode_batch(self, model_name: str, windows: List[np.ndarray],
+                     language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Decode up to 30 s windows in a single batched encoder/decoder pass.
+        
+        Args:
+            model_name: Whisper model to use
+            windows: 16 kHz mono float32 samples, each at most 30 s long
+            language: Language code, or None to detect per window
+            
+        Returns:
+            One dict per window with text, language and segments carrying
+            word timestamps relative to the window start
+        """
+        import torch
+        import whisper
+        
+        entry = self._acquire_model(model_name)
+        model = entry["model"]
+        
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels)
+            for window in windows
+        ]).to(model.device)
+        options = whisper.DecodingOptions(
+            task="transcribe",
+            language=language,
+            temperature=0.0,
+            without_timestamps=False,
+            fp16=self.device == "cuda",
+        )
+        
+        outputs = []
+        with entry["lock"]:
+            results = whisper.decode(model, mels, options)
+            
+            for window, mel, result in zip(windows, mels, results):
+                if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                    outputs.append({"text": "", "language": result.language, "segments": []})
+                    continue
+                
+                tokenizer = whisper.tokenizer.get_tokenizer(
+                    model.is_multilingual, num_languages=model.num_languages,
+                    language=result.language, task="transcribe"
+                )
+                segments = self._split_timestamp_tokens(result.tokens, tokenizer, len(window) / SAMPLE_RATE)
+                if segments:
+                    # Word alignment runs per window; it is one extra decoder pass
+                    whisper.timing.add_word_timestamps(
+                        segments=segments, model=model, tokenizer=tokenizer, mel=mel,
+                        num_frames=len(window) // whisper.audio.HOP_LENGTH,
+                        last_speech_timestamp=0.0,
+                    )
+                
+                outputs.append({
+                    "text": result.text.strip(),
+                    "language": result.language,
+                    "segments": segments,
+                })
+        
+        return outputs
+    
+    @staticmethod
+    def _split_timestamp_tokens(tokens: List[int], tokenizer, window_seconds: float) -> List[Dict[str, Any]]:
+        """Split decoded tokens into segments at Whisper's timestamp tokens."""
+        segments = []
+        current: List[int] = []
+        start = 0.0
+        for token in tokens:
+            if token < tokenizer.timestamp_begin:
+                current.append(token)
+                continue
+            
+            timestamp = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if current:
+                segments.append({"seek": 0, "start": start, "end": timestamp,
+                                 "tokens": current, "text": tokenizer.decode(current)})
+                current = []
+            start = timestamp
+        
+        if current:
+            # Output cut off before a closing timestamp
+            segments.append({"seek": 0, "start": start, "end": window_seconds,
+                             "tokens": current, "text": tokenizer.decode(current)})
+        return [segment for segment in segments if segment["text"].strip()]
+    
+    @staticmethod
+    def _format_segments(raw_segments: List[Dict[str, Any]], offset: float = 0.0,
+                         first_id: int = 0) -> List[Dict[str, Any]]:
+        """Convert Whisper segments to the API format, shifting them by an offset.
+        
+        Args:
+            raw_segments: Segments from model.transcribe
+            offset: Seconds to add to every timestamp
+            first_id: ID assigned to the first segment
+            
+        Returns:
+            List of segments with word-level timestamps
+        """
+        segments = []
+        for i, segment in enumerate(raw_segments):
+            segment_data = {
+                "id": first_id + i,
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+                "text": segment["text"].strip(),
+                "words": []
+            }
+            
+            # Add word-level timestamps if available
+            for word in segment.get("words", []):
+                segment_data["words"].append({
+                    "word": word["word"],
+                    "start": word["start"] + offset,
+                    "end": word["end"] + offset,
+                    "probability": word.get("probability", 0.0)
+                })
+            
+            segments.append(segment_data)
+        
+        return segments
+    
+    @classmethod
+    def _merge_chunks(cls, chunks: List[Tuple[float, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Join separately transcribed chunks into one segment list.
+        
+        Each chunk is shifted onto the global timeline and its segments are
+        renumbered. Whisper sometimes repeats the last words before a split
+        at the start of the next chunk; a segment that overlaps the previous
+        one and has the same text is dropped.
+        
+        Args:
+            chunks: (offset_seconds, chunk_result) pairs in timeline order
+            
+        Returns:
+            List of segments with word-level timestamps
+        """
+        segments = []
+        for offset, chunk in chunks:
+            for segment in cls._format_segments(chunk["segments"], offset):
+                previous = segments[-1] if segments else None
+                if (previous is not None and segment["start"] < previous["end"]
+                        and segment["text"].lower() == previous["text"].lower()):
+                    continue
+                segment["id"] = len(segments)
+                segments.append(segment)
+        return segments
+    
+    def shutdown(self):
+        """Stop the batch scheduler and parallel transcription workers, if any."""
+        if self._batcher is not None:
+            self._batcher.shutdown()
+        if self._parallel is not None:
+            self._parallel.shutdown()
+    
     def create_segments(self, transcription_result: Dict[str, Any], 
-                       segment_duration: int = 8) -> List[Dict[str, Any]]:
+                       segment_duration: float = 8, overlap: float = 0.0) -> List[Dict[str, Any]]:
         """Create fixed-duration segments from transcription result.
         
         Args:
             transcription_result: Result from transcribe_audio
             segment_duration: Duration of each segment in seconds
+            overlap: Seconds each segment shares with the previous one
             
         Returns:
             List of segments with fixed duration
@@ -233,50 +817,7 @@ class WhisperTranscriptionService:
             return []
         
         segments = transcription_result["segments"]
-        fixed_segments = []
-        current_segment_id = 1
-        
-        # Get the total duration from the last segment
-        if not segments:
-            return []
-        
-        total_duration = segments[-1]["end"]
-        current_time = 0
-        
-        while current_time < total_duration:
-            segment_end = min(current_time + segment_duration, total_duration)
-            
-            # Collect words/text within this time range
-            segment_text = ""
-            segment_words = []
-            
-            for segment in segments:
-                for word in segment.get("words", []):
-                    word_start = word["start"]
-                    word_end = word["end"]
-                    
-                    # Check if word overlaps with current segment
-                    if (word_start < segment_end and word_end > current_time):
-                        segment_text += word["word"]
-                        segment_words.append(word)
-            
-            # Clean up text
-            segment_text = segment_text.strip()
-            
-            # Only add segment if it has content
-            if segment_text:
-                fixed_segments.append({
-                    "segment_id": current_segment_id,
-                    "start_time": current_time,
-                    "end_time": segment_end,
-                    "text": segment_text,
-                    "words": segment_words
-                })
-                current_segment_id += 1
-            
-            current_time = segment_end
-        
-        return fixed_segments
+        return WordIndex(segments).windows(segment_duration, overlap, duration=segments[-1]["end"])
     
     def create_youtube_links(self, segments: List[Dict[str, Any]], 
                            base_youtube_url: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,101 @@
+import json
+import gzip
+from typing import Dict, List, Any, Optional, Tuple
+
+from services.word_table import WordTable
+
+try:
+    import msgpack
+except ImportError:  # listed in requirements.txt; without it MessagePack isn't offered
+    msgpack = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+COLUMNAR_JSON_TYPE = "application/vnd.transcript.columnar+json"
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Pick a compact format from an Accept header.
+
+    MessagePack is only offered when msgpack is installed; otherwise the
+    client's next preference is used.
+
+    Args:
+        accept: Raw Accept header value
+
+    Returns:
+        MSGPACK_TYPES[0] or COLUMNAR_JSON_TYPE, or None for regular JSON
+    """
+    if not accept:
+        return None
+
+    # Highest q-value first; ties keep the client's order
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type in MSGPACK_TYPES:
+            if msgpack is None:
+                continue
+            return MSGPACK_TYPES[0]
+        if media_type == COLUMNAR_JSON_TYPE:
+            return COLUMNAR_JSON_TYPE
+        if media_type in ("application/json", "*/*"):
+            return None
+    return None
+
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Turn a list of same-shaped dicts into a dict of lists."""
+    if not rows:
+        return {}
+    return {key: [row.get(key) for row in rows] for key in rows[0]}
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite a transcription result with columnar segments and words.
+
+    Per-word dicts become a WordTable and the API segments a dict of
+    lists; every other field is passed through unchanged.
+    """
+    compact = dict(result)
+    transcript = result.get("transcript")
+    if transcript:
+        transcript = dict(transcript)
+        transcript["segments"] = WordTable.from_segments(transcript.get("segments", [])).to_columns()
+        compact["transcript"] = transcript
+    if result.get("segments") is not None:
+        compact["segments"] = rows_to_columns(result["segments"])
+    compact["format"] = "columnar"
+    return compact
+
+
+def encode(payload: Dict[str, Any], media_type: str) -> Tuple[bytes, Dict[str, str]]:
+    """Encode a response body in a compact format.
+
+    Args:
+        payload: Response data, with results already passed through compact_result
+        media_type: Value returned by negotiate
+
+    Returns:
+        Tuple of (body, extra response headers)
+
+    Raises:
+        RuntimeError: If MessagePack is requested but msgpack is not installed
+    """
+    if media_type in MSGPACK_TYPES:
+        if msgpack is None:
+            raise RuntimeError("MessagePack output requires the msgpack package")
+        return msgpack.packb(payload, use_bin_type=True), {}
+
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(body, compresslevel=6), {"Content-Encoding": "gzip"}
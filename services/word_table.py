@@ -0,0 +1,147 @@
+from typing import Dict, List, Any
+import numpy as np
+
+
+def _rounded(values: np.ndarray, decimals: int = 3) -> List[float]:
+    """Convert a float array to a JSON-ready list without float32 noise."""
+    return np.round(values.astype(np.float64), decimals).tolist()
+
+
+class WordTable:
+    """Columnar storage for a transcript's segments and words.
+
+    Instead of a dict per word, words are kept as parallel arrays of
+    start/end times and probabilities plus indices into a table of
+    distinct word strings; segments point at their first word through an
+    offsets array. A long transcript shrinks to a handful of arrays, which
+    are cheap to hold, serialize and send.
+    """
+
+    def __init__(self, strings: List[str], word_ids: np.ndarray, starts: np.ndarray,
+                 ends: np.ndarray, probabilities: np.ndarray, segment_starts: np.ndarray,
+                 segment_ends: np.ndarray, segment_texts: List[str], word_offsets: np.ndarray):
+        self.strings = strings
+        self.word_ids = word_ids
+        self.starts = starts
+        self.ends = ends
+        self.probabilities = probabilities
+        self.segment_starts = segment_starts
+        self.segment_ends = segment_ends
+        self.segment_texts = segment_texts
+        # Segment i owns words word_offsets[i]:word_offsets[i + 1]
+        self.word_offsets = word_offsets
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict[str, Any]]) -> "WordTable":
+        """Build a table from segments in the transcribe_audio format."""
+        string_ids: Dict[str, int] = {}
+        word_ids: List[int] = []
+        starts: List[float] = []
+        ends: List[float] = []
+        probabilities: List[float] = []
+        word_offsets = [0]
+
+        for segment in segments:
+            for word in segment.get("words", []):
+                word_ids.append(string_ids.setdefault(word["word"], len(string_ids)))
+                starts.append(word["start"])
+                ends.append(word["end"])
+                probabilities.append(word.get("probability", 0.0))
+            word_offsets.append(len(word_ids))
+
+        return cls(
+            strings=list(string_ids),
+            word_ids=np.array(word_ids, dtype=np.int32),
+            starts=np.array(starts, dtype=np.float32),
+            ends=np.array(ends, dtype=np.float32),
+            probabilities=np.array(probabilities, dtype=np.float32),
+            segment_starts=np.array([s["start"] for s in segments], dtype=np.float32),
+            segment_ends=np.array([s["end"] for s in segments], dtype=np.float32),
+            segment_texts=[s["text"] for s in segments],
+            word_offsets=np.array(word_offsets, dtype=np.int32),
+        )
+
+    def to_segments(self) -> List[Dict[str, Any]]:
+        """Expand back into segments in the transcribe_audio format."""
+        starts = _rounded(self.starts)
+        ends = _rounded(self.ends)
+        probabilities = _rounded(self.probabilities)
+        offsets = self.word_offsets.tolist()
+        word_ids = self.word_ids.tolist()
+
+        return [
+            {
+                "id": i,
+                "start": start,
+                "end": end,
+                "text": text,
+                "words": [
+                    {"word": self.strings[word_ids[w]], "start": starts[w],
+                     "end": ends[w], "probability": probabilities[w]}
+                    for w in range(offsets[i], offsets[i + 1])
+                ],
+            }
+            for i, (start, end, text) in enumerate(zip(_rounded(self.segment_starts),
+                                                       _rounded(self.segment_ends),
+                                                       self.segment_texts))
+        ]
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Serialize to plain lists for JSON or MessagePack."""
+        return {
+            "strings": self.strings,
+            "words": {
+                "string_id": self.word_ids.tolist(),
+                "start": _rounded(self.starts),
+                "end": _rounded(self.ends),
+                "probability": _rounded(self.probabilities),
+            },
+            "segments": {
+                "start": _rounded(self.segment_starts),
+                "end": _rounded(self.segment_ends),
+                "text": self.segment_texts,
+                "word_offset": self.word_offsets.tolist(),
+            },
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "WordTable":
+        """Rebuild a table from to_columns output."""
+        words = columns["words"]
+        segments = columns["segments"]
+        return cls(
+            strings=list(columns["strings"]),
+            word_ids=np.array(words["string_id"], dtype=np.int32),
+            starts=np.array(words["start"], dtype=np.float32),
+            ends=np.array(words["end"], dtype=np.float32),
+            probabilities=np.array(words["probability"], dtype=np.float32),
+            segment_starts=np.array(segments["start"], dtype=np.float32),
+            segment_ends=np.array(segments["end"], dtype=np.float32),
+            segment_texts=list(segments["text"]),
+            word_offsets=np.array(segments["word_offset"], dtype=np.int32),
+        )
+
+
+def pack_transcript(transcript: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a transcript with its segments stored as WordTable columns.
+
+    Used where transcripts are persisted, so stored entries hold a few
+    arrays instead of a dict per word.
+    """
+    if not isinstance(transcript.get("segments"), list):
+        return transcript
+    packed = dict(transcript)
+    packed["segments"] = WordTable.from_segments(transcript["segments"]).to_columns()
+    return packed
+
+
+def unpack_transcript(transcript: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of pack_transcript; transcripts stored unpacked are returned as they are."""
+    if not isinstance(transcript.get("segments"), dict):
+        return transcript
+    unpacked = dict(transcript)
+    unpacked["segments"] = WordTable.from_columns(transcript["segments"]).to_segments()
+    return unpacked
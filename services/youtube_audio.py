@@ -1,31 +1,89 @@
 import os
 import re
+import copy
+import time
+import shutil
+import queue
+import threading
 import tempfile
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Iterator
 from urllib.parse import urlparse, parse_qs
 import yt_dlp
+import numpy as np
 from pathlib import Path
 import logging
+from services.audio_processing import SAMPLE_RATE, decode_audio as ffmpeg_decode, stream_decode
+from services.audio_cache import AudioCache, INDEX_FILENAME
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
+# Bare playlist IDs are turned into playlist URLs; anything else must be a YouTube URL.
+# Playlist IDs carry a type prefix (PL, UU, OLAK5uy_, ...), which keeps 11-character
+# video IDs from matching
+PLAYLIST_ID_PATTERN = re.compile(r'^(?:PL|UU|LL|FL|RD|UL|PU|OL|EL)[A-Za-z0-9_-]{10,}$')
+
+# A channel's front page lists only its tabs, so bare channel URLs go to the uploads tab
+CHANNEL_URL_PATTERN = re.compile(
+    r'^(?:https?://)?(?:www\.|m\.)?youtube\.com/(@[^/?#]+|(?:channel|c|user)/[^/?#]+)/?$', re.IGNORECASE)
+
+# How deep nested tabs and playlists are followed when expanding a listing
+MAX_PLAYLIST_DEPTH = 2
+
+# Download directories untouched for this long are treated as abandoned by cleanup;
+# younger ones may belong to a download running in another worker process
+STALE_DOWNLOAD_SECONDS = 3600
+
+# Protocols ffmpeg can fetch by itself; others (e.g. DASH fragments) need yt-dlp's downloader
+STREAMABLE_PROTOCOLS = ("http", "https", "m3u8", "m3u8_native")
+
+class _PooledYoutubeDL:
+    """A reusable YoutubeDL instance with a swappable progress callback."""
+    
+    def __init__(self, ydl_opts: Dict[str, Any]):
+        self.ydl = yt_dlp.YoutubeDL(ydl_opts)
+        self.progress_callback: Optional[Callable[[float], None]] = None
+        self.ydl.add_progress_hook(self._on_progress)
+    
+    def _on_progress(self, status: Dict[str, Any]):
+        """Forward yt-dlp progress to the current borrower's callback."""
+        if self.progress_callback is None:
+            return
+        if status.get('status') == 'finished':
+            self.progress_callback(1.0)
+            return
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if total:
+            self.progress_callback(min(status.get('downloaded_bytes', 0) / total, 1.0))
+
 class YouTubeAudioService:
     """Service for downloading and processing YouTube audio."""
     
-    def __init__(self, temp_dir: Optional[str] = None):
+    def __init__(self, temp_dir: Optional[str] = None, cache_max_mb: float = 4096,
+                 cache_max_age: float = 3 * 24 * 3600, ydl_pool_size: int = 4,
+                 info_cache_ttl: float = 300, info_cache_size: int = 256):
         """Initialize the YouTube audio service.
         
         Args:
             temp_dir: Optional custom temporary directory for downloads
+            cache_max_mb: Disk budget for cached audio and decoded PCM
+            cache_max_age: Seconds an unused cached video is kept
+            ydl_pool_size: Max idle YoutubeDL instances kept for reuse
+            info_cache_ttl: Seconds extracted video metadata is reused
+            info_cache_size: Max videos kept in the metadata cache
         """
         self.temp_dir = temp_dir or tempfile.gettempdir()
         self.download_dir = Path(self.temp_dir) / "youtube_audio"
         self.download_dir.mkdir(exist_ok=True)
+        self.audio_cache = AudioCache(self.download_dir, max_size_mb=cache_max_mb, max_age=cache_max_age)
         
         # yt-dlp configuration for high-quality audio extraction
         self.ydl_opts = {
             'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp4]/bestaudio[ext=webm]/bestaudio/best[height<=720]/best',
-            'outtmpl': str(self.download_dir / '%(id)s.%(ext)s'),
+            # Relative to the per-download directory set in _borrow_ydl
+            'outtmpl': '%(id)s.%(ext)s',
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
@@ -39,6 +97,20 @@ class YouTubeAudioService:
             'audioformat': 'best',  # Let yt-dlp choose the best audio format
             'prefer_ffmpeg': True,
         }
+        
+        # Warm YoutubeDL instances; extractors stay initialized between requests
+        self._ydl_pool: queue.Queue = queue.Queue(maxsize=ydl_pool_size)
+        
+        # Short-lived metadata (including format URLs) keyed by video ID, so a
+        # video-info call followed by a download costs one page fetch
+        self.info_cache_ttl = info_cache_ttl
+        self.info_cache_size = info_cache_size
+        self._info_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._info_lock = threading.Lock()
+        
+        # Per-download directories in use by this process; cleanup leaves them alone
+        self._active_downloads: set = set()
+        self._active_lock = threading.Lock()
     
     def validate_youtube_url(self, url: str) -> Dict[str, Any]:
         """Validate and extract information from YouTube URL.
@@ -90,30 +162,107 @@ class YouTubeAudioService:
             return {"success": False, "error": validation["error"]}
         
         try:
-            with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                return {
-                    "success": True,
-                    "video_id": info.get('id'),
-                    "title": info.get('title'),
-                    "description": info.get('description'),
-                    "duration": info.get('duration'),  # in seconds
-                    "uploader": info.get('uploader'),
-                    "upload_date": info.get('upload_date'),
-                    "view_count": info.get('view_count'),
-                    "thumbnail": info.get('thumbnail'),
-                    "webpage_url": info.get('webpage_url'),
-                }
+            info = self._get_cached_info(validation["video_id"])
+            if info is None:
+                with self._borrow_ydl() as pooled:
+                    info = pooled.ydl.extract_info(url, download=False)
+                self._cache_info(info)
+            
+            return {
+                "success": True,
+                "video_id": info.get('id'),
+                "title": info.get('title'),
+                "description": info.get('description'),
+                "duration": info.get('duration'),  # in seconds
+                "uploader": info.get('uploader'),
+                "upload_date": info.get('upload_date'),
+                "view_count": info.get('view_count'),
+                "thumbnail": info.get('thumbnail'),
+                "webpage_url": info.get('webpage_url'),
+            }
         except Exception as e:
             logger.error(f"Error extracting video info: {str(e)}")
             return {"success": False, "error": f"Failed to extract video info: {str(e)}"}
     
-    def download_audio(self, url: str) -> Dict[str, Any]:
-        """Download audio from YouTube video.
+    def expand_playlist(self, playlist: str, max_items: Optional[int] = None) -> Dict[str, Any]:
+        """List the videos of a playlist or channel without resolving each one.
+        
+        Uses yt-dlp's flat extraction, which reads only the listing pages
+        instead of fetching every video's page and formats.
+        
+        Args:
+            playlist: Playlist ID, or a playlist or channel URL
+            max_items: Optional limit on the number of videos returned
+            
+        Returns:
+            Dict containing the playlist title and its entries (video_id, url, title)
+        """
+        channel = CHANNEL_URL_PATTERN.match(playlist.strip())
+        if PLAYLIST_ID_PATTERN.match(playlist):
+            playlist = f"https://www.youtube.com/playlist?list={playlist}"
+        elif channel:
+            playlist = f"https://www.youtube.com/{channel.group(1)}/videos"
+        elif not any(domain in playlist.lower() for domain in ('youtube.com', 'youtu.be')):
+            return {"success": False, "error": "Playlist must be a playlist ID or a YouTube URL"}
+        
+        options = dict(self.ydl_opts, extract_flat='in_playlist')
+        if max_items:
+            options['playlistend'] = max_items
+        
+        try:
+            entries = []
+            seen = set()
+            with yt_dlp.YoutubeDL(options) as ydl:
+                info = ydl.extract_info(playlist, download=False)
+                for entry in self._flat_video_entries(ydl, info):
+                    if entry['id'] in seen:
+                        continue
+                    seen.add(entry['id'])
+                    entries.append({
+                        "video_id": entry['id'],
+                        "url": f"https://www.youtube.com/watch?v={entry['id']}",
+                        "title": entry.get('title'),
+                    })
+                    if max_items and len(entries) >= max_items:
+                        break
+            
+            logger.info(f"Expanded {playlist} to {len(entries)} videos")
+            return {
+                "success": True,
+                "playlist_id": info.get('id'),
+                "title": info.get('title'),
+                "entries": entries[:max_items] if max_items else entries,
+            }
+        except Exception as e:
+            logger.error(f"Error expanding playlist: {str(e)}")
+            return {"success": False, "error": f"Failed to expand playlist: {str(e)}"}
+    
+    def _flat_video_entries(self, ydl, info: Dict[str, Any], depth: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield the video entries of a flat listing, following nested tabs and playlists.
+        
+        Args:
+            ydl: YoutubeDL instance configured for flat extraction
+            info: Listing returned by extract_info
+            depth: Nesting level of ``info``
+        """
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            if entry.get('ie_key', 'Youtube') == 'Youtube':
+                if entry.get('id'):
+                    yield entry
+            elif depth < MAX_PLAYLIST_DEPTH and entry.get('url'):
+                # A channel tab or playlist; it is listed by its own extraction
+                nested = ydl.extract_info(entry['url'], download=False)
+                yield from self._flat_video_entries(ydl, nested, depth + 1)
+    
+    def download_audio(self, url: str,
+                       progress_callback: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+        """Download audio from YouTube video, reusing the audio cache when possible.
         
         Args:
             url: YouTube URL
+            progress_callback: Optional callable receiving download progress (0.0-1.0)
             
         Returns:
             Dict containing download result and file path
@@ -122,78 +271,314 @@ class YouTubeAudioService:
         if not validation["valid"]:
             return {"success": False, "error": validation["error"]}
         
+        cached = self.audio_cache.get(validation["video_id"])
+        metrics.record_cache("audio", cached is not None and bool(cached["audio_path"]))
+        if cached is not None and cached["audio_path"]:
+            logger.info(f"Audio cache hit for video {validation['video_id']}")
+            if progress_callback:
+                progress_callback(1.0)
+            return {
+                "success": True,
+                "video_id": validation["video_id"],
+                "audio_file_path": cached["audio_path"],
+                "file_size": os.path.getsize(cached["audio_path"]),
+                "video_info": cached["video_info"],
+                "cached": True,
+            }
+        
+        # Each download writes into its own directory and is renamed into
+        # place, so concurrent downloads never see each other's partial files
+        job_dir = Path(tempfile.mkdtemp(prefix=".download-", dir=self.download_dir))
+        with self._active_lock:
+            self._active_downloads.add(job_dir.name)
         try:
             logger.info(f"Starting audio download for: {url}")
+            start_time = time.time()
             
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                # Extract info first to get the video ID and metadata
-                info = ydl.extract_info(url, download=False)
+            with self._borrow_ydl(progress_callback, output_dir=job_dir) as pooled:
+                info = self._get_cached_info(validation["video_id"])
+                if info is not None:
+                    # Reuse the metadata and format URLs from a recent extraction
+                    info = pooled.ydl.process_ie_result(copy.deepcopy(info), download=True)
+                else:
+                    # Single pass: one page fetch both resolves formats and downloads
+                    info = pooled.ydl.extract_info(url, download=True)
                 video_id = info.get('id')
                 
                 if not video_id:
                     return {"success": False, "error": "Could not extract video ID"}
                 
                 logger.info(f"Video ID: {video_id}, Title: {info.get('title', 'Unknown')}")
+                self._cache_info(info)
                 
-                # Check if video has audio formats available
-                formats = info.get('formats', [])
-                audio_formats = [f for f in formats if f.get('acodec') != 'none']
-                
-                if not audio_formats:
-                    return {"success": False, "error": "No audio formats available for this video"}
-                
-                # Download the audio
-                ydl.download([url])
-                
-                # Find the downloaded file - check for common audio extensions
-                possible_files = []
-                for ext in ['.m4a', '.webm', '.mp4', '.mp3', '.wav', '.ogg', '.opus']:
-                    file_path = self.download_dir / f"{video_id}{ext}"
-                    if file_path.exists():
-                        possible_files.append(file_path)
-                
-                # Also check for files with different naming patterns
-                if not possible_files:
-                    for file_path in self.download_dir.iterdir():
-                        if file_path.is_file() and video_id in file_path.name:
-                            possible_files.append(file_path)
-                
-                if not possible_files:
-                    # List all files in download directory for debugging
-                    all_files = list(self.download_dir.iterdir())
-                    logger.error(f"No audio file found. Files in directory: {[f.name for f in all_files]}")
-                    
-                    # Clean up any non-audio files
-                    for file_path in all_files:
-                        if file_path.suffix in ['.mhtml', '.html', '.part']:
-                            file_path.unlink()
-                    
+                # yt-dlp reports exactly where it wrote the file
+                downloaded = self._resolve_downloaded_file(info)
+                if downloaded is None:
                     return {"success": False, "error": "Downloaded audio file not found. Video may be unavailable, age-restricted, or region-blocked."}
                 
-                # Use the first found file (should be the most recent)
-                audio_file = possible_files[0]
-                logger.info(f"Found audio file: {audio_file}")
-                
                 # Verify the file is actually an audio file (not .mhtml or similar)
-                if audio_file.suffix in ['.mhtml', '.html']:
-                    audio_file.unlink()  # Clean up
+                if downloaded.suffix in ['.mhtml', '.html']:
                     return {"success": False, "error": "Video download failed. Video may be unavailable, age-restricted, or region-blocked."}
                 
+                audio_file = self.download_dir / f"{video_id}{downloaded.suffix}"
+                os.replace(downloaded, audio_file)
+                logger.info(f"Downloaded audio file: {audio_file}")
+                elapsed = time.time() - start_time
+                if elapsed > 0:
+                    metrics.DOWNLOAD_BYTES_PER_SECOND.observe(audio_file.stat().st_size / elapsed)
+                
+                video_info = {
+                    "title": info.get('title'),
+                    "duration": info.get('duration'),
+                    "uploader": info.get('uploader'),
+                }
+                self.audio_cache.put(video_id, str(audio_file), video_info)
+                
                 return {
                     "success": True,
                     "video_id": video_id,
                     "audio_file_path": str(audio_file),
                     "file_size": audio_file.stat().st_size,
-                    "video_info": {
-                        "title": info.get('title'),
-                        "duration": info.get('duration'),
-                        "uploader": info.get('uploader'),
-                    }
+                    "video_info": video_info,
+                    "cached": False,
                 }
                 
         except Exception as e:
             logger.error(f"Error downloading audio: {str(e)}")
             return {"success": False, "error": f"Failed to download audio: {str(e)}"}
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            with self._active_lock:
+                self._active_downloads.discard(job_dir.name)
+    
+    @staticmethod
+    def _resolve_downloaded_file(info: Dict[str, Any]) -> Optional[Path]:
+        """Get the path yt-dlp wrote the audio to from its returned info.
+        
+        Args:
+            info: Info dict returned by extract_info/process_ie_result
+            
+        Returns:
+            Path of the downloaded file, or None if nothing was written
+        """
+        downloads = info.get('requested_downloads') or [info]
+        filepath = downloads[0].get('filepath') or downloads[0].get('_filename')
+        if not filepath or not os.path.exists(filepath):
+            return None
+        return Path(filepath)
+    
+    def decode_audio(self, audio_file_path: str, video_id: Optional[str] = None) -> np.ndarray:
+        """Decode a downloaded audio file to 16 kHz mono float32 samples.
+        
+        When a video ID is given, previously decoded PCM is reused from the
+        audio cache, and fresh decodes are stored there for next time.
+        
+        Args:
+            audio_file_path: Path to the downloaded audio file
+            video_id: Optional YouTube video ID of the cached download
+            
+        Returns:
+            1-D float32 array ready for Whisper
+        """
+        if video_id:
+            pcm = self.audio_cache.load_pcm(video_id)
+            metrics.record_cache("pcm", pcm is not None)
+            if pcm is not None:
+                logger.info(f"Decoded audio cache hit for video {video_id}")
+                return pcm
+        
+        logger.info(f"Decoding audio: {audio_file_path}")
+        start_time = time.time()
+        audio = ffmpeg_decode(audio_file_path)
+        metrics.DECODE_SECONDS.observe(time.time() - start_time, mode="file")
+        
+        if video_id:
+            try:
+                self.audio_cache.store_pcm(video_id, audio)
+            except Exception as e:
+                logger.warning(f"Could not cache decoded audio for {video_id}: {e}")
+        
+        return audio
+    
+    def stream_audio(self, url: str, progress_callback: Optional[Callable[[float], None]] = None,
+                     start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Decode a video's audio straight from YouTube to 16 kHz mono samples.
+        
+        yt-dlp only resolves the audio format; ffmpeg reads the media URL
+        itself and its PCM output is converted into a preallocated buffer,
+        so the compressed file never touches the disk. The samples are kept
+        in the audio cache. Formats ffmpeg can't fetch directly fall back to
+        download_audio followed by decode_audio.
+        
+        Cache hits win over streaming: cached PCM is used as is, and a cached
+        downloaded file is decoded locally rather than fetched again.
+        
+        With start or end, ffmpeg seeks in the remote file and fetches only
+        that section, which is not cached; a fully cached video is sliced.
+        
+        Args:
+            url: YouTube URL
+            progress_callback: Optional callable receiving decode progress (0.0-1.0)
+            start: Seconds into the video to start at
+            end: Seconds into the video to stop at
+            
+        Returns:
+            Dict containing the samples under "audio", plus video_id, video_info
+            and offset (seconds into the video where the samples start)
+        """
+        validation = self.validate_youtube_url(url)
+        if not validation["valid"]:
+            return {"success": False, "error": validation["error"]}
+        video_id = validation["video_id"]
+        offset = start or 0.0
+        partial = start is not None or end is not None
+        start_sample = int(offset * SAMPLE_RATE)
+        end_sample = int(end * SAMPLE_RATE) if end is not None else None
+        
+        cached = self.audio_cache.get(video_id)
+        audio = None
+        if cached is not None and cached["pcm_path"]:
+            audio = self.audio_cache.load_pcm(video_id, start_sample, end_sample)
+        metrics.record_cache("pcm", audio is not None)
+        if audio is not None:
+            logger.info(f"Decoded audio cache hit for video {video_id}")
+            if progress_callback:
+                progress_callback(1.0)
+            return {"success": True, "video_id": video_id, "audio": audio, "offset": offset,
+                    "video_info": cached["video_info"], "cached": True}
+        if cached is not None and cached["audio_path"]:
+            # A downloaded file is already on disk; decoding it beats fetching again
+            logger.info(f"Audio cache hit for video {video_id}; decoding instead of streaming")
+            try:
+                audio = self.decode_audio(cached["audio_path"], video_id)
+                if progress_callback:
+                    progress_callback(1.0)
+                return {"success": True, "video_id": video_id, "audio": audio[start_sample:end_sample],
+                        "offset": offset, "video_info": cached["video_info"], "cached": True}
+            except Exception as e:
+                logger.warning(f"Could not decode cached audio for {video_id}, streaming instead: {e}")
+        
+        try:
+            info = self._get_cached_info(video_id)
+            if info is None:
+                with self._borrow_ydl() as pooled:
+                    info = pooled.ydl.extract_info(url, download=False)
+                self._cache_info(info)
+            
+            formats = info.get('requested_formats') or [info]
+            audio_format = next((f for f in formats if f.get('acodec') != 'none'), formats[0])
+            if not audio_format.get('url') or audio_format.get('protocol') not in STREAMABLE_PROTOCOLS:
+                logger.info(f"Format {audio_format.get('format_id')} can't be streamed; downloading instead")
+                fetched = self._download_and_decode(url, progress_callback)
+                if fetched["success"]:
+                    fetched.update(audio=fetched["audio"][start_sample:end_sample], offset=offset)
+                return fetched
+            
+            video_info = {
+                "title": info.get('title'),
+                "duration": info.get('duration'),
+                "uploader": info.get('uploader'),
+            }
+            duration = info.get('duration')
+            if duration and partial:
+                duration = min(end if end is not None else duration, duration) - offset
+            
+            logger.info(f"Streaming audio for video {video_id}, format {audio_format.get('format_id')}"
+                        + (f", {offset:.1f}s to {end if end is not None else 'end'}" if partial else ""))
+            start_time = time.time()
+            audio = stream_decode(
+                audio_format['url'],
+                expected_seconds=duration if duration and duration > 0 else None,
+                headers=audio_format.get('http_headers') or info.get('http_headers'),
+                progress_callback=progress_callback,
+                start=start,
+                end=end,
+            )
+            elapsed = time.time() - start_time
+            metrics.DECODE_SECONDS.observe(elapsed, mode="stream")
+            if elapsed > 0:
+                # ffmpeg fetches the URL itself; what it writes to the pipe is PCM
+                metrics.STREAM_DECODE_PCM_BYTES_PER_SECOND.observe(len(audio) * 2 / elapsed)
+            logger.info(f"Streamed {len(audio) / SAMPLE_RATE:.1f}s of audio in {elapsed:.2f} seconds")
+            
+            if not partial:
+                try:
+                    self.audio_cache.put_pcm(video_id, audio, video_info)
+                except Exception as e:
+                    logger.warning(f"Could not cache decoded audio for {video_id}: {e}")
+            
+            return {"success": True, "video_id": video_id, "audio": audio, "offset": offset,
+                    "video_info": video_info, "cached": False}
+            
+        except Exception as e:
+            logger.error(f"Error streaming audio: {str(e)}")
+            return {"success": False, "error": f"Failed to stream audio: {str(e)}"}
+    
+    def _download_and_decode(self, url: str,
+                             progress_callback: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+        """Fallback for stream_audio: download the file, then decode it."""
+        download = self.download_audio(url, progress_callback=progress_callback)
+        if not download["success"]:
+            return download
+        audio = self.decode_audio(download["audio_file_path"], download["video_id"])
+        return {"success": True, "video_id": download["video_id"], "audio": audio,
+                "video_info": download["video_info"], "cached": download["cached"]}
+    
+    @contextmanager
+    def _borrow_ydl(self, progress_callback: Optional[Callable[[float], None]] = None,
+                    output_dir: Optional[Path] = None) -> Iterator[_PooledYoutubeDL]:
+        """Check out a warm YoutubeDL instance for exclusive use.
+        
+        Args:
+            progress_callback: Optional callable receiving download progress
+            output_dir: Directory downloads are written to while borrowed
+        """
+        try:
+            pooled = self._ydl_pool.get_nowait()
+        except queue.Empty:
+            pooled = _PooledYoutubeDL(self.ydl_opts)
+        
+        pooled.progress_callback = progress_callback
+        pooled.ydl.params['paths'] = {'home': str(output_dir)} if output_dir else {}
+        try:
+            yield pooled
+        finally:
+            pooled.progress_callback = None
+            try:
+                self._ydl_pool.put_nowait(pooled)
+            except queue.Full:
+                pooled.ydl.close()
+    
+    def _get_cached_info(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return recently extracted metadata for a video, if still fresh."""
+        with self._info_lock:
+            cached = self._info_cache.get(video_id)
+            if cached is None:
+                return None
+            extracted_at, info = cached
+            if time.time() - extracted_at > self.info_cache_ttl:
+                del self._info_cache[video_id]
+                return None
+            return info
+    
+    def _cache_info(self, info: Dict[str, Any]):
+        """Remember extracted metadata for a short while."""
+        video_id = info.get('id')
+        if not video_id:
+            return
+        with self._info_lock:
+            self._info_cache[video_id] = (time.time(), info)
+            self._info_cache.move_to_end(video_id)
+            while len(self._info_cache) > self.info_cache_size:
+                self._info_cache.popitem(last=False)
+    
+    def close(self):
+        """Release pooled YoutubeDL instances."""
+        while True:
+            try:
+                self._ydl_pool.get_nowait().ydl.close()
+            except queue.Empty:
+                break
     
     def cleanup_file(self, file_path: str) -> bool:
         """Clean up a downloaded audio file.
@@ -214,18 +599,34 @@ class YouTubeAudioService:
             logger.error(f"Error cleaning up file {file_path}: {str(e)}")
             return False
     
+    def _is_abandoned_download(self, job_dir: Path) -> bool:
+        """Whether a per-download directory is no longer written to by any download."""
+        with self._active_lock:
+            if job_dir.name in self._active_downloads:
+                return False
+        try:
+            last_write = max([job_dir.stat().st_mtime] + [path.stat().st_mtime for path in job_dir.iterdir()])
+        except OSError:
+            return False
+        return time.time() - last_write > STALE_DOWNLOAD_SECONDS
+    
     def cleanup_all_files(self) -> int:
-        """Clean up all files in the download directory.
+        """Clean up all files in the download directory, emptying the audio cache.
         
         Returns:
             Number of files cleaned up
         """
         try:
-            files_cleaned = 0
+            files_cleaned = self.audio_cache.clear()
             for file_path in self.download_dir.iterdir():
-                if file_path.is_file():
+                # Keep the cache index (and its WAL files) in place
+                if file_path.is_file() and not file_path.name.startswith(INDEX_FILENAME):
                     file_path.unlink()
                     files_cleaned += 1
+                elif file_path.is_dir() and file_path.name.startswith(".download-"):
+                    # Left behind by an interrupted download, unless one is still writing to it
+                    if self._is_abandoned_download(file_path):
+                        shutil.rmtree(file_path, ignore_errors=True)
             logger.info(f"Cleaned up {files_cleaned} files")
             return files_cleaned
         except Exception as e:
@@ -3,7 +3,6 @@ import requests
 import json
 import time
 from typing import Optional, Dict, Any
-import pandas as pd
 from datetime import timedelta
 import os
 
@@ -34,6 +33,8 @@ def get_api_base_url():
         return "http://localhost:8555/api"
 
 API_BASE_URL = get_api_base_url()
+STREAM_READ_TIMEOUT = 120  # seconds to wait for the next streamed event
+LIVE_SEGMENTS = 20  # most recent segments shown while transcribing
 
 def check_api_health() -> bool:
     """Check if the API is running and healthy."""
@@ -43,6 +44,13 @@ def check_api_health() -> bool:
     except:
         return False
 
+def get_readiness() -> Optional[Dict[str, Any]]:
+    """Get the API's warmup status."""
+    try:
+        return requests.get(f"{API_BASE_URL}/ready", timeout=5).json()
+    except:
+        return None
+
 def get_video_info(url: str) -> Optional[Dict[str, Any]]:
     """Get video information from YouTube URL."""
     try:
@@ -67,18 +75,38 @@ def get_available_models() -> Optional[Dict[str, Any]]:
         st.error(f"Error getting models: {e}")
     return None
 
-def transcribe_video(url: str, model: str) -> Optional[Dict[str, Any]]:
-    """Transcribe a YouTube video using the API."""
+def transcribe_video(url: str, model: str, on_progress=None, on_segment=None) -> Optional[Dict[str, Any]]:
+    """Transcribe a YouTube video using the streaming API.
+    
+    Segments arrive as soon as they are decoded, so text can be shown long
+    before the whole video is done. The read timeout only applies between
+    events, and the server sends heartbeats while Whisper is busy.
+    """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/transcribe",
+        with requests.post(
+            f"{API_BASE_URL}/transcribe/stream",
             json={"url": url, "model": model},
-            timeout=300  # 5 minutes timeout
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text}")
+            stream=True,
+            timeout=(10, STREAM_READ_TIMEOUT)
+        ) as response:
+            if response.status_code != 200:
+                st.error(f"API Error: {response.status_code} - {response.text}")
+                return None
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                
+                if event["type"] in ("status", "heartbeat") and on_progress:
+                    on_progress(event["status"], event["progress"])
+                elif event["type"] == "bucket" and on_segment:
+                    on_segment(event["segment"])
+                elif event["type"] == "done":
+                    return event["result"]
+                elif event["type"] == "error":
+                    st.error(f"Transcription failed: {event['error']}")
+                    return None
     except Exception as e:
         st.error(f"Error during transcription: {e}")
     return None
@@ -123,6 +151,9 @@ def main():
         # API Health Check
         if check_api_health():
             st.success("✅ API is running")
+            readiness = get_readiness()
+            if readiness and readiness.get("status") == "warming":
+                st.info("⏳ Models are warming up; the first transcription may be slower")
         else:
             st.error("❌ API not available")
             st.info("Make sure the FastAPI server is running on http://localhost:8555")
@@ -200,7 +231,7 @@ def main():
         - ✅ Clickable timestamp links
         - ✅ Full transcript download
         - ✅ Video metadata extraction
-        - ✅ Automatic file cleanup
+        - ✅ Cached audio and transcripts
         """)
     
     # Handle actions
@@ -229,21 +260,32 @@ def main():
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
-                    # Simulate progress (since we can't get real progress from API)
-                    for i in range(100):
-                        progress_bar.progress(i + 1)
-                        if i < 20:
-                            status_text.text("Downloading audio...")
-                        elif i < 80:
-                            status_text.text("Transcribing with AI...")
-                        else:
-                            status_text.text("Creating segments...")
-                        time.sleep(0.1)
+                    status_labels = {
+                        "queued": "Waiting for a worker...",
+                        "downloading": "Downloading audio...",
+                        "decoding": "Decoding audio...",
+                        "transcribing": "Transcribing with AI...",
+                        "completed": "Creating segments...",
+                    }
+                    
+                    live_text = st.empty()
+                    live_lines = []
                     
-                    results = transcribe_video(youtube_url, selected_model)
+                    def show_progress(status: str, progress: float):
+                        progress_bar.progress(min(int(progress * 100), 100))
+                        status_text.text(status_labels.get(status, status))
+                    
+                    def show_segment(segment: Dict[str, Any]):
+                        # Render text progressively as each window is decoded
+                        live_lines.append(f"`[{segment['start_time']:.1f}s]` {segment['text']}")
+                        live_text.markdown("\n\n".join(live_lines[-LIVE_SEGMENTS:]))
+                    
+                    results = transcribe_video(youtube_url, selected_model,
+                                               on_progress=show_progress, on_segment=show_segment)
                     
                     progress_bar.empty()
                     status_text.empty()
+                    live_text.empty()
                     
                     if results and results.get("success"):
                         st.success(f"✅ Transcription completed in {results.get('processing_time', 0):.1f} seconds!")
@@ -252,19 +294,17 @@ def main():
                         if "segments" in results:
                             st.subheader("📝 Transcript Segments")
                             
-                            segments_df = []
+                            rows = []
                             for segment in results["segments"]:
-                                segments_df.append({
+                                rows.append({
                                     "Segment": segment["id"] + 1,
                                     "Time": f"{segment['start_time']:.1f}s - {segment['end_time']:.1f}s",
                                     "Text": segment["text"],
                                     "YouTube Link": segment["youtube_link"]
                                 })
                             
-                            df = pd.DataFrame(segments_df)
-                            
                             # Display as interactive table
-                            for idx, row in df.iterrows():
+                            for idx, row in enumerate(rows):
                                 with st.container():
                                     col1, col2, col3 = st.columns([1, 2, 6])
                                     
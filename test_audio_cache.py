@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk audio cache.
+"""
+
+import os
+import numpy as np
+from services.audio_cache import AudioCache
+
+def write_audio(cache_dir, video_id, size=1000):
+    """Create a fake downloaded file in the cache directory."""
+    path = cache_dir / f"{video_id}.m4a"
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+def test_hit_returns_file_and_metadata(tmp_path):
+    """Registered downloads are found again by video ID."""
+    cache = AudioCache(tmp_path)
+    path = write_audio(tmp_path, "abc123")
+    cache.put("abc123", path, {"title": "Test"})
+
+    entry = cache.get("abc123")
+    assert entry["audio_path"] == path
+    assert entry["video_info"] == {"title": "Test"}
+    assert entry["pcm_path"] is None
+    assert cache.get("missing") is None
+
+def test_pcm_round_trip(tmp_path):
+    """Decoded audio is stored as int16 and restored as float32."""
+    cache = AudioCache(tmp_path)
+    cache.put("abc123", write_audio(tmp_path, "abc123"))
+    audio = np.sin(np.linspace(0, 100, 16000)).astype(np.float32) * 0.5
+
+    assert cache.load_pcm("abc123") is None
+    cache.store_pcm("abc123", audio)
+
+    restored = cache.load_pcm("abc123")
+    assert restored.dtype == np.float32
+    assert np.allclose(restored, audio, atol=1e-4)
+    assert cache.get_stats()["decoded"] == 1
+
+def test_streamed_audio_is_cached_without_a_compressed_file(tmp_path):
+    """PCM-only entries are hits for decoded audio but not for the file."""
+    cache = AudioCache(tmp_path)
+    audio = np.linspace(-0.5, 0.5, 16000).astype(np.float32)
+    cache.put_pcm("abc123", audio, {"title": "Test"})
+
+    entry = cache.get("abc123")
+    assert entry["audio_path"] is None
+    assert entry["video_info"] == {"title": "Test"}
+    assert np.allclose(cache.load_pcm("abc123"), audio, atol=1e-4)
+    assert np.allclose(cache.load_pcm("abc123", 4000, 8000), audio[4000:8000], atol=1e-4)
+
+    assert cache.remove("abc123")
+    assert list(tmp_path.glob("*.npy")) == []
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    """Files of the least recently used video are deleted over budget."""
+    cache = AudioCache(tmp_path, max_size_mb=0.0025, min_retention=0)
+    first = write_audio(tmp_path, "one")
+    cache.put("one", first)
+    cache.put("two", write_audio(tmp_path, "two"))
+    cache.get("one")
+
+    cache.put("three", write_audio(tmp_path, "three"))
+
+    assert cache.get("two") is None
+    assert cache.get("one") is not None
+    assert os.path.exists(first)
+    assert not os.path.exists(tmp_path / "two.m4a")
+
+def test_recently_used_entries_survive_eviction(tmp_path):
+    """Entries inside the retention window are kept even over budget."""
+    cache = AudioCache(tmp_path, max_size_mb=0.001)
+    cache.put("one", write_audio(tmp_path, "one"))
+    cache.put("two", write_audio(tmp_path, "two"))
+
+    assert cache.get_stats()["entries"] == 2
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for ffmpeg decoding into preallocated buffers. Skipped without ffmpeg.
+"""
+
+import shutil
+import wave
+import numpy as np
+import pytest
+from services.audio_processing import SAMPLE_RATE, stream_decode
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(samples.tobytes())
+
+@pytest.mark.parametrize("expected_seconds", [None, 0.5, 3.0])
+def test_stream_decode_fills_buffer_exactly(tmp_path, expected_seconds):
+    """Output matches the source whether the buffer is sized right, too small or unsized."""
+    samples = (np.sin(np.arange(3 * SAMPLE_RATE) / 10) * 16000).astype(np.int16)
+    write_wav(tmp_path / "clip.wav", samples)
+    progress = []
+
+    audio = stream_decode(str(tmp_path / "clip.wav"), expected_seconds=expected_seconds,
+                          progress_callback=progress.append)
+
+    assert audio.dtype == np.float32
+    assert np.allclose(audio, samples / 32768.0, atol=1e-6)
+    if expected_seconds:
+        assert progress[-1] == 1.0
+
+def test_stream_decode_reports_ffmpeg_errors(tmp_path):
+    with pytest.raises(RuntimeError, match="Failed to decode audio"):
+        stream_decode(str(tmp_path / "missing.wav"))
+
+def test_stream_decode_section(tmp_path):
+    samples = (np.sin(np.arange(3 * SAMPLE_RATE) / 10) * 16000).astype(np.int16)
+    write_wav(tmp_path / "clip.wav", samples)
+
+    audio = stream_decode(str(tmp_path / "clip.wav"), start=1.0, end=2.0)
+
+    assert abs(len(audio) - SAMPLE_RATE) <= SAMPLE_RATE // 100
+    assert np.allclose(audio[:100], samples[SAMPLE_RATE:SAMPLE_RATE + 100] / 32768.0, atol=1e-3)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.batch_scheduler import BatchScheduler
+
+
+class FakeWhisperService:
+    """Records batch sizes and echoes each window's first sample back."""
+
+    def __init__(self):
+        self.batches = []
+
+    def decode_batch(self, model_name, windows, language=None):
+        self.batches.append((model_name, language, len(windows)))
+        return [{"text": str(int(window[0])), "language": language or "en", "segments": []}
+                for window in windows]
+
+
+def test_concurrent_windows_share_a_batch():
+    service = FakeWhisperService()
+    scheduler = BatchScheduler(service, max_batch_size=4, max_wait=0.5)
+    futures = {}
+
+    def submit(i):
+        futures[i] = scheduler.submit("base", np.full(10, i, dtype=np.float32))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each caller gets its own window's result back
+    assert {i: f.result(timeout=5)["text"] for i, f in futures.items()} == {i: str(i) for i in range(4)}
+    assert service.batches == [("base", None, 4)]
+    assert scheduler.get_stats()["avg_batch_size"] == 4.0
+    scheduler.shutdown()
+
+
+def test_batches_split_by_model_and_language():
+    service = FakeWhisperService()
+    scheduler = BatchScheduler(service, max_batch_size=8, max_wait=0.05)
+    window = np.zeros(10, dtype=np.float32)
+
+    futures = [
+        scheduler.submit("base", window),
+        scheduler.submit("small", window),
+        scheduler.submit("base", window, language="de"),
+        scheduler.submit("base", window),
+    ]
+    assert [f.result(timeout=5)["language"] for f in futures] == ["en", "en", "de", "en"]
+    assert set(service.batches) == {("base", None, 2), ("base", "de", 1), ("small", None, 1)}
+    scheduler.shutdown()
+
+
+def test_decode_failure_reaches_every_caller():
+    service = FakeWhisperService()
+    service.decode_batch = lambda *args: (_ for _ in ()).throw(RuntimeError("out of memory"))
+    scheduler = BatchScheduler(service, max_batch_size=2, max_wait=0.05)
+
+    futures = [scheduler.submit("base", np.zeros(10, dtype=np.float32)) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+    scheduler.shutdown()
+
+
+def test_short_job_is_not_stuck_behind_a_long_one():
+    service = FakeWhisperService()
+    release = threading.Event()
+    contents = []
+
+    def blocking_decode(model_name, windows, language=None):
+        release.wait(timeout=5)
+        contents.append([int(window[0]) for window in windows])
+        return FakeWhisperService.decode_batch(service, model_name, windows, language)
+
+    service.decode_batch = blocking_decode
+    scheduler = BatchScheduler(service, max_batch_size=4, max_wait=0.01)
+
+    # The first batch is taken while both jobs queue up behind it
+    first = scheduler.submit("base", np.zeros(10, dtype=np.float32), owner="warmup")
+    time.sleep(0.1)
+    long_job = [scheduler.submit("base", np.full(10, 1, dtype=np.float32), owner="long") for _ in range(20)]
+    short_job = [scheduler.submit("base", np.full(10, 2, dtype=np.float32), owner="short") for _ in range(2)]
+    release.set()
+
+    assert all(future.result(timeout=5)["text"] == "2" for future in short_job)
+    assert all(future.result(timeout=5)["text"] == "1" for future in long_job)
+    first.result(timeout=5)
+    # Windows alternate between jobs, so the short one finishes in the first shared batches
+    assert contents[:3] == [[0], [1, 2, 1, 2], [1, 1, 1, 1]]
+    assert sum(len(batch) for batch in contents) == 23
+    scheduler.shutdown()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the offline benchmark suite and its report comparison.
+"""
+
+from benchmarks.compare import compare
+from benchmarks.run import BenchmarkRunner, STAGES
+
+def test_quick_run_produces_a_report_offline(tmp_path):
+    report = BenchmarkRunner(tmp_path, quick=True, concurrency=[2]).run(
+        ["download", "segmentation", "serialization", "throughput"])
+
+    stages = report["stages"]
+    assert set(stages) == {"download", "segmentation", "serialization", "throughput"}
+    assert not any("error" in stage for stage in stages.values())
+    assert stages["download"]["bytes"] > 0
+    assert stages["download"]["cache_hit"]["p50_s"] < stages["download"]["cold"]["p50_s"]
+    assert set(stages["segmentation"]["create_segments_scaling"]) == {"600", "3600"}
+    assert stages["serialization"]["columnar_gzip"]["bytes"] < stages["serialization"]["json"]["bytes"]
+    assert stages["throughput"]["workers"]["2"]["failed"] == 0
+    assert report["peak_rss_mb"] > 0
+    assert set(STAGES) >= set(stages)
+
+def test_compare_flags_regressions_in_the_right_direction():
+    baseline = {"stages": {"decode": {"file": {"p50_s": 1.0, "mean_s": 1.0}},
+                           "throughput": {"workers": {"2": {"jobs_per_s": 10.0}}}}}
+    slower = {"stages": {"decode": {"file": {"p50_s": 1.5, "mean_s": 9.0}},
+                         "throughput": {"workers": {"2": {"jobs_per_s": 12.0}}}}}
+
+    rows = {key: regressed for key, _, _, _, regressed in compare(baseline, slower, threshold=0.1)}
+
+    assert rows == {"decode.file.p50_s": True, "throughput.workers.2.jobs_per_s": False}
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Tests for the transcription job queue.
+Uses in-process fake services, so no network or Whisper model is needed.
+"""
+
+import asyncio
+import threading
+import numpy as np
+from services.job_manager import JobManager, JOB_COMPLETED, JOB_FAILED
+from services.transcript_cache import TranscriptCache
+
+class FakeYouTubeService:
+    """Stands in for YouTubeAudioService."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.downloads = 0
+
+    def validate_youtube_url(self, url):
+        return {"valid": True, "video_id": "abc123", "url": url}
+
+    def download_audio(self, url, progress_callback=None):
+        if self.fail:
+            return {"success": False, "error": "Video unavailable"}
+        self.downloads += 1
+        if progress_callback:
+            progress_callback(1.0)
+        return {"success": True, "video_id": "abc123", "audio_file_path": "/tmp/abc123.m4a",
+                "video_info": {"title": "Test"}}
+
+    def decode_audio(self, audio_file_path, video_id=None):
+        return np.zeros(16000 * 12, dtype=np.float32)
+
+    def stream_audio(self, url, progress_callback=None, start=None, end=None):
+        self.streams = getattr(self, "streams", 0) + 1
+        self.section = (start, end)
+        if progress_callback:
+            progress_callback(1.0)
+        return {"success": True, "video_id": "abc123", "audio": np.zeros(16000 * 12, dtype=np.float32),
+                "offset": start or 0.0, "video_info": {"title": "Test"}}
+
+class FakeWhisperService:
+    """Stands in for WhisperTranscriptionService, optionally blocking until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+
+    def transcribe_audio(self, audio, model_name="base", language=None, on_segments=None):
+        self.release.wait(timeout=5)
+        assert isinstance(audio, np.ndarray)
+        segments = [
+            {"id": 0, "start": 0.0, "end": 4.0, "text": "hello world", "words": []},
+            {"id": 1, "start": 9.0, "end": 12.0, "text": "again", "words": []},
+        ]
+        if on_segments:
+            on_segments(segments[:1], 6.0)
+            on_segments(segments[1:], 12.0)
+        return {
+            "success": True,
+            "text": "hello world again",
+            "duration": 12.0,
+            "segments": segments,
+        }
+
+def test_job_completes_with_segments():
+    """A submitted job finishes and exposes its result."""
+    youtube = FakeYouTubeService()
+    manager = JobManager(youtube, FakeWhisperService())
+    try:
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        result = job.future.result(timeout=5)
+
+        assert result["success"]
+        assert job.status == JOB_COMPLETED
+        assert job.progress == 1.0
+        assert [s["start_time"] for s in result["segments"]] == [0.0, 8.0]
+        assert result["segments"][1]["youtube_link"].endswith("&t=8s")
+        assert youtube.downloads == 1
+        assert manager.get_job(job.job_id) is job
+    finally:
+        manager.shutdown()
+
+def test_streaming_skips_download_and_decode():
+    """Streamed audio goes straight from the download stage to Whisper."""
+    youtube = FakeYouTubeService()
+    manager = JobManager(youtube, FakeWhisperService(), stream_audio=True)
+    try:
+        job = manager.submit("https://youtu.be/abc123", "tiny")
+        result = job.future.result(timeout=5)
+
+        assert result["success"]
+        assert result["video_info"] == {"title": "Test"}
+        assert youtube.streams == 1
+        assert youtube.downloads == 0
+    finally:
+        manager.shutdown()
+
+def test_section_timestamps_are_relative_to_the_full_video():
+    """A start/end section is streamed even without stream_audio, then shifted back."""
+    youtube = FakeYouTubeService()
+    manager = JobManager(youtube, FakeWhisperService(), stream_audio=False)
+    try:
+        job = manager.submit("https://youtu.be/abc123", "tiny", start=3600.0, end=3612.0)
+        result = job.future.result(timeout=5)
+
+        assert youtube.section == (3600.0, 3612.0)
+        assert youtube.downloads == 0
+        assert result["transcript"]["segments"][1]["start"] == 3609.0
+        assert [s["start_time"] for s in result["segments"]] == [3600.0, 3608.0]
+        assert result["segments"][0]["youtube_link"].endswith("t=3600s")
+    finally:
+        manager.shutdown()
+
+def test_submit_returns_before_work_finishes():
+    """Submission does not block on transcription."""
+    whisper = FakeWhisperService()
+    whisper.release.clear()
+    manager = JobManager(FakeYouTubeService(), whisper)
+    try:
+        job = manager.submit("https://youtu.be/abc123", "tiny")
+        assert not job.future.done()
+        whisper.release.set()
+        assert job.future.result(timeout=5)["success"]
+    finally:
+        manager.shutdown()
+
+def test_identical_jobs_share_one_run():
+    """Concurrent submissions of the same video and model attach to the running job."""
+    youtube = FakeYouTubeService()
+    whisper = FakeWhisperService()
+    whisper.release.clear()
+    manager = JobManager(youtube, whisper)
+    try:
+        first = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        second = manager.submit("https://youtu.be/abc123", "tiny", segmentation={"segment_duration": 4.0})
+        other_model = manager.submit("https://youtu.be/abc123", "base")
+        whisper.release.set()
+
+        results = [job.future.result(timeout=5) for job in (first, second, other_model)]
+        assert all(result["success"] for result in results)
+        assert youtube.downloads == 2
+        assert manager.get_stats()["coalesced"] == 1
+        assert second.status == JOB_COMPLETED
+        # The transcript is shared, the segmentation is per request
+        assert results[1]["transcript"] is results[0]["transcript"]
+        assert results[1]["segments"][0]["end_time"] == 4.0
+        assert results[0]["segments"][0]["end_time"] == 8.0
+        assert manager.get_stats()["in_flight"] == 0
+    finally:
+        manager.shutdown()
+
+def test_follower_with_bad_segmentation_fails_alone():
+    """A follower whose segmentation fails doesn't fail the leader or strand other followers."""
+    whisper = FakeWhisperService()
+    whisper.release.clear()
+    manager = JobManager(FakeYouTubeService(), whisper)
+    try:
+        leader = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        broken = manager.submit("https://youtu.be/abc123", "tiny", segmentation={"strategy": "bogus"})
+        healthy = manager.submit("https://youtu.be/abc123", "tiny", stream=True)
+        whisper.release.set()
+
+        assert leader.future.result(timeout=5)["success"]
+        assert healthy.future.result(timeout=5)["success"]
+        assert not broken.future.result(timeout=5)["success"]
+        assert leader.status == JOB_COMPLETED and healthy.status == JOB_COMPLETED
+        assert broken.status == JOB_FAILED
+        assert list(healthy.iter_events(heartbeat=5))[-1]["type"] == "done"
+    finally:
+        manager.shutdown()
+
+def test_batch_keeps_bounded_number_of_jobs_running():
+    """run_batch submits the next video only once one finishes."""
+    class CountingYouTubeService(FakeYouTubeService):
+        def validate_youtube_url(self, url):
+            return {"valid": True, "video_id": url.rsplit("/", 1)[-1], "url": url}
+
+    whisper = FakeWhisperService()
+    manager = JobManager(CountingYouTubeService(), whisper)
+    urls = [f"https://youtu.be/video{i}" for i in range(5)]
+    async def collect():
+        finished = []
+        async for index, job in manager.run_batch(urls, "tiny", concurrency=2):
+            assert job.future.result()["success"]
+            assert sum(not other.future.done() for other in manager._jobs.values()) <= 2
+            finished.append(index)
+        return finished
+
+    try:
+        assert sorted(asyncio.run(collect())) == list(range(5))
+    finally:
+        manager.shutdown()
+
+def test_batch_concurrency_must_be_positive():
+    """A batch that could never start a job is rejected, both by the request model and run_batch."""
+    import pytest
+    from pydantic import ValidationError
+    from models.youtube import BatchTranscriptionRequest
+
+    with pytest.raises(ValidationError):
+        BatchTranscriptionRequest(urls=["https://youtu.be/abc123"], concurrency=0)
+    assert BatchTranscriptionRequest(urls=["https://youtu.be/abc123"], concurrency=1).concurrency == 1
+
+    manager = JobManager(FakeYouTubeService(), FakeWhisperService())
+
+    async def collect():
+        return [item async for item in manager.run_batch(["https://youtu.be/abc123"], "tiny", concurrency=0)]
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(collect())
+    finally:
+        manager.shutdown()
+
+def test_failed_download_marks_job_failed():
+    """Download errors are reported on the job."""
+    manager = JobManager(FakeYouTubeService(fail=True), FakeWhisperService())
+    try:
+        job = manager.submit("https://youtu.be/abc123", "tiny")
+        result = job.future.result(timeout=5)
+
+        assert not result["success"]
+        assert job.status == JOB_FAILED
+        assert job.error == "Video unavailable"
+    finally:
+        manager.shutdown()
+
+def test_pipeline_reports_queue_depths():
+    """Stats expose every stage's backlog."""
+    manager = JobManager(FakeYouTubeService(), FakeWhisperService(), decode_queue_size=1)
+    try:
+        stats = manager.get_stats()
+        assert set(stats["queues"]) == {"download", "decode", "transcription"}
+        assert stats["decode_workers"] == 1
+    finally:
+        manager.shutdown()
+
+def test_cached_transcript_skips_pipeline(tmp_path):
+    """A second identical job is answered from the transcript cache."""
+    youtube = FakeYouTubeService()
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"))
+    manager = JobManager(youtube, FakeWhisperService(), transcript_cache=cache)
+    try:
+        first = manager.submit("https://youtu.be/abc123", "tiny")
+        assert not first.future.result(timeout=5)["cached"]
+
+        second = manager.submit("https://youtu.be/abc123", "tiny")
+        assert second.future.done()
+        assert second.result["cached"]
+        assert second.result["transcript"] == first.result["transcript"]
+        assert youtube.downloads == 1
+
+        # Another segmentation reuses the same cached transcript
+        third = manager.submit("https://youtu.be/abc123", "tiny", segmentation={"strategy": "silence_gap"})
+        assert third.result["cached"]
+        assert third.result["transcript_id"] == first.result["transcript_id"]
+        assert [s["text"] for s in third.result["segments"]] == ["hello world", "again"]
+        assert cache.get(first.result["transcript_id"])["video_id"] == "abc123"
+    finally:
+        manager.shutdown()
+
+def test_streaming_job_emits_segments_then_done():
+    """Streaming jobs publish segments and completed windows before the result."""
+    manager = JobManager(FakeYouTubeService(), FakeWhisperService())
+    try:
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True)
+        events = list(job.iter_events(heartbeat=5))
+
+        types = [event["type"] for event in events]
+        assert types[-1] == "done"
+        assert types.count("segment") == 2
+        buckets = [event["segment"] for event in events if event["type"] == "bucket"]
+        assert [(b["start_time"], b["text"]) for b in buckets] == [(0.0, "hello world"), (8.0, "again")]
+        assert types.index("bucket") < types.index("done")
+    finally:
+        manager.shutdown()
+
+def test_job_state_is_visible_to_other_workers(tmp_path):
+    """A second manager sharing the job store can report another worker's job."""
+    from services.job_store import JobStore
+
+    store_path = str(tmp_path / "jobs.db")
+    owner = JobManager(FakeYouTubeService(), FakeWhisperService(), job_store=JobStore(store_path))
+    other = JobManager(FakeYouTubeService(), FakeWhisperService(), job_store=JobStore(store_path))
+    try:
+        job = owner.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        job.future.result(timeout=5)
+
+        assert other.get_job(job.job_id) is None
+        state = other.get_job_state(job.job_id)
+        assert state["status"] == JOB_COMPLETED
+        assert state["result"]["segments"] == job.result["segments"]
+        assert other.get_job_state("missing") is None
+    finally:
+        owner.shutdown()
+        other.shutdown()
+
+def test_vad_stream_with_trailing_silence_releases_last_bucket():
+    """Windows after the last speech region are still emitted when VAD trims trailing silence."""
+    from services.audio_processing import SAMPLE_RATE
+    from services.vad import SpeechTimeline
+    from services.whisper_service import WhisperTranscriptionService
+
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    gap = np.zeros(4 * SAMPLE_RATE, dtype=np.float32)
+    audio = np.concatenate([gap, tone, gap, tone, np.zeros(20 * SAMPLE_RATE, dtype=np.float32)])
+
+    class SilentTailYouTube(FakeYouTubeService):
+        def stream_audio(self, url, progress_callback=None, start=None, end=None):
+            return {"success": True, "video_id": "abc123", "audio": audio, "offset": 0.0,
+                    "video_info": {"title": "Test"}}
+
+    class VadWhisper(FakeWhisperService):
+        """Transcribes the compact audio and remaps like the real service does."""
+
+        def transcribe_audio(self, audio, model_name="base", language=None, on_segments=None):
+            timeline = SpeechTimeline.build(audio)
+            on_segments = WhisperTranscriptionService._remapping_callback(
+                on_segments, timeline, len(audio) / SAMPLE_RATE)
+            compact_end = timeline.compact_length / SAMPLE_RATE
+            second = timeline.compact_starts[1] / SAMPLE_RATE
+            segments = [{"id": 0, "start": 0.1, "end": 2.0, "text": "hi", "words": []},
+                        {"id": 1, "start": second + 0.1, "end": compact_end - 0.1, "text": "last words",
+                         "words": []}]
+            on_segments(segments[:1], second)
+            on_segments(segments[1:], compact_end)
+            return {"success": True, "text": "hi last words", "duration": segments[1]["end"],
+                    "segments": segments}
+
+    manager = JobManager(SilentTailYouTube(), VadWhisper(), stream_audio=True)
+    try:
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True)
+        events = list(job.iter_events(heartbeat=5))
+
+        buckets = [event["segment"]["text"] for event in events if event["type"] == "bucket"]
+        assert buckets == ["hi", "last words"]
+        assert events[-1]["type"] == "done"
+    finally:
+        manager.shutdown()
+
+def test_async_event_stream_does_not_hold_a_thread():
+    """aiter_events receives events emitted from pipeline threads on the event loop."""
+    whisper = FakeWhisperService()
+    whisper.release.clear()
+    manager = JobManager(FakeYouTubeService(), whisper)
+
+    async def consume(job):
+        events = []
+        async for event in job.aiter_events(heartbeat=0.05):
+            events.append(event)
+            if event["type"] == "heartbeat":
+                whisper.release.set()
+        return events
+
+    try:
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True)
+        events = asyncio.run(consume(job))
+
+        types = [event["type"] for event in events]
+        assert types[0] == "status" and types[-1] == "done"
+        assert "heartbeat" in types
+        assert [event["segment"]["text"] for event in events if event["type"] == "bucket"] == ["hello world", "again"]
+    finally:
+        manager.shutdown()
+
+def test_live_preview_matches_final_segments():
+    """Buckets streamed for any strategy add up to the segments of the final result."""
+    def spoken(start, *words):
+        timed = [{"word": f" {word}", "start": start + i, "end": start + i + 0.8, "probability": 0.9}
+                 for i, word in enumerate(words)]
+        return {"start": start, "end": timed[-1]["end"], "text": " ".join(words), "words": timed}
+
+    class WordWhisper(FakeWhisperService):
+        def transcribe_audio(self, audio, model_name="base", language=None, on_segments=None):
+            chunks = [([spoken(0.0, "Hello", "there."), spoken(3.0, "How", "are")], 10.0),
+                      ([spoken(10.0, "you?", "Fine,", "thanks."), spoken(17.0, "Bye")], 20.0),
+                      ([spoken(24.0, "now.")], 30.0)]
+            segments = []
+            for chunk, decoded_until in chunks:
+                segments.extend(chunk)
+                if on_segments:
+                    on_segments(chunk, decoded_until)
+            return {"success": True, "text": "", "duration": segments[-1]["end"], "segments": segments}
+
+    manager = JobManager(FakeYouTubeService(), WordWhisper())
+    try:
+        for segmentation in ({}, {"strategy": "fixed", "segment_duration": 5.0}, {"strategy": "sentence"},
+                             {"strategy": "max_chars", "max_chars": 12}, {"strategy": "silence_gap"}):
+            job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True,
+                                 segmentation=segmentation)
+            events = list(job.iter_events(heartbeat=5))
+
+            buckets = [event["segment"] for event in events if event["type"] == "bucket"]
+            assert buckets == events[-1]["result"]["segments"], segmentation
+            # Some groups are previewed while later chunks are still being decoded
+            types = [event["type"] for event in events]
+            assert types.index("bucket") < len(types) - 1 - types[::-1].index("segment")
+    finally:
+        manager.shutdown()
+
+def test_streaming_follower_receives_segments_while_leader_runs():
+    """A streaming job attached to a running one replays its segments so far, then gets live ones."""
+    first_chunk_sent = threading.Event()
+    resume = threading.Event()
+
+    class PausingWhisper(FakeWhisperService):
+        def transcribe_audio(self, audio, model_name="base", language=None, on_segments=None):
+            segments = [
+                {"id": 0, "start": 0.0, "end": 4.0, "text": "hello world", "words": []},
+                {"id": 1, "start": 9.0, "end": 12.0, "text": "again", "words": []},
+            ]
+            assert on_segments is not None
+            on_segments(segments[:1], 8.5)
+            first_chunk_sent.set()
+            resume.wait(timeout=5)
+            on_segments(segments[1:], 12.0)
+            return {"success": True, "text": "hello world again", "duration": 12.0, "segments": segments}
+
+    manager = JobManager(FakeYouTubeService(), PausingWhisper())
+    try:
+        leader = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True)
+        assert first_chunk_sent.wait(timeout=5)
+
+        follower = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny", stream=True,
+                                  segmentation={"strategy": "sentence"})
+        assert follower in leader.followers
+        early = [follower.events.get(timeout=5) for _ in range(2)]
+        assert [event["type"] for event in early] == ["status", "segment"]
+        assert early[1]["segment"]["text"] == "hello world"
+        assert not follower.future.done()
+
+        resume.set()
+        events = early + list(follower.iter_events(heartbeat=5))
+        assert [event["segment"]["text"] for event in events if event["type"] == "segment"] == ["hello world", "again"]
+        buckets = [event["segment"] for event in events if event["type"] == "bucket"]
+        assert buckets == events[-1]["result"]["segments"]
+    finally:
+        resume.set()
+        manager.shutdown()
+
+def test_job_that_cannot_be_queued_fails_and_frees_its_key():
+    """An error after a job is registered fails it instead of leaving it queued forever."""
+    manager = JobManager(FakeYouTubeService(), FakeWhisperService())
+    put = manager._download_queue.put
+    try:
+        def broken_put(item, *args, **kwargs):
+            raise RuntimeError("queue unavailable")
+
+        manager._download_queue.put = broken_put
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        assert job.status == JOB_FAILED
+        assert "queue unavailable" in job.future.result(timeout=1)["error"]
+
+        manager._download_queue.put = put
+        retry = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        assert retry.future.result(timeout=5)["success"]
+        assert job.followers == [] and retry not in job.followers
+    finally:
+        manager._download_queue.put = put
+        manager.shutdown()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite job store shared between API workers.
+"""
+
+import time
+from services.job_store import JobStore
+
+def make_state(job_id, status="transcribing", finished_at=None):
+    return {"job_id": job_id, "url": "https://youtu.be/abc", "model": "tiny", "status": status,
+            "progress": 0.5, "created_at": time.time(), "started_at": None,
+            "finished_at": finished_at, "error": None, "result": None}
+
+def test_save_and_update(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.save(make_state("a"))
+    done = make_state("a", status="completed", finished_at=time.time())
+    done["result"] = {"success": True, "segments": [{"id": 0}]}
+    store.save(done)
+
+    state = store.get("a")
+    assert state["status"] == "completed"
+    assert state["result"]["segments"] == [{"id": 0}]
+    assert store.get("b") is None
+
+def test_orphaned_jobs_fail_and_old_jobs_are_pruned(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.save(make_state("live"))
+    store.save(make_state("old", status="completed", finished_at=time.time() - 7200))
+    store.save(make_state("orphan"))
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET worker_pid = 2147483646 WHERE job_id = 'orphan'")
+
+    assert store.fail_orphans() == 1
+    assert store.get("orphan")["status"] == "failed"
+    assert store.get("live")["status"] == "transcribing"
+
+    assert store.prune(time.time() - 3600) == 1
+    assert store.get("old") is None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics and the pipeline instrumentation feeding them.
+"""
+
+import time
+from unittest import mock
+import numpy as np
+import pytest
+import services.youtube_audio
+from services import metrics
+from services.youtube_audio import YouTubeAudioService
+from services.job_manager import JobManager
+from test_job_manager import FakeYouTubeService, FakeWhisperService
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_latency_seconds", "Test latency", buckets=(0.5, 1.0), labels=("stage",))
+    try:
+        for value in (0.2, 0.5, 0.7, 3.0):
+            histogram.observe(value, stage='a"b')
+
+        assert histogram.render().splitlines() == [
+            "# HELP test_latency_seconds Test latency",
+            "# TYPE test_latency_seconds histogram",
+            'test_latency_seconds_bucket{stage="a\\"b",le="0.5"} 2',
+            'test_latency_seconds_bucket{stage="a\\"b",le="1.0"} 3',
+            'test_latency_seconds_bucket{stage="a\\"b",le="+Inf"} 4',
+            'test_latency_seconds_sum{stage="a\\"b"} 4.4',
+            'test_latency_seconds_count{stage="a\\"b"} 4',
+        ]
+        with pytest.raises(ValueError):
+            histogram.observe(1.0)
+    finally:
+        metrics.REGISTRY.remove(histogram)
+
+def test_cache_hit_ratio_follows_lookups():
+    for hit in (True, True, False, True):
+        metrics.record_cache("unit-test", hit)
+
+    assert metrics.CACHE_HIT_RATIO.get(cache="unit-test") == 0.75
+    assert 'ytapi_cache_requests_total{cache="unit-test",result="miss"} 1.0' in metrics.render()
+
+def test_pipeline_records_queue_wait_and_in_flight_jobs():
+    whisper = FakeWhisperService()
+    whisper.release.clear()
+    manager = JobManager(FakeYouTubeService(), whisper)
+    before = metrics.QUEUE_WAIT_SECONDS.count(stage="transcription")
+    try:
+        job = manager.submit("https://www.youtube.com/watch?v=abc123", "tiny")
+        assert metrics.JOBS_IN_FLIGHT.get() == 1
+
+        whisper.release.set()
+        job.future.result(timeout=5)
+
+        assert metrics.JOBS_IN_FLIGHT.get() == 0
+        assert metrics.QUEUE_WAIT_SECONDS.count(stage="transcription") == before + 1
+        assert metrics.QUEUE_WAIT_SECONDS.count(stage="download") >= 1
+    finally:
+        manager.shutdown()
+
+def test_streamed_audio_records_throughput(tmp_path):
+    service = YouTubeAudioService(temp_dir=str(tmp_path))
+    service._cache_info({"id": "abc123def45", "title": "Test", "duration": 2,
+                         "url": "https://example.com/audio", "protocol": "https", "acodec": "opus"})
+    before = metrics.STREAM_DECODE_PCM_BYTES_PER_SECOND.count()
+
+    def fake_decode(source, **kwargs):
+        time.sleep(0.01)
+        return np.zeros(2 * 16000, np.float32)
+
+    with mock.patch.object(services.youtube_audio, "stream_decode", fake_decode):
+        result = service.stream_audio("https://www.youtube.com/watch?v=abc123def45")
+
+    assert result["success"]
+    assert metrics.STREAM_DECODE_PCM_BYTES_PER_SECOND.count() == before + 1
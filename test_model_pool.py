@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the resident Whisper model pool.
+Pool entries are faked, so torch and Whisper are not needed.
+"""
+
+import threading
+import time
+from services.whisper_service import WhisperTranscriptionService
+
+MB = 1024 ** 2
+
+def make_service(budget_mb):
+    service = WhisperTranscriptionService(memory_budget_mb=budget_mb)
+    service._device = "cpu"
+    return service
+
+def add_model(service, name, size_mb, shared=False):
+    """Put a fake model in the pool the way _acquire_model does."""
+    entry = {"model": object(), "shared": shared, "lock": threading.Lock(), "size_bytes": size_mb * MB,
+             "load_time": 0.1, "loaded_at": time.time(), "last_used": time.time()}
+    with service._pool_lock:
+        service._models[name] = entry
+        service._evict_over_budget(keep=name)
+    return entry
+
+def test_least_recently_used_model_is_evicted_first():
+    service = make_service(budget_mb=300)
+    add_model(service, "tiny", 100)
+    add_model(service, "base", 100)
+    add_model(service, "small", 100)
+    service._touch_model("tiny")
+
+    add_model(service, "medium", 100)
+
+    assert list(service._models) == ["small", "tiny", "medium"]
+    assert service.pool_stats["evictions"] == 1
+    assert service.pool_stats["hits"] == 1
+
+def test_evicts_until_the_budget_fits():
+    service = make_service(budget_mb=500)
+    for name in ("tiny", "base", "small"):
+        add_model(service, name, 150)
+
+    add_model(service, "large", 400)
+
+    assert list(service._models) == ["large"]
+    stats = service.get_pool_stats()
+    assert stats["memory_used_mb"] == 400
+    assert stats["evictions"] == 3
+
+def test_model_over_budget_alone_stays_resident():
+    service = make_service(budget_mb=100)
+    add_model(service, "tiny", 50)
+
+    add_model(service, "large", 3000)
+
+    assert list(service._models) == ["large"]
+
+def test_in_use_and_shared_models_are_pinned():
+    service = make_service(budget_mb=300)
+    busy = add_model(service, "tiny", 100)
+    add_model(service, "base", 100, shared=True)
+    add_model(service, "small", 100)
+
+    with busy["lock"]:
+        add_model(service, "medium", 100)
+    assert list(service._models) == ["tiny", "base", "medium"]
+
+    add_model(service, "large", 100)
+    assert list(service._models) == ["base", "medium", "large"]
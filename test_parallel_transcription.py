@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for long-audio parallel transcription: merging chunk results and
+sharing worker pools. Chunk results and executors are faked, so no
+worker processes or models are started.
+"""
+
+from unittest import mock
+import services.parallel_transcription
+from services.parallel_transcription import ParallelTranscriber
+from services.whisper_service import WhisperTranscriptionService
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": f" {text}",
+            "words": [{"word": f" {text}", "start": start, "end": end, "probability": 0.9}]}
+
+def test_chunks_are_shifted_and_renumbered():
+    chunks = [
+        (0.0, {"segments": [segment(0.0, 2.0, "one"), segment(2.0, 4.0, "two")]}),
+        (60.0, {"segments": [segment(0.5, 3.0, "three")]}),
+    ]
+
+    segments = WhisperTranscriptionService._merge_chunks(chunks)
+
+    assert [s["id"] for s in segments] == [0, 1, 2]
+    assert [s["text"] for s in segments] == ["one", "two", "three"]
+    assert (segments[2]["start"], segments[2]["end"]) == (60.5, 63.0)
+    assert segments[2]["words"][0]["start"] == 60.5
+
+def test_repeat_across_a_boundary_is_dropped():
+    chunks = [
+        (0.0, {"segments": [segment(50.0, 60.4, "see you next time")]}),
+        (60.0, {"segments": [segment(0.0, 0.4, "See you next time"), segment(1.0, 2.0, "bye")]}),
+    ]
+
+    segments = WhisperTranscriptionService._merge_chunks(chunks)
+
+    assert [(s["id"], s["text"]) for s in segments] == [(0, "see you next time"), (1, "bye")]
+
+def test_repeated_line_after_the_boundary_is_kept():
+    chunks = [
+        (0.0, {"segments": [segment(58.0, 59.0, "la la")]}),
+        (60.0, {"segments": [segment(0.5, 1.5, "la la")]}),
+    ]
+    assert len(WhisperTranscriptionService._merge_chunks(chunks)) == 2
+
+class FakeExecutor:
+    def __init__(self, **kwargs):
+        self.model_name = kwargs["initargs"][0]
+        self.stopped = False
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.stopped = True
+
+def test_busy_pool_is_not_stopped_for_another_model():
+    transcriber = ParallelTranscriber(workers=2, max_pools=1)
+    with mock.patch.object(services.parallel_transcription, "ProcessPoolExecutor", FakeExecutor):
+        with transcriber._borrow_pool("small") as small:
+            with transcriber._borrow_pool("medium") as medium:
+                assert not small.stopped
+                assert list(transcriber._pools) == ["small", "medium"]
+
+            # Back within the limit once the second request finishes
+            assert medium.stopped
+            assert not small.stopped
+            assert list(transcriber._pools) == ["small"]
+
+        with transcriber._borrow_pool("large") as large:
+            assert small.stopped
+            assert list(transcriber._pools) == ["large"]
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+import run_app
+
+
+async def chunks(*parts):
+    """Upstream body that arrives in pieces, as a real server's would."""
+    for part in parts:
+        yield part
+
+
+def make_client(monkeypatch, handler):
+    """Point the proxy at a mock upstream; lifespan is skipped so it isn't replaced."""
+    monkeypatch.setattr(run_app, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return TestClient(run_app.proxy_app)
+
+
+def test_api_requests_stream_through_with_hop_by_hop_headers_removed(monkeypatch):
+    seen = {}
+
+    def upstream(request: httpx.Request):
+        seen["url"] = str(request.url)
+        seen["body"] = request.read()
+        seen["headers"] = request.headers
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/x-ndjson", "connection": "x-internal",
+                     "x-internal": "secret", "keep-alive": "timeout=5", "x-job-id": "abc"},
+            content=chunks(b'{"type": "status"}\n', b'{"type": "done"}\n'),
+        )
+
+    client = make_client(monkeypatch, upstream)
+    response = client.post("/api/transcribe/stream?debug=1", content=b'{"url": "x"}',
+                           headers={"Proxy-Authorization": "Basic zzz"})
+
+    assert response.status_code == 200
+    assert response.content == b'{"type": "status"}\n{"type": "done"}\n'
+    assert response.headers["x-job-id"] == "abc"
+    assert "x-internal" not in response.headers
+    assert "keep-alive" not in response.headers
+    assert "proxy;dur=" in response.headers["server-timing"]
+
+    assert seen["url"] == "http://localhost:8555/api/transcribe/stream?debug=1"
+    assert seen["body"] == b'{"url": "x"}'
+    assert "proxy-authorization" not in seen["headers"]
+    assert seen["headers"]["host"] == "localhost:8555"
+
+
+def test_other_paths_go_to_streamlit(monkeypatch):
+    def upstream(request: httpx.Request):
+        return httpx.Response(200, content=chunks(str(request.url).encode()))
+
+    client = make_client(monkeypatch, upstream)
+    assert client.get("/static/app.js").text == "http://localhost:8502/static/app.js"
+
+
+def test_unreachable_upstream_returns_502(monkeypatch):
+    def upstream(request: httpx.Request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = make_client(monkeypatch, upstream)
+    assert client.get("/api/health").status_code == 502
+
+
+def test_websocket_handshake_headers_reach_streamlit(monkeypatch):
+    import websockets.asyncio.client
+
+    seen = {}
+
+    class FakeUpstream:
+        subprotocol = "streamlit"
+
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, message):
+            self.sent.append(message)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if not self.sent:
+                await asyncio.sleep(0.01)
+                return await self.__anext__()
+            return f"echo {self.sent.pop(0)}"
+
+        async def close(self):
+            pass
+
+    async def fake_connect(uri, **kwargs):
+        seen.update(kwargs, uri=uri)
+        return FakeUpstream()
+
+    monkeypatch.setattr(websockets.asyncio.client, "connect", fake_connect)
+    client = TestClient(run_app.proxy_app)
+    with client.websocket_connect("/_stcore/stream", subprotocols=["streamlit", "xsrf-token"],
+                                  headers={"Origin": "http://example.com:8501", "Cookie": "_xsrf=abc",
+                                           "User-Agent": "test"}) as ws:
+        assert ws.accepted_subprotocol == "streamlit"
+        ws.send_text("ping")
+        assert ws.receive_text() == "echo ping"
+
+    assert seen["uri"] == "ws://localhost:8502/_stcore/stream"
+    assert seen["origin"] == "http://example.com:8501"
+    assert seen["subprotocols"] == ["streamlit", "xsrf-token"]
+    assert seen["additional_headers"] == [("cookie", "_xsrf=abc")]
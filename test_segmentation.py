@@ -0,0 +1,97 @@
+import pytest
+
+from services.segmentation import WordIndex, segment_transcript
+
+
+def make_segments():
+    """Two Whisper segments with word timings, one word straddling 8 s."""
+    return [
+        {"start": 0.0, "end": 7.0, "text": "Hello there world", "words": [
+            {"word": " Hello", "start": 0.0, "end": 0.5},
+            {"word": " there", "start": 3.0, "end": 3.4},
+            {"word": " world", "start": 6.5, "end": 7.0},
+        ]},
+        {"start": 7.5, "end": 20.0, "text": "again and goodbye", "words": [
+            {"word": " again", "start": 7.5, "end": 8.5},
+            {"word": " and", "start": 12.0, "end": 12.2},
+            {"word": " goodbye", "start": 19.0, "end": 20.0},
+        ]},
+    ]
+
+
+def brute_force(segments, window, duration):
+    """The original O(windows x words) scan, for comparison."""
+    words = [w for s in segments for w in s["words"]]
+    out, t = [], 0.0
+    while t < duration:
+        end = min(t + window, duration)
+        text = "".join(w["word"] for w in words if w["start"] < end and w["end"] > t).strip()
+        if text:
+            out.append((t, end, text))
+        t = end
+    return out
+
+
+def test_windows_match_brute_force():
+    segments = make_segments()
+    index = WordIndex(segments)
+    for window in (1.0, 2.5, 8.0, 30.0):
+        got = [(w["start_time"], w["end_time"], w["text"]) for w in index.windows(window)]
+        assert got == brute_force(segments, window, 20.0)
+
+
+def test_word_straddling_a_boundary_lands_in_both_windows():
+    windows = WordIndex(make_segments()).windows(8.0)
+    assert [w["text"] for w in windows] == ["Hello there world again", "again and", "goodbye"]
+    assert [w["segment_id"] for w in windows] == [1, 2, 3]
+
+
+def test_overlapping_windows():
+    windows = WordIndex(make_segments()).windows(10.0, overlap=5.0)
+    assert [(w["start_time"], w["end_time"]) for w in windows] == [
+        (0.0, 10.0), (5.0, 15.0), (10.0, 20.0), (15.0, 20.0)]
+    assert windows[1]["text"] == "world again and"
+
+
+def test_segments_without_words_are_indexed_whole():
+    index = WordIndex([{"start": 2.0, "end": 4.0, "text": "no word timings"}])
+    assert index.range(3.0, 3.5)[0]["word"] == " no word timings"
+
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        WordIndex(make_segments()).windows(5.0, overlap=5.0)
+
+
+def sentence_segments():
+    words = [(" Hi", 0.0, 0.3), (" there.", 0.4, 0.8), (" How", 3.0, 3.2),
+             (" are", 3.3, 3.4), (" you?", 3.5, 3.9)]
+    return {"duration": 4.0, "segments": [{"start": 0.0, "end": 4.0, "text": "Hi there. How are you?",
+                                           "words": [{"word": w, "start": s, "end": e} for w, s, e in words]}]}
+
+
+def test_sentence_strategy():
+    segments = segment_transcript(sentence_segments(), "https://www.youtube.com/watch?v=abc", "sentence")
+    assert [s["text"] for s in segments] == ["Hi there.", "How are you?"]
+    assert [s["id"] for s in segments] == [0, 1]
+    assert segments[1]["youtube_link"] == "https://www.youtube.com/watch?v=abc&t=3s"
+
+
+def test_max_chars_and_silence_gap_strategies():
+    transcript = sentence_segments()
+    assert [s["text"] for s in segment_transcript(transcript, strategy="max_chars", max_chars=10)] == [
+        "Hi there.", "How are", "you?"]
+    gaps = segment_transcript(transcript, strategy="silence_gap", silence_gap=1.0)
+    assert [(s["start_time"], s["end_time"]) for s in gaps] == [(0.0, 0.8), (3.0, 3.9)]
+
+
+def test_fixed_strategy_has_unique_ids():
+    """Several Whisper segments in one window become one segment, not duplicate IDs."""
+    transcript = {"duration": 10.0, "segments": [
+        {"start": 0.0, "end": 2.0, "text": "one"},
+        {"start": 3.0, "end": 5.0, "text": "two"},
+        {"start": 9.0, "end": 10.0, "text": "three"},
+    ]}
+    segments = segment_transcript(transcript, "https://youtu.be/abc")
+    assert [(s["id"], s["text"]) for s in segments] == [(0, "one two"), (1, "three")]
+    assert segments[1]["youtube_link"] == "https://youtu.be/abc?t=8s"
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Tests that the API starts without importing torch or whisper.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Seconds `import main` may take; override on slow CI machines
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "3.0"))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "heavy": sorted(name for name in ("torch", "whisper", "pandas") if name in sys.modules)}))
+"""
+
+def test_import_main_is_fast_and_skips_torch():
+    env = {key: value for key, value in os.environ.items() if key != "API_WORKERS"}
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, check=True).stdout
+    probe = json.loads(output.strip().splitlines()[-1])
+
+    # torch and whisper load on the first transcription or warmup instead
+    assert probe["heavy"] == []
+    assert probe["seconds"] < IMPORT_TIME_BUDGET, (
+        f"import main took {probe['seconds']:.2f}s, budget is {IMPORT_TIME_BUDGET:.1f}s")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent transcript cache.
+"""
+
+import os
+import time
+from services.transcript_cache import TranscriptCache
+
+def test_round_trip_and_stats(tmp_path):
+    """Stored transcripts come back unchanged and count as hits."""
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"))
+    key = cache.make_key("abc123", "small", "en")
+    payload = {"transcript": {"text": "hello", "segments": []}, "video_info": {"title": "Test"}}
+
+    assert cache.get(key) is None
+    cache.put(key, "abc123", "small", "en", payload)
+
+    assert cache.get(key) == payload
+    stats = cache.get_stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_key_depends_on_configuration():
+    """Model, language and options all change the key."""
+    base = TranscriptCache.make_key("abc123", "small", None)
+
+    assert base == TranscriptCache.make_key("abc123", "small", None, {})
+    assert base != TranscriptCache.make_key("abc123", "medium", None)
+    assert base != TranscriptCache.make_key("abc123", "small", "en")
+    assert base != TranscriptCache.make_key("abc123", "small", None, {"vad": True})
+
+def test_expired_entries_are_misses(tmp_path):
+    """Entries older than the TTL are not returned."""
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"), ttl=0.05)
+    key = cache.make_key("abc123", "small")
+    cache.put(key, "abc123", "small", None, {"text": "hello"})
+
+    time.sleep(0.1)
+    assert cache.get(key) is None
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    """The oldest-accessed entry goes first when the budget is exceeded."""
+    # Room for two ~750-byte compressed entries, but not three
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"), max_size_mb=0.002)
+
+    def payload():
+        return {"text": os.urandom(700).hex()}
+
+    first, second = cache.make_key("one", "small"), cache.make_key("two", "small")
+    cache.put(first, "one", "small", None, payload())
+    cache.put(second, "two", "small", None, payload())
+    assert cache.get(first) is not None
+
+    # "two" is now the least recently used entry
+    cache.put(cache.make_key("three", "small"), "three", "small", None, payload())
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+
+def test_invalidate_by_video(tmp_path):
+    """Invalidation removes every configuration of one video only."""
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"))
+    for model in ("small", "medium"):
+        cache.put(cache.make_key("abc123", model), "abc123", model, None, {"text": model})
+    cache.put(cache.make_key("other", "small"), "other", "small", None, {"text": "other"})
+
+    assert cache.invalidate("abc123") == 2
+    assert cache.get_stats()["entries"] == 1
+
+def test_segments_are_stored_as_columns(tmp_path):
+    """Segments are packed into WordTable columns on disk and unpacked on read."""
+    import json
+    import sqlite3
+    import zlib
+
+    cache = TranscriptCache(str(tmp_path / "transcripts.db"))
+    key = cache.make_key("abc123", "small", "en")
+    segments = [{"id": 0, "start": 0.0, "end": 1.5, "text": "hello world",
+                 "words": [{"word": "hello", "start": 0.0, "end": 0.6, "probability": 0.9},
+                           {"word": "world", "start": 0.7, "end": 1.5, "probability": 0.8}]}]
+    payload = {"transcript": {"text": "hello world", "segments": segments}}
+    cache.put(key, "abc123", "small", "en", payload)
+
+    with sqlite3.connect(str(tmp_path / "transcripts.db")) as conn:
+        row = conn.execute("SELECT data FROM transcripts WHERE key = ?", (key,)).fetchone()
+    stored = json.loads(zlib.decompress(row[0]))
+
+    assert isinstance(stored["transcript"]["segments"], dict)
+    assert cache.get(key)["transcript"]["segments"] == segments
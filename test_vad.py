@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the speech pre-pass and its timestamp remapping.
+"""
+
+import numpy as np
+from services.audio_processing import SAMPLE_RATE
+from services.vad import SpeechTimeline, detect_speech, JOIN_GAP_SECONDS
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds, amplitude=0.0005):
+    rng = np.random.default_rng(0)
+    return (amplitude * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+def make_audio():
+    """10 s intro, 5 s speech, 20 s silence, 3 s speech, 10 s outro."""
+    return np.concatenate([silence(10), tone(5), silence(20), tone(3), silence(10)])
+
+def test_detects_speech_regions():
+    regions = [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in detect_speech(make_audio())]
+
+    assert len(regions) == 2
+    assert abs(regions[0][0] - 10) < 0.3 and abs(regions[0][1] - 15) < 0.3
+    assert abs(regions[1][0] - 35) < 0.3 and abs(regions[1][1] - 38) < 0.3
+
+def test_short_pauses_and_clicks_do_not_split_or_count():
+    audio = np.concatenate([silence(5), tone(2), silence(0.3), tone(2), silence(5), tone(0.05), silence(5)])
+    assert len(detect_speech(audio)) == 1
+
+def test_compact_audio_maps_back_to_original_time():
+    audio = make_audio()
+    timeline = SpeechTimeline.build(audio)
+    compact = timeline.compact(audio)
+    second_start = timeline.compact_starts[1] / SAMPLE_RATE
+
+    assert len(compact) / SAMPLE_RATE < 10
+    assert np.array_equal(compact[:timeline.regions[0][1] - timeline.regions[0][0]],
+                          audio[timeline.regions[0][0]:timeline.regions[0][1]])
+    # One second into each spliced region is one second into the original region
+    assert abs(timeline.to_original(1.0) - (timeline.regions[0][0] / SAMPLE_RATE + 1.0)) < 1e-6
+    assert abs(timeline.to_original(second_start + 1.0) - (timeline.regions[1][0] / SAMPLE_RATE + 1.0)) < 1e-6
+    # Times in the inserted pause stick to the end of the previous region
+    assert timeline.to_original(second_start - JOIN_GAP_SECONDS / 2) == timeline.regions[0][1] / SAMPLE_RATE
+
+    segments = [{"start": second_start, "end": second_start + 2.0,
+                 "words": [{"start": second_start + 0.5, "end": second_start + 1.0}]}]
+    timeline.remap_segments(segments)
+    assert abs(segments[0]["words"][0]["start"] - (timeline.regions[1][0] / SAMPLE_RATE + 0.5)) < 1e-6
+
+def test_mostly_speech_and_all_silence():
+    assert SpeechTimeline.build(tone(20)) is None
+    assert SpeechTimeline.build(np.zeros(SAMPLE_RATE * 5, dtype=np.float32)).regions == []
+
+def test_remapped_last_chunk_reports_full_duration():
+    """Trailing silence still counts as decoded, so streaming clients can finish."""
+    from services.whisper_service import WhisperTranscriptionService
+
+    audio = np.concatenate([silence(2), tone(4), silence(30)])
+    timeline = SpeechTimeline.build(audio)
+    reported = []
+    callback = WhisperTranscriptionService._remapping_callback(
+        lambda segments, decoded_until: reported.append(decoded_until), timeline, len(audio) / SAMPLE_RATE)
+
+    callback([], 1.0)
+    callback([], timeline.compact_length / SAMPLE_RATE)
+
+    assert abs(reported[0] - 3.0) < 0.3
+    assert reported[1] == 36.0
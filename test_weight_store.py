@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped weight store layout and stats.
+Conversion and loading need torch and Whisper and are not covered here.
+"""
+
+import sys
+from services.weight_store import WeightStore
+
+def test_checkpoints_live_in_the_store_dir(tmp_path):
+    store = WeightStore(str(tmp_path / "mmap"))
+
+    assert (tmp_path / "mmap").is_dir()
+    assert store.path_for("large-v3") == tmp_path / "mmap" / "large-v3.fp32.pt"
+
+def test_stats_list_converted_models(tmp_path):
+    store = WeightStore(str(tmp_path))
+    store.path_for("tiny").write_bytes(b"\0" * 1024 ** 2)
+    (tmp_path / "small.fp32.12345.tmp").write_bytes(b"\0" * 1024)
+
+    stats = store.get_stats()
+
+    assert stats["store_dir"] == str(tmp_path)
+    assert stats["models"] == {"tiny": 1.0}
+    if "torch" not in sys.modules:
+        assert stats["mmap_supported"] is None
@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from services.word_table import WordTable
+from services import wire_format
+
+
+def make_segments():
+    return [
+        {"id": 0, "start": 0.0, "end": 2.5, "text": "the cat", "words": [
+            {"word": " the", "start": 0.0, "end": 0.4, "probability": 0.9},
+            {"word": " cat", "start": 0.5, "end": 2.5, "probability": 0.75},
+        ]},
+        {"id": 1, "start": 3.0, "end": 4.0, "text": "the end", "words": [
+            {"word": " the", "start": 3.0, "end": 3.2, "probability": 0.5},
+            {"word": " end", "start": 3.3, "end": 4.0, "probability": 0.625},
+        ]},
+    ]
+
+
+def test_round_trip_through_columns():
+    table = WordTable.from_segments(make_segments())
+    columns = json.loads(json.dumps(table.to_columns()))
+
+    assert len(table) == 4
+    # Repeated words share one entry in the string table
+    assert columns["strings"] == [" the", " cat", " end"]
+    assert WordTable.from_columns(columns).to_segments() == make_segments()
+
+
+def test_negotiate_accept_header():
+    assert wire_format.negotiate(None) is None
+    assert wire_format.negotiate("application/json") is None
+    assert wire_format.negotiate("application/x-msgpack") == "application/msgpack"
+    assert wire_format.negotiate(
+        "application/json;q=0.5, application/vnd.transcript.columnar+json") == wire_format.COLUMNAR_JSON_TYPE
+    assert wire_format.negotiate("application/msgpack;q=0, application/json") is None
+
+
+def test_negotiate_skips_msgpack_when_not_installed(monkeypatch):
+    monkeypatch.setattr(wire_format, "msgpack", None)
+
+    assert wire_format.negotiate("application/msgpack, application/json;q=0.5") is None
+    assert wire_format.negotiate(
+        "application/msgpack, application/vnd.transcript.columnar+json;q=0.5") == wire_format.COLUMNAR_JSON_TYPE
+
+
+def test_columnar_json_is_smaller_and_lossless():
+    segments = make_segments() * 200
+    result = {
+        "success": True,
+        "transcript": {"text": "...", "segments": segments},
+        "segments": [{"id": i, "start_time": 8.0 * i, "text": "x"} for i in range(3)],
+    }
+    body, headers = wire_format.encode(wire_format.compact_result(result), wire_format.COLUMNAR_JSON_TYPE)
+
+    assert headers == {"Content-Encoding": "gzip"}
+    assert len(body) * 5 < len(json.dumps(result))
+    decoded = json.loads(gzip.decompress(body))
+    assert decoded["segments"]["start_time"] == [0.0, 8.0, 16.0]
+    assert WordTable.from_columns(decoded["transcript"]["segments"]).to_segments()[2]["words"][1]["word"] == " cat"
+
+
+def test_msgpack_format():
+    msgpack = pytest.importorskip("msgpack")
+    body, _ = wire_format.encode(wire_format.compact_result({"success": True, "segments": []}),
+                                 "application/msgpack")
+    assert msgpack.unpackb(body)["format"] == "columnar"
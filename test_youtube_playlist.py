@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for playlist and channel expansion.
+Uses a fake yt-dlp, so no network access is needed.
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import services.youtube_audio
+from services.youtube_audio import YouTubeAudioService, PLAYLIST_ID_PATTERN
+
+def video(video_id):
+    return {"_type": "url", "ie_key": "Youtube", "id": video_id, "title": f"Video {video_id}",
+            "url": f"https://www.youtube.com/watch?v={video_id}"}
+
+def tab(url):
+    return {"_type": "url", "ie_key": "YoutubeTab", "id": url.rsplit("/", 1)[-1], "url": url}
+
+LISTINGS = {
+    "https://www.youtube.com/@creator/videos": {"id": "UCcreator", "title": "Creator - Videos",
+                                                "entries": [video("aaaaaaaaaaa"), video("bbbbbbbbbbb")]},
+    "https://www.youtube.com/@creator/featured": {"id": "UCcreator", "title": "Creator",
+                                                  "entries": [tab("https://www.youtube.com/@creator/videos"),
+                                                              tab("https://www.youtube.com/@creator/shorts")]},
+    "https://www.youtube.com/@creator/shorts": {"id": "UCcreator", "title": "Creator - Shorts",
+                                                "entries": [video("ccccccccccc"), video("aaaaaaaaaaa")]},
+}
+
+class FakeYoutubeDL:
+    requested = []
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def extract_info(self, url, download=False):
+        FakeYoutubeDL.requested.append(url)
+        return LISTINGS[url]
+
+def expand(tmp_path, playlist, max_items=None):
+    FakeYoutubeDL.requested = []
+    service = YouTubeAudioService(temp_dir=str(tmp_path))
+    with mock.patch.object(services.youtube_audio, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL)):
+        return service.expand_playlist(playlist, max_items)
+
+def test_bare_channel_url_lists_its_uploads(tmp_path):
+    result = expand(tmp_path, "https://www.youtube.com/@creator")
+
+    assert result["success"]
+    assert [entry["video_id"] for entry in result["entries"]] == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+    assert FakeYoutubeDL.requested == ["https://www.youtube.com/@creator/videos"]
+
+def test_nested_tabs_are_followed_without_duplicates(tmp_path):
+    result = expand(tmp_path, "https://www.youtube.com/@creator/featured")
+    assert [entry["video_id"] for entry in result["entries"]] == ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+
+    limited = expand(tmp_path, "https://www.youtube.com/@creator/featured", max_items=2)
+    assert len(limited["entries"]) == 2
+    assert "https://www.youtube.com/@creator/shorts" not in FakeYoutubeDL.requested
+
+def test_playlist_ids_do_not_match_video_ids():
+    assert PLAYLIST_ID_PATTERN.match("PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf")
+    assert PLAYLIST_ID_PATTERN.match("UUBR8-60-B28hp2BmDPdntcQ")
+    assert not PLAYLIST_ID_PATTERN.match("dQw4w9WgXcQ")
+    assert not PLAYLIST_ID_PATTERN.match("PLw4w9WgXcQ")
@@ -4,9 +4,16 @@ Simple test script for YouTube audio service.
 Run this to verify the service works before moving to the next task.
 """
 
+import os
 import sys
+import time
 import asyncio
-from services.youtube_audio import YouTubeAudioService
+from pathlib import Path
+import numpy as np
+from types import SimpleNamespace
+from unittest import mock
+import services.youtube_audio
+from services.youtube_audio import YouTubeAudioService, STALE_DOWNLOAD_SECONDS
 
 def test_url_validation():
     """Test YouTube URL validation."""
@@ -59,6 +66,70 @@ def test_video_info():
     except Exception as e:
         print(f"  ❌ Exception: {e}")
 
+def test_resolve_downloaded_file(tmp_path):
+    """The downloaded path comes from yt-dlp's info, not a directory scan."""
+    audio = tmp_path / "dQw4w9WgXcQ.webm"
+    audio.write_bytes(b"audio")
+    
+    info = {"id": "dQw4w9WgXcQ", "requested_downloads": [{"filepath": str(audio)}]}
+    assert YouTubeAudioService._resolve_downloaded_file(info) == audio
+    
+    missing = {"id": "dQw4w9WgXcQ", "requested_downloads": [{"filepath": str(tmp_path / "gone.m4a")}]}
+    assert YouTubeAudioService._resolve_downloaded_file(missing) is None
+
+def test_cleanup_during_download_keeps_its_directory(tmp_path):
+    """Cleanup removes abandoned download directories but not one still being written."""
+    service = YouTubeAudioService(temp_dir=str(tmp_path))
+    abandoned = service.download_dir / ".download-abandoned"
+    abandoned.mkdir()
+    (abandoned / "old.m4a.part").write_bytes(b"partial")
+    long_ago = time.time() - STALE_DOWNLOAD_SECONDS - 60
+    os.utime(abandoned / "old.m4a.part", (long_ago, long_ago))
+    os.utime(abandoned, (long_ago, long_ago))
+
+    class FakeYoutubeDL:
+        def __init__(self, params):
+            self.params = dict(params)
+
+        def add_progress_hook(self, hook):
+            pass
+
+        def extract_info(self, url, download=False):
+            home = Path(self.params["paths"]["home"])
+            (home / "dQw4w9WgXcQ.m4a.part").write_bytes(b"partial")
+            service.cleanup_all_files()
+            audio = home / "dQw4w9WgXcQ.m4a"
+            (home / "dQw4w9WgXcQ.m4a.part").rename(audio)
+            return {"id": "dQw4w9WgXcQ", "title": "Test", "requested_downloads": [{"filepath": str(audio)}]}
+
+        def close(self):
+            pass
+
+    with mock.patch.object(services.youtube_audio, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL)):
+        result = service.download_audio("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    assert result["success"], result.get("error")
+    assert Path(result["audio_file_path"]).exists()
+    assert not abandoned.exists()
+
+def test_stream_prefers_a_cached_download(tmp_path):
+    """A downloaded file in the audio cache is decoded locally instead of streamed again."""
+    service = YouTubeAudioService(temp_dir=str(tmp_path))
+    audio_file = service.download_dir / "dQw4w9WgXcQ.m4a"
+    audio_file.write_bytes(b"audio")
+    service.audio_cache.put("dQw4w9WgXcQ", str(audio_file), {"title": "Test"})
+
+    def no_streaming(*args, **kwargs):
+        raise AssertionError("streamed despite a cached download")
+
+    with mock.patch.object(services.youtube_audio, "stream_decode", no_streaming), \
+            mock.patch.object(services.youtube_audio, "ffmpeg_decode", lambda path: np.zeros(16000 * 4, np.float32)):
+        result = service.stream_audio("https://www.youtube.com/watch?v=dQw4w9WgXcQ", start=1.0, end=3.0)
+
+    assert result["success"] and result["cached"]
+    assert len(result["audio"]) == 16000 * 2
+    assert result["video_info"] == {"title": "Test"}
+
 def main():
     """Run all tests."""
     print("🚀 Testing YouTube Audio Service")